@@ -252,6 +252,59 @@ class Edges(Vertices):
 
         return referenced
 
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def element_bounds(self):
+        """Returns bounds (AABB) of each element.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        element_bounds: (n_elements, 2, d) np.ndarray
+        """
+        self._logd("computing element_bounds")
+        element_vertices = self.const_vertices[self.const_elements]
+
+        return np.stack(
+                (element_vertices.min(axis=1), element_vertices.max(axis=1)),
+                axis=1,
+        )
+
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def element_grid(self):
+        """Returns spatial index of elements. Uniform grid over element
+        bounds.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        element_grid: ElementGrid
+        """
+        self._logd("building element_grid")
+        return helpers.spatial.ElementGrid(self.element_bounds())
+
+    def intersecting_elements(self, boxes):
+        """Returns ids of elements, whose bounding box intersects with given
+        boxes. Reuses saved element_grid.
+
+        Parameters
+        -----------
+        boxes: (n, d, 2) array-like
+          [[[greater_than, less_than], [....], ...], ...]
+
+        Returns
+        --------
+        offsets: (n + 1,) np.ndarray
+        ids: (m,) np.ndarray
+          Element ids of i-th box are `ids[offsets[i]:offsets[i + 1]]`.
+        """
+        return self.element_grid().query_boxes(boxes)
+
     def remove_unreferenced_vertices(self):
         """Remove unreferenced vertices. Adapted from
         `github.com/mikedh/trimesh`
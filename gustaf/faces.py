@@ -230,6 +230,206 @@ class Faces(Edges):
 
         return unique_info.ids[unique_info.counts == 1]
 
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def boundary(self):
+        """Returns boundary as a compact mesh: outline edges for faces and
+        surface faces for volumes. Only referenced vertices are kept and
+        `vertexdata["parent_vertex_ids"]` maps them back to this mesh.
+        Intermediate sub-elements are not saved.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        boundary: Edges or Faces
+        """
+        self._logd("computing boundary")
+
+        if self.kind == "face":
+            to_subelements = utils.connec.faces_to_edges
+            boundary_type = Edges
+        else:
+            to_subelements = utils.connec.volumes_to_faces
+            boundary_type = Faces
+
+        subelements, _ = utils.connec.single_subelements(
+                self.const_elements, to_subelements
+        )
+
+        # compact vertices
+        parent_ids, inverse = np.unique(subelements, return_inverse=True)
+        boundary = boundary_type(
+                vertices=self.const_vertices[parent_ids],
+                elements=inverse.reshape(subelements.shape),
+        )
+        boundary.vertexdata["parent_vertex_ids"] = parent_ids
+
+        return boundary
+
+    def locate_points(self, queries, tolerance=None):
+        """Returns ids of elements that contain query points. Valid for
+        tri/quad in 2D and tet/hexa in 3D. Surface meshes in 3D raise
+        ValueError. Quads and hexas are assumed to have planar faces. Reuses
+        saved element_grid.
+
+        Parameters
+        -----------
+        queries: (n, d) array-like
+        tolerance: float
+          (Optional) Default is settings.TOLERANCE.
+
+        Returns
+        --------
+        element_ids: (n,) np.ndarray
+          -1 if query is not in any element.
+        """
+        return helpers.spatial.locate(
+                queries,
+                self.const_vertices,
+                self.const_elements,
+                self.whatami,
+                self.element_grid(),
+                tolerance=tolerance,
+        )
+
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def normals(self):
+        """Returns unit normals of faces. Quads use cross product of their
+        diagonals. 2D faces are considered to be in xy-plane.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        normals: (n, 3) np.ndarray
+        """
+        self._logd("computing normals")
+
+        return utils.geometry.normals(
+                self._vertices_3d()[self.const_elements], self.whatami
+        )
+
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def areas(self):
+        """Returns areas of faces. In 2D, areas of clockwise faces are
+        negative. In 3D, areas are signed with respect to each face's normal,
+        so that only self-intersecting quads have negative values.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        areas: (n,) np.ndarray
+        """
+        self._logd("computing areas")
+
+        return utils.geometry.measures(
+                self.const_vertices[self.const_elements], self.whatami
+        )
+
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def vertex_normals(self):
+        """Returns area weighted average of face normals at each vertex.
+        Unreferenced vertices have zero normals.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        vertex_normals: (n, 3) np.ndarray
+        """
+        self._logd("computing vertex normals")
+
+        elements = self.const_elements
+        weighted = self.normals() * np.abs(self.areas())[:, None]
+
+        # scatter-add to each vertex of each face
+        ids = elements.ravel()
+        n_vertices = len(self.const_vertices)
+        vertex_normals = np.empty((n_vertices, 3), dtype=settings.FLOAT_DTYPE)
+        for i in range(3):
+            vertex_normals[:, i] = np.bincount(
+                    ids,
+                    weights=np.repeat(weighted[:, i], elements.shape[1]),
+                    minlength=n_vertices,
+            )
+
+        norms = np.linalg.norm(vertex_normals, axis=1, keepdims=True)
+        norms[norms == 0.] = 1.
+
+        return vertex_normals / norms
+
+    def _vertices_3d(self):
+        """Returns vertices in 3D. 2D vertices are padded with zeros.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        vertices: (n, 3) np.ndarray
+        """
+        vertices = self.const_vertices
+        if vertices.shape[1] == 3:
+            return vertices
+
+        return np.hstack((vertices, np.zeros((len(vertices), 1))))
+
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def quality(self, chunk_size=None, **kwargs):
+        """Returns a namedtuple of element quality measures: signed measures
+        (area or volume), jacobian determinants at corners, aspect ratios and
+        equiangle skewness. Elements are processed in chunks.
+
+        Parameters
+        -----------
+        chunk_size: int
+          (Optional) Default is settings.CHUNK_SIZE.
+        recompute: bool
+          Only applicable as keyword argument. Force re-computes.
+
+        Returns
+        --------
+        quality: ElementQuality
+          namedtuple with `measures`, `jacobians`, `aspect_ratios`,
+          `skewness`.
+        """
+        self._logd("computing element quality")
+
+        quality = utils.geometry.element_quality(
+                self.const_vertices,
+                self.const_elements,
+                self.whatami,
+                chunk_size=chunk_size,
+        )
+        for q in quality:
+            q.flags.writeable = False
+
+        return quality
+
+    def inverted_elements(self):
+        """Returns ids of inverted or degenerated elements, which have a
+        non-positive jacobian determinant at any corner. Based on quality().
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        inverted_ids: (n,) np.ndarray
+        """
+        return np.where((self.quality().jacobians <= 0).any(axis=1))[0]
+
     def update_faces(self, *args, **kwargs):
         """Alias to update_elements."""
         self.update_elements(*args, **kwargs)
@@ -1,7 +1,9 @@
 from gustaf.helpers import data
 from gustaf.helpers import raise_if
+from gustaf.helpers import spatial
 
 __all__ = [
         "data",
         "raise_if",
+        "spatial",
 ]
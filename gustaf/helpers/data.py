@@ -442,6 +442,23 @@ Unique2DIntegers.inverse.__doc__ = """`(m) np.ndarray`
 Unique2DIntegers.counts.__doc__ = """`(n) np.ndarray`
     Field number 3"""
 
+ElementQuality = namedtuple(
+        "ElementQuality",
+        ["measures", "jacobians", "aspect_ratios", "skewness"],
+)
+"""namedtuple to hold element quality measures. See
+`utils.geometry.element_quality`.
+"""
+
+ElementQuality.measures.__doc__ = """`(n) np.ndarray`
+  signed area or volume. Field number 0"""
+ElementQuality.jacobians.__doc__ = """`(n, n_nodes) np.ndarray`
+  jacobian determinants at each corner. Field number 1"""
+ElementQuality.aspect_ratios.__doc__ = """`(n) np.ndarray`
+  longest edge over shortest edge. Field number 2"""
+ElementQuality.skewness.__doc__ = """`(n) np.ndarray`
+  equiangle skewness. Field number 3"""
+
 
 class ComputedMeshData(ComputedData):
     """A class to hold computed-mesh-data.
@@ -0,0 +1,348 @@
+"""gustaf/gustaf/helpers/spatial.py.
+
+Spatial index structures for repeated queries on the same mesh.
+"""
+
+import numpy as np
+
+from gustaf import settings
+from gustaf.utils import arr
+
+# simplices that fill (planar) quads and hexas.
+# same node ordering as `utils.connec.make_quad_faces` and
+# `utils.connec.make_hexa_volumes`
+QUAD_TO_TRI = np.array([[0, 1, 2], [0, 2, 3]], dtype=settings.INT_DTYPE)
+HEXA_TO_TET = np.array(
+        [
+                [0, 1, 2, 6],
+                [0, 2, 3, 6],
+                [0, 3, 7, 6],
+                [0, 7, 4, 6],
+                [0, 4, 5, 6],
+                [0, 5, 1, 6],
+        ],
+        dtype=settings.INT_DTYPE,
+)
+
+
+class ElementGrid:
+    """Uniform grid of buckets over element bounding boxes. Each cell holds
+    ids of elements whose bounding box overlaps it, in CSR form. Cell sizes
+    follow the mean element bounding box size, so that a query only visits a
+    handful of candidates.
+
+    Parameters
+    -----------
+    element_bounds: (n, 2, d) np.ndarray
+      min and max of each element.
+    max_cells_per_element: float
+      Default is 4. Upper limit of total number of cells relative to number
+      of elements.
+    """
+
+    __slots__ = (
+            "_element_bounds",
+            "_origin",
+            "_cell_size",
+            "_resolutions",
+            "_strides",
+            "_offsets",
+            "_element_ids",
+    )
+
+    def __init__(self, element_bounds, max_cells_per_element=4):
+        element_bounds = np.asarray(element_bounds, dtype=settings.FLOAT_DTYPE)
+        if element_bounds.ndim != 3 or element_bounds.shape[1] != 2:
+            raise ValueError("element_bounds should be (n, 2, d) array.")
+
+        self._element_bounds = element_bounds
+        lower = element_bounds[:, 0]
+        upper = element_bounds[:, 1]
+        n_elements, dim = lower.shape
+
+        self._origin = lower.min(axis=0)
+        extent = upper.max(axis=0) - self._origin
+
+        # cells of about one element size, but not too many
+        cell_size = (upper - lower).mean(axis=0)
+        cell_size[cell_size <= 0] = 1.
+        n_cells = np.prod(np.ceil(extent / cell_size) + 1)
+        max_cells = max(max_cells_per_element * n_elements, 1)
+        if n_cells > max_cells:
+            cell_size *= (n_cells / max_cells)**(1 / dim)
+
+        self._cell_size = cell_size
+        self._resolutions = (np.floor(extent / cell_size) + 1).astype(np.int64)
+        self._strides = np.concatenate(
+                ([1], np.cumprod(self._resolutions[:-1]))
+        ).astype(np.int64)
+
+        # element -> covered cells
+        cell_ids, element_ids = self._covered_cells(lower, upper)
+        order = np.argsort(cell_ids, kind="stable")
+
+        self._element_ids = element_ids[order]
+        self._offsets = arr.counts_to_offsets(
+                np.bincount(
+                        cell_ids,
+                        minlength=int(np.prod(self._resolutions)),
+                )
+        )
+
+    @property
+    def n_cells(self):
+        """Returns total number of cells.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        n_cells: int
+        """
+        return len(self._offsets) - 1
+
+    def _multi_index(self, points):
+        """Returns multi-index of the cell that contains given points. May be
+        out of grid.
+
+        Parameters
+        -----------
+        points: (n, d) np.ndarray
+
+        Returns
+        --------
+        multi_index: (n, d) np.ndarray
+        """
+        return np.floor((points - self._origin) / self._cell_size).astype(
+                np.int64
+        )
+
+    def _covered_cells(self, lower, upper):
+        """Returns all the cell ids that boxes cover, paired with box ids.
+
+        Parameters
+        -----------
+        lower: (n, d) np.ndarray
+        upper: (n, d) np.ndarray
+
+        Returns
+        --------
+        cell_ids: (m,) np.ndarray
+        box_ids: (m,) np.ndarray
+        """
+        last = self._resolutions - 1
+        lower_ids = np.clip(self._multi_index(lower), 0, last)
+        upper_ids = np.clip(self._multi_index(upper), 0, last)
+        spans = np.maximum(upper_ids - lower_ids + 1, 0)
+
+        # enumerate cells of each box using mixed radix of its spans
+        local, box_ids = arr.concat_ranges(
+                np.zeros(len(spans), dtype=np.int64),
+                spans.prod(axis=1),
+        )
+        cell_ids = np.zeros(len(local), dtype=np.int64)
+        for i in range(spans.shape[1]):
+            box_spans = spans[box_ids, i]
+            cell_ids += (lower_ids[box_ids, i] + local % box_spans
+                         ) * self._strides[i]
+            local //= box_spans
+
+        return cell_ids, box_ids
+
+    def candidates(self, points):
+        """Returns pairs of query point and element, whose cell matches. Pairs
+        are sorted by query id.
+
+        Parameters
+        -----------
+        points: (n, d) np.ndarray
+
+        Returns
+        --------
+        query_ids: (m,) np.ndarray
+        element_ids: (m,) np.ndarray
+        """
+        multi_index = self._multi_index(points)
+        inside = np.logical_and(
+                (multi_index >= 0).all(axis=1),
+                (multi_index < self._resolutions).all(axis=1),
+        )
+        query_ids = np.arange(len(points))[inside]
+        cells = multi_index[inside] @ self._strides
+
+        starts = self._offsets[cells]
+        ids, range_ids = arr.concat_ranges(
+                starts, self._offsets[cells + 1] - starts
+        )
+
+        return query_ids[range_ids], self._element_ids[ids]
+
+    def query_boxes(self, boxes):
+        """Returns elements whose bounding box intersects with given boxes.
+        Box is parsed as same as `utils.arr.select_with_ranges`, but without
+        `None` and inverted ranges.
+
+        Parameters
+        -----------
+        boxes: (n, d, 2) array-like
+          [[[greater_than, less_than], [....], ...], ...]
+
+        Returns
+        --------
+        offsets: (n + 1,) np.ndarray
+        element_ids: (m,) np.ndarray
+          Element ids of i-th box are
+          `element_ids[offsets[i]:offsets[i + 1]]`.
+        """
+        boxes = np.asarray(boxes, dtype=settings.FLOAT_DTYPE)
+        lower = boxes[..., 0]
+        upper = boxes[..., 1]
+
+        cell_ids, box_ids = self._covered_cells(lower, upper)
+        # boxes outside of the grid are clipped - AABB check filters them
+        starts = self._offsets[cell_ids]
+        ids, range_ids = arr.concat_ranges(
+                starts, self._offsets[cell_ids + 1] - starts
+        )
+        box_ids = box_ids[range_ids]
+        element_ids = self._element_ids[ids]
+
+        # an element may appear in multiple cells
+        n_elements = len(self._element_bounds)
+        pairs = np.unique(box_ids * n_elements + element_ids)
+        box_ids = pairs // n_elements
+        element_ids = pairs % n_elements
+
+        # AABB intersection
+        e_bounds = self._element_bounds[element_ids]
+        intersects = np.logical_and(
+                (e_bounds[:, 0] <= upper[box_ids]).all(axis=1),
+                (e_bounds[:, 1] >= lower[box_ids]).all(axis=1),
+        )
+
+        return (
+                arr.counts_to_offsets(
+                        np.bincount(
+                                box_ids[intersects],
+                                minlength=len(boxes),
+                        )
+                ),
+                element_ids[intersects],
+        )
+
+
+def in_simplices(points, simplices, tolerance=None):
+    """Checks if points are in given simplices (triangles in 2D, tetrahedrons
+    in 3D), pair-wise. Uses barycentric coordinates computed with Cramer's
+    rule, so degenerated simplices never contain a point. Degeneracy is
+    checked relative to the size of each simplex.
+
+    Parameters
+    -----------
+    points: (n, d) np.ndarray
+    simplices: (n, d + 1, d) np.ndarray
+      Vertices of simplices.
+    tolerance: float
+      (Optional) Default is settings.TOLERANCE.
+
+    Returns
+    --------
+    inside: (n,) np.ndarray
+      bool
+    """
+    if tolerance is None:
+        tolerance = settings.TOLERANCE
+
+    # columns are edges from the first vertex
+    t_mat = np.swapaxes(simplices[:, 1:] - simplices[:, :1], 1, 2)
+    rhs = points - simplices[:, 0]
+    det = np.linalg.det(t_mat)
+    scale = np.linalg.norm(t_mat, axis=1).max(axis=1)**points.shape[1]
+
+    inside = np.abs(det) > tolerance * scale
+    lambda_sum = np.zeros(len(points))
+    for i in range(points.shape[1]):
+        replaced = t_mat.copy()
+        replaced[:, :, i] = rhs
+        lambda_i = np.linalg.det(replaced)
+        lambda_i[inside] /= det[inside]
+        inside &= lambda_i >= -tolerance
+        lambda_sum += lambda_i
+
+    inside &= lambda_sum <= 1 + tolerance
+
+    return inside
+
+
+def locate(points, vertices, elements, whatami, grid, tolerance=None):
+    """Finds elements that contain query points. Quads and hexas are split
+    into simplices, which is exact for planar faces. If a point lies in
+    multiple elements, the smallest element id is returned.
+
+    Parameters
+    -----------
+    points: (n, d) array-like
+    vertices: (m, d) np.ndarray
+    elements: (k, 3), (k, 4) or (k, 8) np.ndarray
+    whatami: str
+      tri, quad, tet or hexa. tri and quad expect 2D vertices and tet and
+      hexa 3D vertices. Surface meshes in 3D are not supported.
+    grid: ElementGrid
+    tolerance: float
+      (Optional) Default is settings.TOLERANCE.
+
+    Returns
+    --------
+    element_ids: (n,) np.ndarray
+      -1 if the point is not in any element.
+    """
+    points = np.asarray(points, dtype=settings.FLOAT_DTYPE)
+    dim = vertices.shape[1]
+
+    if (whatami, dim) in (("tri", 2), ("tet", 3)):
+        sub_simplices = np.arange(dim + 1).reshape(1, -1)
+    elif (whatami, dim) == ("quad", 2):
+        sub_simplices = QUAD_TO_TRI
+    elif (whatami, dim) == ("hexa", 3):
+        sub_simplices = HEXA_TO_TET
+    else:
+        raise ValueError(
+                f"Can't locate points in {whatami} elements in {dim}D. "
+                "tri and quad need 2D vertices and tet and hexa 3D vertices."
+        )
+
+    query_ids, element_ids = grid.candidates(points)
+
+    # cheap AABB filter first
+    e_bounds = grid._element_bounds[element_ids]
+    p = points[query_ids]
+    in_box = np.logical_and(
+            (e_bounds[:, 0] <= p).all(axis=1),
+            (e_bounds[:, 1] >= p).all(axis=1),
+    )
+    query_ids = query_ids[in_box]
+    element_ids = element_ids[in_box]
+    p = p[in_box]
+
+    inside = np.zeros(len(query_ids), dtype=bool)
+    for ss in sub_simplices:
+        inside |= in_simplices(
+                p,
+                vertices[elements[element_ids][:, ss]],
+                tolerance=tolerance,
+        )
+
+    # smallest element id per point
+    query_ids = query_ids[inside]
+    element_ids = element_ids[inside]
+    order = np.lexsort((element_ids, query_ids))
+    query_ids = query_ids[order]
+    element_ids = element_ids[order]
+    first = np.unique(query_ids, return_index=True)[1]
+
+    located = np.full(len(points), -1, dtype=settings.INT_DTYPE)
+    located[query_ids[first]] = element_ids[first]
+
+    return located
@@ -14,6 +14,73 @@ from gustaf.io.ioutils import abs_fname, check_and_makedirs
 from gustaf.utils import log
 
 
+def fnames(fname):
+    """Returns mixd file names of given ".xns" file name. "_.xns" refers to
+    files without base name, for example, "mxyz".
+
+    Parameters
+    -----------
+    fname: str
+
+    Returns
+    --------
+    fnames: dict
+      keys are "mxyz", "mien", "mrng" and "minf".
+    """
+    fname = abs_fname(fname)
+    fbase, ext = os.path.splitext(fname)
+
+    if not ext.startswith(".xns"):
+        raise NotImplementedError("`mixd` format only supports xns.")
+
+    # frequently used case in practice. no base
+    if os.path.basename(fbase) == "_":
+        fbase = os.path.join(os.path.dirname(fbase), "")
+    else:
+        fbase += "."
+
+    return {key: fbase + key for key in ["mxyz", "mien", "mrng", "minf"]}
+
+
+def load_dim(minf):
+    """Reads spatial dimension (`nsd`) from minf file.
+
+    Parameters
+    -----------
+    minf: str
+
+    Returns
+    --------
+    dim: int
+      None if minf does not have `nsd`.
+    """
+    with open(minf, "r") as infof:
+        for line in infof:
+            words = line.split()
+            if len(words) > 1 and words[0] == "nsd":
+                return int(words[1])
+
+    return None
+
+
+def load_vertices(mxyz, dim, mode="r"):
+    """Memory-maps vertices of mxyz file, without loading them.
+
+    Parameters
+    -----------
+    mxyz: str
+    dim: int
+    mode: str
+      Default is "r". np.memmap mode.
+
+    Returns
+    --------
+    vertices: (n, dim) np.memmap
+      big endian float.
+    """
+    return np.memmap(mxyz, dtype=">d", mode=mode).reshape(-1, dim)
+
+
 def load(
         simplex=True,
         volume=False,
@@ -147,26 +214,11 @@ def export(
     big_endian_double = ">d"
 
     # prep files
-    fbase, ext = os.path.splitext(fname)
-
-    if ext.startswith(".xns"):
-        # frequently used case in practice. no base export
-        if os.path.basename(fbase) == "_":
-            fdir = os.path.dirname(fbase)
-            vert_file = os.path.join(fdir, "mxyz")
-            connec_file = os.path.join(fdir, "mien")
-            bc_file = os.path.join(fdir, "mrng")
-            info_file = os.path.join(fdir, "minf")
-
-        else:
-            fbase += "."
-            vert_file = fbase + "mxyz"
-            connec_file = fbase + "mien"
-            bc_file = fbase + "mrng"
-            info_file = fbase + "minf"
-
-    else:
-        raise NotImplementedError("`mixd` format only supports xns.")
+    files = fnames(fname)
+    vert_file = files["mxyz"]
+    connec_file = files["mien"]
+    bc_file = files["mrng"]
+    info_file = files["minf"]
 
     # write v
     with open(vert_file, "wb") as vf:
@@ -184,12 +236,7 @@ def export(
 
     # write bc
     with open(bc_file, "wb") as bf:
-        nbelem = 3
-
-        if whatami.startswith("quad") or whatami.startswith("tet"):
-            nbelem += 1
-        elif whatami.startswith("hexa"):
-            nbelem += 3
+        nbelem = n_boundary_faces(whatami)
 
         # init boundaries with -1, as it is the value for non-boundary.
         # alternatively, they could be (-1 * neighbor_elem_id).
@@ -204,15 +251,77 @@ def export(
             bf.write(struct.pack(big_endian_int, b))
 
     # write info
-    with open(info_file, "w") as infof:  # if and inf... just can't
+    export_info(
+            info_file,
+            whatami,
+            dim,
+            n_vertices=mesh.vertices.shape[0],
+            n_elements=mesh.elements.shape[0],
+            n_element_vertices=mesh.elements.shape[1],
+            bc_names=mesh.BC.keys(),
+            space_time=space_time,
+    )
+
+
+def n_boundary_faces(whatami):
+    """Returns number of boundary faces (or edges) per element, which is the
+    number of mrng entries per element.
+
+    Parameters
+    -----------
+    whatami: str
+
+    Returns
+    --------
+    n_boundary_faces: int
+    """
+    nbelem = 3
+
+    if whatami.startswith("quad") or whatami.startswith("tet"):
+        nbelem += 1
+    elif whatami.startswith("hexa"):
+        nbelem += 3
+
+    return nbelem
+
+
+def export_info(
+        minf,
+        whatami,
+        dim,
+        n_vertices,
+        n_elements,
+        n_element_vertices,
+        bc_names=(),
+        space_time=False,
+):
+    """Writes minf file.
+
+    Parameters
+    -----------
+    minf: str
+    whatami: str
+    dim: int
+    n_vertices: int
+    n_elements: int
+    n_element_vertices: int
+    bc_names: iterable
+      names of boundaries, numbered from 1
+    space_time: bool
+
+    Returns
+    --------
+    None
+    """
+    with open(minf, "w") as infof:  # if and inf... just can't
         infof.write(f"# dim: {dim}\n")
         infof.write(f"# mesh type: {whatami}\n\n")
 
         st_factor = 2 if space_time else 1
-        infof.write(f"nn {int(mesh.vertices.shape[0] * st_factor)}\n")
-        infof.write(f"ne {int(mesh.elements.shape[0])}\n")
+        infof.write(f"nn {int(n_vertices * st_factor)}\n")
+        infof.write(f"ne {int(n_elements)}\n")
         infof.write(f"nsd {dim}\n")
-        infof.write(f"nen {int(mesh.elements.shape[1] * st_factor)}\n")
+        infof.write(f"nen {int(n_element_vertices * st_factor)}\n")
 
         if space_time:
             infof.write("space-time on\n\n\n")
@@ -221,7 +330,7 @@ def export(
 
         # BC guide
         infof.write("# boundary name : referenced number.\n")
-        for i, bname in enumerate(mesh.BC.keys()):
+        for i, bname in enumerate(bc_names):
             infof.write(f"# {bname} : {i + 1}\n")
 
         # signature
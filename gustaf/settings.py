@@ -19,3 +19,6 @@ VEDO_DEFAULT_OPTIONS = dict(
 )
 
 NTHREADS = 1
+
+# number of elements/points to process at once in chunked computations
+CHUNK_SIZE = 100000
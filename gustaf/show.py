@@ -235,6 +235,8 @@ def _vedo_showable(obj, **kwargs):
 
     utils.log.debug("making vedo-showable obj")
     local_options = dict()
+    # volumes with data are shown with their surface and its data
+    vertexdata = obj.vertexdata
 
     if obj.kind == "vertex":
         for key in ["c", "r", "alpha"]:
@@ -301,16 +303,16 @@ def _vedo_showable(obj, **kwargs):
             return None  # get_whatami should've rasied error..
 
         if basic_options["dataname"]:
-            from gustaf.faces import Faces
-
             # UGrid would be politically correct,
             # but currently it can't show field
             # so, extract only surface mesh
-            surf_ids = obj.single_faces()  # gets faces too
-            sfaces = Faces(obj.vertices, obj.faces()[surf_ids])
-            sfaces.remove_unreferenced_vertices()
+            sfaces = obj.boundary().copy()
+            parent_ids = sfaces.vertexdata.pop("parent_vertex_ids")
+            for key, value in obj.vertexdata.items():
+                sfaces.vertexdata[key] = value[parent_ids]
 
             vobj = sfaces.showable(backend="vedo")  # recursive alert
+            vertexdata = sfaces.vertexdata
 
         else:
             vobj = vedo.UGrid(
@@ -331,7 +333,7 @@ def _vedo_showable(obj, **kwargs):
     dname = basic_options["dataname"]
     if dname is not None:
         # transfer data
-        vobj.pointdata[dname] = obj.vertexdata[dname]
+        vobj.pointdata[dname] = vertexdata[dname]
 
         # default cmap is jet.
         if basic_options["cmap"] is None:
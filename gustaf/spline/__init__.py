@@ -7,6 +7,7 @@ here.
 """
 
 from gustaf.spline import base
+from gustaf.spline import composition
 from gustaf.spline import create
 from gustaf.spline import extract
 from gustaf.spline.base import (
@@ -14,6 +15,8 @@ from gustaf.spline.base import (
 )
 from gustaf.spline import ffd
 from gustaf.spline import microstructure
+from gustaf.spline import multipatch
+from gustaf.spline.multipatch import MultiPatch, InterfaceNumbering
 
 import splinepy
 from splinepy import io
@@ -31,6 +34,7 @@ NAME_TO_TYPE = splinepy.settings.NAME_TO_TYPE
 
 __all__ = [
         "base",
+        "composition",
         "create",
         "extract",
         "Bezier",
@@ -42,5 +46,8 @@ __all__ = [
         "load_splines",
         "ffd",
         "microstructure",
+        "multipatch",
+        "MultiPatch",
+        "InterfaceNumbering",
         "io",
 ]
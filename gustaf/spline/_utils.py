@@ -3,6 +3,10 @@
 Utils for spline. Internal use only.
 """
 
+import numpy as np
+
+from gustaf import settings
+
 
 def to_res_list(res, length):
     """Given int or list, returns a list of resolutions of correct length. If
@@ -37,3 +41,229 @@ def to_res_list(res, length):
         raise TypeError(
                 "Invalid resolutions input. It should be int, tuple, or list."
         )
+
+
+def parametric_bounds(spline):
+    """Returns parametric bounds of given spline. Splines without knot
+    vectors are defined in [0, 1]^para_dim.
+
+    Parameters
+    -----------
+    spline: Spline
+
+    Returns
+    --------
+    bounds: (2, para_dim) np.ndarray
+    """
+    if not spline.has_knot_vectors:
+        return np.vstack(
+                (np.zeros(spline.para_dim), np.ones(spline.para_dim))
+        )
+
+    kvs = spline.knot_vectors
+    return np.array(
+            [[kv[0] for kv in kvs], [kv[-1] for kv in kvs]],
+            dtype=settings.FLOAT_DTYPE,
+    )
+
+
+def _change_token(spline):
+    """Returns a token that stays the same until spline changes. splinepy
+    clears `spline._data` whenever properties are set or the spline is
+    refined, which drops the token. `FFD` relies on the same behavior.
+
+    Parameters
+    -----------
+    spline: Spline
+
+    Returns
+    --------
+    token: object
+    """
+    token = spline._data.get("gustaf_change_token", None)
+    if token is None:
+        token = object()
+        spline._data["gustaf_change_token"] = token
+
+    return token
+
+
+def state(spline, properties=None):
+    """Returns a snapshot of spline's properties, which can be compared with
+    `same_state()` to check if a spline has changed. Used to invalidate
+    cached data of helpers. Control points and weights are not copied, but
+    represented by a change token. Degrees and knot vectors are small and
+    copied, so that snapshots of only those survive changes of control
+    points.
+
+    Parameters
+    -----------
+    spline: Spline
+    properties: list
+      (Optional) Default is spline.required_properties.
+
+    Returns
+    --------
+    snapshot: dict
+    """
+    if properties is None:
+        properties = spline.required_properties
+
+    snapshot = dict()
+    for p in properties:
+        if p in ("control_points", "weights"):
+            snapshot["change_token"] = _change_token(spline)
+        elif p == "knot_vectors":
+            snapshot[p] = tuple(tuple(kv) for kv in spline.knot_vectors)
+        else:
+            snapshot[p] = np.array(getattr(spline, p), copy=True)
+
+    return snapshot
+
+
+def same_state(snapshot, spline):
+    """Checks if spline still has the same properties as snapshot.
+
+    Parameters
+    -----------
+    snapshot: dict
+      from `state()`. None is never the same.
+    spline: Spline
+
+    Returns
+    --------
+    same: bool
+    """
+    if snapshot is None:
+        return False
+
+    for key, value in snapshot.items():
+        if key == "change_token":
+            if spline._data.get("gustaf_change_token", None) is not value:
+                return False
+        elif key == "knot_vectors":
+            if value != tuple(tuple(kv) for kv in spline.knot_vectors):
+                return False
+        elif not np.array_equal(value, getattr(spline, key)):
+            return False
+
+    return True
+
+
+def is_rational(spline):
+    """Checks if spline has weights.
+
+    Parameters
+    -----------
+    spline: Spline
+
+    Returns
+    --------
+    rational: bool
+    """
+    return "weights" in spline.required_properties
+
+
+def basis_matrix(spline, queries, orders=None):
+    """Returns sparse matrix of (polynomial) basis functions evaluated at
+    queries, so that `matrix @ control_points` evaluates a non-rational
+    spline. For rational splines, basis functions of the non-rational
+    counterpart are used, so weights can be applied at evaluation time:
+    `(matrix @ (weights * control_points)) / (matrix @ weights)`. See
+    `evaluate_with_basis_matrix()`.
+
+    Parameters
+    -----------
+    spline: Spline
+    queries: (n, para_dim) array-like
+    orders: (para_dim,) array-like
+      (Optional) If given, derivatives of basis functions are used.
+
+    Returns
+    --------
+    matrix: (n, n_control_points) scipy.sparse.csr_matrix
+    """
+    from scipy import sparse
+
+    polynomial = spline
+    if is_rational(spline):
+        # lazy import, as base depends on this module
+        from gustaf.spline.base import Bezier, BSpline
+
+        polynomial_type = BSpline if spline.has_knot_vectors else Bezier
+        properties = spline.todict()
+        properties.pop("weights")
+        polynomial = polynomial_type(**properties)
+
+    if orders is None:
+        basis, support = polynomial.basis_and_support(queries)
+    else:
+        basis, support = polynomial.basis_derivative_and_support(
+                queries, orders
+        )
+    n_queries, n_support = basis.shape
+    indptr = np.arange(0, basis.size + 1, n_support)
+
+    return sparse.csr_matrix(
+            (basis.ravel(), support.ravel(), indptr),
+            shape=(n_queries, len(spline.control_points)),
+    )
+
+
+def evaluate_with_basis_matrix(spline, matrix):
+    """Evaluates spline with a basis matrix from `basis_matrix()` and current
+    control points (and weights). Rational splines are evaluated in
+    homogeneous form.
+
+    Parameters
+    -----------
+    spline: Spline
+    matrix: (n, n_control_points) scipy.sparse.csr_matrix
+
+    Returns
+    --------
+    evaluated: (n, dim) np.ndarray
+    """
+    control_points = np.asarray(spline.control_points)
+    if not is_rational(spline):
+        return matrix @ control_points
+
+    weights = np.asarray(spline.weights).reshape(-1, 1)
+
+    return (matrix @ (control_points * weights)) / (matrix @ weights)
+
+
+def jacobians_with_basis_matrices(spline, matrix, derivative_matrices):
+    """Evaluates jacobians of spline with basis matrices from
+    `basis_matrix()`. Rational splines use quotient rule of homogeneous
+    form.
+
+    Parameters
+    -----------
+    spline: Spline
+    matrix: (n, n_control_points) scipy.sparse.csr_matrix
+    derivative_matrices: list
+      (para_dim,) list of first derivative basis matrices.
+
+    Returns
+    --------
+    jacobians: (n, dim, para_dim) np.ndarray
+    """
+    control_points = np.asarray(spline.control_points)
+    if not is_rational(spline):
+        return np.stack(
+                [dm @ control_points for dm in derivative_matrices], axis=-1
+        )
+
+    weights = np.asarray(spline.weights).reshape(-1, 1)
+    weighted = control_points * weights
+    denominator = matrix @ weights
+    evaluated = (matrix @ weighted) / denominator
+
+    return np.stack(
+            [
+                    (dm @ weighted - evaluated * (dm @ weights)) / denominator
+                    for dm in derivative_matrices
+            ],
+            axis=-1,
+    )
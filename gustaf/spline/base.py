@@ -272,6 +272,27 @@ class GustafSpline(GustafBase):
         """
         pass
 
+    def _helper(self, name, helper_type):
+        """Returns helper saved as attribute `name`. Helpers are only created
+        on first access, as most splines, for example extracted or composed
+        Bezier patches, never use them.
+
+        Parameters
+        -----------
+        name: str
+        helper_type: type
+
+        Returns
+        --------
+        helper: Extractor or Creator or Proximity
+        """
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            helper = helper_type(self)
+            setattr(self, name, helper)
+            return helper
+
     @property
     def extract(self):
         """Returns spline extracter. Can directly perform extractions available
@@ -290,7 +311,7 @@ class GustafSpline(GustafBase):
         --------
         spline_extracter: Extracter
         """
-        return self._extractor
+        return self._helper("_extractor", Extractor)
 
     @property
     def create(self):
@@ -308,7 +329,7 @@ class GustafSpline(GustafBase):
         Returns
         spline.Creator
         """
-        return self._creator
+        return self._helper("_creator", Creator)
 
     @property
     def proximity(self):
@@ -333,7 +354,7 @@ class GustafSpline(GustafBase):
         --------
         spline_proximity: Proximity
         """
-        return self._proximity
+        return self._helper("_proximity", Proximity)
 
     def show(self, **kwargs):
         """Equivalent to `gustaf.spline.base.show(**kwrags)`"""
@@ -345,8 +366,27 @@ class GustafSpline(GustafBase):
         return show(self, return_showable=True, **kwargs)
 
     def copy(self):
-        """"""
-        return type(self)(**self.todict())
+        """Returns a copy of the spline. Required properties are copied and
+        passed directly to the constructor, without a detour over `todict()`.
+        Helpers of the copy are created on first access.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        copied: type(self)
+        """
+        properties = dict()
+        for p in self.required_properties:
+            value = getattr(self, p)
+            if p == "knot_vectors":
+                properties[p] = [list(kv) for kv in value]
+            else:
+                properties[p] = np.array(value, copy=True)
+
+        return type(self)(**properties)
 
 
 class Bezier(GustafSpline, splinepy.Bezier):
@@ -378,10 +418,6 @@ class Bezier(GustafSpline, splinepy.Bezier):
                 degrees=degrees, control_points=control_points, spline=spline
         )
 
-        self._extractor = Extractor(self)
-        self._proximity = Proximity(self)
-        self._creator = Creator(self)
-
     @property
     def bezier(self):
         """Returns same parametric representation as Bezier Spline.
@@ -485,10 +521,6 @@ class RationalBezier(GustafSpline, splinepy.RationalBezier):
                 spline=spline,
         )
 
-        self._extractor = Extractor(self)
-        self._proximity = Proximity(self)
-        self._creator = Creator(self)
-
     @property
     def rationalbezier(self):
         """Returns same parametric representation as Rational Bezier Spline.
@@ -560,10 +592,6 @@ class BSpline(GustafSpline, splinepy.BSpline):
                 spline=spline,
         )
 
-        self._extractor = Extractor(self)
-        self._proximity = Proximity(self)
-        self._creator = Creator(self)
-
     @property
     def bspline(self):
         """Returns same parametric representation as BSpline.
@@ -657,10 +685,6 @@ class NURBS(GustafSpline, splinepy.NURBS):
                 spline=spline,
         )
 
-        self._extractor = Extractor(self)
-        self._proximity = Proximity(self)
-        self._creator = Creator(self)
-
     @property
     def _mfem_ids(self):
         """Returns mfem index mapping. For ease of use.
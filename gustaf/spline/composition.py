@@ -0,0 +1,304 @@
+"""gustaf/spline/composition.py.
+
+Batched composition of Bezier patches. Composing an outer Bezier with an
+inner (polynomial) Bezier is linear in outer control points. The linear
+map is a matrix of Bernstein coefficients of the outer basis functions,
+evaluated at the inner patch. It only depends on the degrees and the
+inner control points, so it is computed once per inner patch and applied to
+any number of outer patches with one tensor contraction.
+"""
+
+from functools import lru_cache
+from math import factorial
+
+import numpy as np
+
+
+def _comb(n, k):
+    """Returns binomial coefficient. Same as `math.comb`, which needs python
+    3.8.
+
+    Parameters
+    ----------
+    n : int
+    k : int
+
+    Returns
+    -------
+    binomial : int
+    """
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+@lru_cache(maxsize=64)
+def _binomials(degrees):
+    """Returns tensor product of binomial coefficients of given degrees.
+
+    Parameters
+    ----------
+    degrees : tuple
+
+    Returns
+    -------
+    binomials : np.ndarray
+      shape is (degrees + 1)
+    """
+    binomials = np.ones([d + 1 for d in degrees])
+    for i, d in enumerate(degrees):
+        shape = [1] * len(degrees)
+        shape[i] = d + 1
+        binomials = binomials * np.array(
+                [_comb(d, i) for i in range(d + 1)], dtype=np.float64
+        ).reshape(shape)
+
+    binomials.flags.writeable = False
+
+    return binomials
+
+
+def bernstein_basis(degrees, queries):
+    """Returns tensor product Bernstein basis functions at queries, first
+    parametric dimension fastest.
+
+    Parameters
+    ----------
+    degrees : (m,) array-like
+    queries : (n, m) array-like
+
+    Returns
+    -------
+    basis : (n, prod(degrees + 1)) np.ndarray
+    """
+    queries = np.asarray(queries, dtype=np.float64)
+    n_queries = len(queries)
+
+    basis = np.ones((n_queries, 1))
+    for i, d in enumerate(degrees):
+        d = int(d)
+        k = np.arange(d + 1)
+        q = queries[:, i:i + 1]
+        basis_1d = _binomials((d, )) * q**k * (1. - q)**(d - k)
+        basis = (basis_1d[:, :, np.newaxis] * basis[:, np.newaxis, :]
+                 ).reshape(n_queries, -1)
+
+    return basis
+
+
+def _multiply(a, b):
+    """Multiplies batched, tensor product Bernstein polynomials. Coefficient
+    arrays have a leading batch axis, followed by one axis per parametric
+    dimension.
+
+    Parameters
+    ----------
+    a : np.ndarray
+    b : np.ndarray
+
+    Returns
+    -------
+    product : np.ndarray
+    """
+    a_degrees = tuple(s - 1 for s in a.shape[1:])
+    b_degrees = tuple(s - 1 for s in b.shape[1:])
+    degrees = tuple(i + j for i, j in zip(a_degrees, b_degrees))
+
+    # product of scaled coefficients is a plain convolution
+    scaled_a = a * _binomials(a_degrees)
+    scaled_b = b * _binomials(b_degrees)
+    product = np.zeros(
+            (max(len(a), len(b)), *[d + 1 for d in degrees]),
+            dtype=np.float64,
+    )
+    for index in np.ndindex(*a.shape[1:]):
+        target = (slice(None), ) + tuple(
+                slice(i, i + s) for i, s in zip(index, b.shape[1:])
+        )
+        product[target] += scaled_a[(slice(None), ) + index][
+                (...,) + (np.newaxis,) * len(index)] * scaled_b
+
+    return product / _binomials(degrees)
+
+
+def _to_tensor(control_points, degrees):
+    """Reshapes (n, n_cps) control point values, first parametric dimension
+    fastest, to (n, degrees[0] + 1, degrees[1] + 1, ...).
+
+    Parameters
+    ----------
+    control_points : np.ndarray
+    degrees : array-like
+
+    Returns
+    -------
+    tensor : np.ndarray
+    """
+    n = len(control_points)
+    para_dim = len(degrees)
+    tensor = control_points.reshape(n, *[d + 1 for d in degrees[::-1]])
+
+    return tensor.transpose(0, *range(para_dim, 0, -1))
+
+
+def _from_tensor(tensor):
+    """Inverse of `_to_tensor()`.
+
+    Parameters
+    ----------
+    tensor : np.ndarray
+
+    Returns
+    -------
+    control_points : np.ndarray
+    """
+    para_dim = tensor.ndim - 1
+
+    return tensor.transpose(0, *range(para_dim, 0, -1)).reshape(
+            len(tensor), -1
+    )
+
+
+def composed_degrees(outer_degrees, inner_degrees):
+    """Returns degrees of composition.
+
+    Parameters
+    ----------
+    outer_degrees : (n,) array-like
+    inner_degrees : (m,) array-like
+
+    Returns
+    -------
+    degrees : (m,) np.ndarray
+    """
+    return np.asarray(inner_degrees) * np.sum(outer_degrees)
+
+
+def composition_matrices(outer_degrees, inner_degrees, inner_control_points):
+    """Returns matrices that map outer control points to control points of
+    the composition, for each inner patch.
+
+    Parameters
+    ----------
+    outer_degrees : (n,) array-like
+      n equals dim of inner patches
+    inner_degrees : (m,) array-like
+    inner_control_points : (n_inner, n_inner_cps, n) np.ndarray
+      polynomial inner patches of same degrees, within unit cube
+
+    Returns
+    -------
+    matrices : (n_inner, n_composed_cps, n_outer_cps) np.ndarray
+    """
+    outer_degrees = [int(d) for d in outer_degrees]
+    inner_degrees = [int(d) for d in inner_degrees]
+    inner_control_points = np.asarray(inner_control_points, dtype=np.float64)
+    if inner_control_points.ndim == 2:
+        inner_control_points = inner_control_points[np.newaxis]
+
+    if inner_control_points.shape[2] != len(outer_degrees):
+        raise ValueError(
+                "Dimension of inner patches must match parametric dimension "
+                "of outer patches."
+        )
+
+    n_inner = len(inner_control_points)
+    ones = np.ones((n_inner, *[1] * len(inner_degrees)))
+
+    # composed basis functions, first outer dimension fastest
+    composed = [ones]
+    for i_dim, p in enumerate(outer_degrees):
+        g = _to_tensor(inner_control_points[..., i_dim], inner_degrees)
+
+        # powers of g and (1 - g)
+        g_powers = [ones]
+        h_powers = [ones]
+        for _ in range(p):
+            g_powers.append(_multiply(g_powers[-1], g))
+            h_powers.append(_multiply(h_powers[-1], 1. - g))
+
+        basis = [
+                _comb(p, i) * _multiply(g_powers[i], h_powers[p - i])
+                for i in range(p + 1)
+        ]
+        composed = [_multiply(c, b) for b in basis for c in composed]
+
+    return np.stack([_from_tensor(c) for c in composed], axis=-1)
+
+
+def compose(
+        outer_degrees,
+        outer_control_points,
+        inner_degrees,
+        inner_control_points,
+        outer_weights=None,
+        inner_ids=None,
+):
+    """Composes many outer Bezier patches of same degrees with polynomial
+    inner Bezier patches of same degrees. Composition matrices are computed
+    once per inner patch and applied with one tensor contraction.
+
+    Parameters
+    ----------
+    outer_degrees : (n,) array-like
+    outer_control_points : (n_outer, n_outer_cps, dim) np.ndarray
+    inner_degrees : (m,) array-like
+    inner_control_points : (n_inner, n_inner_cps, n) np.ndarray
+    outer_weights : (n_outer, n_outer_cps) or (n_outer, n_outer_cps, 1)
+      np.ndarray
+      (Optional) for rational outer patches
+    inner_ids : (n_outer,) array-like
+      (Optional) inner patch of each outer patch. If None, n_inner should
+      be either 1 or n_outer.
+
+    Returns
+    -------
+    degrees : (m,) np.ndarray
+    control_points : (n_outer, n_composed_cps, dim) np.ndarray
+    weights : (n_outer, n_composed_cps, 1) np.ndarray
+      None, if outer patches are polynomial
+    """
+    outer_control_points = np.asarray(outer_control_points, dtype=np.float64)
+    n_outer = len(outer_control_points)
+
+    matrices = composition_matrices(
+            outer_degrees, inner_degrees, inner_control_points
+    )
+    if inner_ids is None:
+        if len(matrices) not in (1, n_outer):
+            raise ValueError(
+                    "Number of inner patches must be 1 or same as outer "
+                    "patches, if inner_ids are not given."
+            )
+        inner_ids = np.zeros(n_outer, dtype=np.int64) if len(
+                matrices
+        ) == 1 else np.arange(n_outer)
+    inner_ids = np.asarray(inner_ids)
+
+    # rational patches are composed in homogeneous coordinates
+    weights = None
+    if outer_weights is not None:
+        outer_weights = np.asarray(outer_weights, dtype=np.float64).reshape(
+                n_outer, -1, 1
+        )
+        outer_control_points = np.concatenate(
+                (outer_control_points * outer_weights, outer_weights),
+                axis=2,
+        )
+
+    if len(matrices) == 1:
+        control_points = np.einsum(
+                "ro,pod->prd", matrices[0], outer_control_points
+        )
+    else:
+        control_points = np.einsum(
+                "pro,pod->prd", matrices[inner_ids], outer_control_points
+        )
+
+    if outer_weights is not None:
+        weights = control_points[..., -1:]
+        control_points = control_points[..., :-1] / weights
+
+    return (
+            composed_degrees(outer_degrees, inner_degrees),
+            control_points,
+            weights,
+    )
@@ -4,17 +4,24 @@ Extract operations. Both discrete and spline extraction.
 """
 
 import itertools
+from collections import OrderedDict
+from importlib.util import find_spec
 
 import numpy as np
 
+from gustaf import settings
 from gustaf import utils
+from gustaf.create.vertices import raster
 from gustaf.vertices import Vertices
 from gustaf.edges import Edges
 from gustaf.faces import Faces
 from gustaf.volumes import Volumes
 
+from gustaf.spline import _utils
 from gustaf.spline._utils import to_res_list
 
+_has_scipy = find_spec("scipy") is not None
+
 
 def edges(
         spline,
@@ -376,33 +383,264 @@ def control_mesh(spline, ):
         )
 
 
-def beziers(spline):
-    """Extracts Bezier-type objects of any spline-type object.
+def _knot_insertion_matrix(knot_vector, degree, knots):
+    """Returns matrix that maps control points to control points after
+    inserting knots, using Boehm's algorithm on the identity.
+
+    Parameters
+    -----------
+    knot_vector: list
+    degree: int
+    knots: list
+      knots to insert, within the parametric bounds
+
+    Returns
+    --------
+    refined_knot_vector: list
+    matrix: (n_refined, n) np.ndarray
+    """
+    knot_vector = [float(k) for k in knot_vector]
+    matrix = np.eye(len(knot_vector) - degree - 1)
+    for knot in sorted(knots):
+        span = int(np.searchsorted(knot_vector, knot, side="right")) - 1
+        refined = np.empty((len(matrix) + 1, matrix.shape[1]))
+        refined[:span - degree + 1] = matrix[:span - degree + 1]
+        refined[span + 1:] = matrix[span:]
+        for i in range(span - degree + 1, span + 1):
+            alpha = (knot - knot_vector[i]) / (
+                    knot_vector[i + degree] - knot_vector[i]
+            )
+            refined[i] = alpha * matrix[i] + (1. - alpha) * matrix[i - 1]
+
+        knot_vector.insert(span + 1, float(knot))
+        matrix = refined
+
+    return knot_vector, matrix
+
+
+def bezier_extraction_operators(spline, knots=None):
+    """Returns Bezier extraction operators of each parametric dimension. They
+    only depend on degrees and knot vectors, so control points of Bezier
+    patches can be recomputed with `bezier_control_points()`, whenever only
+    control points (or weights) change.
+
+    Parameters
+    -----------
+    spline: Spline
+      with clamped knot vectors
+    knots: list
+      (Optional) (para_dim,) list of knots to insert before extraction,
+      for example to split knot spans.
+
+    Returns
+    --------
+    operators: list
+      (n_elements * (degree + 1), n_control_points) np.ndarray per
+      parametric dimension. Element-wise blocks of rows map control points
+      to control points of Bezier patches.
+    unique_knots: list
+      (n_elements + 1,) np.ndarray per parametric dimension
+    """
+    if knots is None:
+        knots = [[]] * spline.para_dim
+
+    operators = []
+    unique_knots = []
+    for i_pd, degree in enumerate(spline.degrees):
+        degree = int(degree)
+        if spline.has_knot_vectors:
+            knot_vector = list(spline.knot_vectors[i_pd])
+        else:
+            knot_vector = [0.] * (degree + 1) + [1.] * (degree + 1)
+
+        if (len(set(knot_vector[:degree + 1])) != 1
+                or len(set(knot_vector[-degree - 1:])) != 1):
+            raise ValueError(
+                    "Bezier extraction requires clamped knot vectors."
+            )
+
+        # first, insert requested knots. then, raise multiplicity of all
+        # interior knots to degree
+        knot_vector, matrix = _knot_insertion_matrix(
+                knot_vector, degree, knots[i_pd]
+        )
+        unique, counts = np.unique(
+                knot_vector[degree + 1:-degree - 1], return_counts=True
+        )
+        _, extraction = _knot_insertion_matrix(
+                knot_vector,
+                degree,
+                np.repeat(unique, np.maximum(degree - counts, 0)),
+        )
+        matrix = extraction @ matrix
+
+        # repeat shared control points of neighboring elements
+        n_elements = len(unique) + 1
+        rows = (
+                np.arange(n_elements).reshape(-1, 1) * degree
+                + np.arange(degree + 1)
+        ).ravel()
+        operators.append(matrix[rows])
+        unique_knots.append(
+                np.concatenate(([knot_vector[0]], unique, [knot_vector[-1]]))
+        )
+
+    return operators, unique_knots
+
+
+def _control_point_tensor(matrices, control_points):
+    """Applies a matrix to control points along each parametric dimension.
+
+    Parameters
+    -----------
+    matrices: list
+      (n_new, n) np.ndarray per parametric dimension
+    control_points: (prod(n), dim) np.ndarray
+      first parametric dimension fastest
+
+    Returns
+    --------
+    tensor: (n_new[-1], ..., n_new[0], dim) np.ndarray
+    """
+    para_dim = len(matrices)
+    tensor = control_points.reshape(
+            *[m.shape[1] for m in matrices[::-1]], control_points.shape[1]
+    )
+    for i_pd, matrix in enumerate(matrices):
+        axis = para_dim - 1 - i_pd
+        tensor = np.moveaxis(
+                np.tensordot(matrix, tensor, axes=([1], [axis])), 0, axis
+        )
+
+    return tensor
+
+
+def bezier_control_points(operators, degrees, control_points):
+    """Applies Bezier extraction operators to control points, one parametric
+    dimension at a time. Patches and their control points are ordered with
+    first parametric dimension fastest.
+
+    Parameters
+    -----------
+    operators: list
+      from `bezier_extraction_operators()`
+    degrees: (para_dim,) array-like
+    control_points: (n, dim) np.ndarray
+      or homogeneous control points of rational splines
+
+    Returns
+    --------
+    bezier_control_points: (n_patches, n_bezier_control_points, dim)
+      np.ndarray
+    """
+    para_dim = len(operators)
+    degrees = [int(d) for d in degrees]
+    control_points = np.asarray(control_points, dtype=np.float64)
+    dim = control_points.shape[1]
+
+    tensor = _control_point_tensor(operators, control_points)
+
+    # split element and local control point axes
+    n_elements = [
+            len(op) // (d + 1) for op, d in zip(operators, degrees)
+    ]
+    split = []
+    for n_e, d in zip(n_elements[::-1], degrees[::-1]):
+        split.extend([n_e, d + 1])
+    tensor = tensor.reshape(*split, dim).transpose(
+            *range(0, 2 * para_dim, 2),
+            *range(1, 2 * para_dim, 2),
+            2 * para_dim,
+    )
+
+    return tensor.reshape(
+            int(np.prod(n_elements)), int(np.prod(np.add(degrees, 1))), dim
+    )
+
+
+def bezier_patches(spline, operators=None):
+    """Returns stacked control points (and weights) of Bezier patches.
+
+    Parameters
+    -----------
+    spline: Spline
+    operators: list
+      (Optional) from `bezier_extraction_operators()`
+
+    Returns
+    --------
+    control_points: (n_patches, n_bezier_control_points, dim) np.ndarray
+    weights: (n_patches, n_bezier_control_points, 1) np.ndarray
+      None, if spline is polynomial
+    """
+    if operators is None:
+        operators, _ = bezier_extraction_operators(spline)
+
+    control_points = np.asarray(spline.control_points, dtype=np.float64)
+    if not _utils.is_rational(spline):
+        return bezier_control_points(
+                operators, spline.degrees, control_points
+        ), None
+
+    # rational splines are extracted in homogeneous coordinates
+    weights = np.asarray(spline.weights, dtype=np.float64).reshape(-1, 1)
+    homogeneous = bezier_control_points(
+            operators,
+            spline.degrees,
+            np.hstack((control_points * weights, weights)),
+    )
+    weights = homogeneous[..., -1:]
+
+    return homogeneous[..., :-1] / weights, weights
+
+
+def beziers(spline, multipatch=False):
+    """Extracts Bezier-type objects of any spline-type object. Extraction
+    operators and Bezier control points are saved in `spline.extract`, until
+    the spline changes.
 
   Parameters
   ----------
   spline : Gustaf-Spline
+  multipatch : bool
+    Default is False. If True, returns MultiPatch.
 
   Returns
   -------
-  bezier_list : list<bezier-types>
+  bezier_list : list<bezier-types> or MultiPatch
   """
     from gustaf.spline.base import Bezier, RationalBezier
 
-    if "Bezier" in spline.whatami:
+    if "Bezier" in spline.whatami and not multipatch:
         return [spline]
-    elif "BSpline" in spline.whatami:
-        return [
-                Bezier(**s.todict())
-                for s in super(type(spline), spline).extract_bezier_patches()
-        ]
-    elif "NURBS" in spline.whatami:
+    elif not any(t in spline.whatami for t in ("Bezier", "BSpline", "NURBS")):
+        raise TypeError("Unknown Spline-Type.")
+
+    control_points, weights = spline.extract._bezier_patches()
+    degrees = np.asarray(spline.degrees)
+
+    if multipatch:
+        from gustaf.spline.multipatch import MultiPatch
+
+        return MultiPatch.from_stacked(
+                degrees,
+                control_points.copy(),
+                None if weights is None else weights.copy(),
+        )
+
+    if weights is None:
         return [
-                RationalBezier(**s.todict())
-                for s in super(type(spline), spline).extract_bezier_patches()
+                Bezier(degrees=degrees, control_points=cps)
+                for cps in control_points
         ]
-    else:
-        raise TypeError("Unknown Spline-Type.")
+
+    return [
+            RationalBezier(
+                    degrees=degrees,
+                    control_points=cps,
+                    weights=w,
+            ) for cps, w in zip(control_points, weights)
+    ]
 
 
 def spline(spline, para_dim, split_plane):
@@ -449,58 +687,272 @@ def spline(spline, para_dim, split_plane):
         # Convert float to tuple to facilitate
         split_plane = list([split_plane])
 
-    # Check if is bezier-type
-    is_bezier = "Bezier" in spline.whatami
-    is_rational = "weights" in spline.required_properties
-    if is_bezier:
-        if is_rational:
-            spline_copy = spline.nurbs
-        else:
-            spline_copy = spline.bspline
-    else:
-        spline_copy = spline.copy()
-
-    for _ in range(spline_copy.degrees[para_dim]):
-        # Will do nothing if spline already has sufficient number of knots
-        # at given position
-        spline_copy.insert_knots(para_dim, split_plane)
-
-    # Start extraction
-    cps_res = spline_copy.control_mesh_resolutions
-    start_id = spline_copy.knot_vectors[para_dim].index(split_plane[0])
-    end_id = spline_copy.knot_vectors[para_dim].index(split_plane[-1])
-    para_dim_ids = np.arange(np.prod(cps_res))
-    for i_pd in range(para_dim):
-        para_dim_ids -= para_dim_ids % cps_res[i_pd]
-        para_dim_ids = para_dim_ids // cps_res[i_pd]
-    # indices are shifted by one
-    para_dim_ids = para_dim_ids % cps_res[para_dim] + 1
-
-    # Return new_spline
-    spline_info = {}
-    spline_info["control_points"] = spline_copy.cps[(para_dim_ids >= start_id)
-                                                    & (para_dim_ids <= end_id)]
-    spline_info["degrees"] = spline_copy.degrees.tolist()
-    if start_id == end_id:
-        spline_info["degrees"].pop(para_dim)
-    if not is_bezier:
-        spline_info["knot_vectors"] = spline_copy.knot_vectors.copy()
-        if start_id == end_id:
-            spline_info["knot_vectors"].pop(para_dim)
-        else:
-            spline_info["knot_vectors"][para_dim] = (
-                    [spline_copy.knot_vectors[para_dim][start_id]]
-                    + spline_copy.knot_vectors[para_dim]
-                    [start_id:(end_id + spline_copy.degrees[para_dim])] + [
-                            spline_copy.knot_vectors[para_dim]
-                            [(end_id + spline_copy.degrees[para_dim] - 1)]
-                    ]
+    box = _utils.parametric_bounds(spline)
+    box[:, para_dim] = split_plane[0], split_plane[-1]
+
+    return subsplines(spline, [box])[0]
+
+
+def subsplines(spline, boxes):
+    """Extracts many subsplines from parametric sub-boxes at once. Knots of
+    all box bounds are inserted in a single refinement per parametric
+    dimension, then each subspline is a slice of the refined control point
+    grid. Parametric dimensions, where lower and upper bound of a box are
+    equal, are dropped.
+
+    Parameters
+    -----------
+    spline: Spline
+      with clamped knot vectors
+    boxes: (n, 2, para_dim) array-like
+      lower and upper bounds of each box. Knots of other boxes' bounds,
+      that are within a box, remain in its subspline.
+
+    Returns
+    --------
+    subsplines: list
+      splines of same type as spline. Subsplines of Bezier types, that hold
+      knots of other boxes, are BSpline or NURBS on the unit parametric
+      domain.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(
+            -1, 2, spline.para_dim
+    )
+    bounds = _utils.parametric_bounds(spline)
+    tolerance = settings.TOLERANCE
+    if np.any(boxes[:, 0] > boxes[:, 1]) or np.any(
+            boxes < bounds[0] - tolerance
+    ) or np.any(boxes > bounds[1] + tolerance):
+        raise ValueError(
+                "Boxes must have lower <= upper bounds and be within "
+                "parametric bounds of the spline."
+        )
+    boxes = np.clip(boxes, bounds[0], bounds[1])
+
+    # insert all box bounds up to multiplicity of degree
+    degrees = [int(d) for d in spline.degrees]
+    knot_vectors = []
+    matrices = []
+    for i_pd, degree in enumerate(degrees):
+        if spline.has_knot_vectors:
+            knot_vector = np.asarray(
+                    spline.knot_vectors[i_pd], dtype=np.float64
             )
+        else:
+            knot_vector = np.repeat([0., 1.], degree + 1)
+
+        box_knots = np.unique(boxes[:, :, i_pd])
+        box_knots = box_knots[(box_knots > knot_vector[0])
+                              & (box_knots < knot_vector[-1])]
+        multiplicities = np.searchsorted(
+                knot_vector, box_knots, side="right"
+        ) - np.searchsorted(knot_vector, box_knots, side="left")
+        knot_vector, matrix = _knot_insertion_matrix(
+                knot_vector,
+                degree,
+                np.repeat(box_knots, np.maximum(degree - multiplicities, 0)),
+        )
+        knot_vectors.append(np.asarray(knot_vector))
+        matrices.append(matrix)
+
+    control_points = np.asarray(spline.control_points, dtype=np.float64)
+    is_rational = _utils.is_rational(spline)
     if is_rational:
-        spline_info["weights"] = spline_copy.weights[
-                (para_dim_ids >= start_id) & (para_dim_ids <= end_id)]
+        weights = np.asarray(spline.weights, dtype=np.float64).reshape(-1, 1)
+        control_points = np.hstack((control_points * weights, weights))
+    tensor = _control_point_tensor(matrices, control_points)
+
+    subspline_list = []
+    for lower, upper in boxes:
+        slices = [None] * spline.para_dim
+        properties = dict(degrees=[], control_points=None, knot_vectors=[])
+        has_interior_knots = False
+
+        for i_pd, (kv, degree) in enumerate(zip(knot_vectors, degrees)):
+            axis = spline.para_dim - 1 - i_pd
+            first = int(np.searchsorted(kv, lower[i_pd], side="right"))
+            first = min(first - degree - 1, tensor.shape[axis] - 1)
+            if lower[i_pd] == upper[i_pd]:
+                slices[axis] = first
+                continue
+
+            last = int(np.searchsorted(kv, upper[i_pd], side="left")) - 1
+            slices[axis] = slice(first, last + 1)
+            properties["degrees"].append(degree)
+            interior = kv[(kv > lower[i_pd]) & (kv < upper[i_pd])]
+            has_interior_knots |= len(interior) != 0
+            properties["knot_vectors"].append(
+                    [lower[i_pd]] * (degree + 1) + interior.tolist()
+                    + [upper[i_pd]] * (degree + 1)
+            )
+
+        if len(properties["degrees"]) == 0:
+            raise ValueError("Boxes must not be points.")
+
+        sub_tensor = tensor[tuple(slices)]
+        sub_control_points = sub_tensor.reshape(-1, sub_tensor.shape[-1])
+        if is_rational:
+            properties["weights"] = sub_control_points[:, -1:].copy()
+            sub_control_points = (
+                    sub_control_points[:, :-1] / properties["weights"]
+            )
+        properties["control_points"] = np.ascontiguousarray(
+                sub_control_points
+        )
+
+        spline_type = type(spline)
+        if not spline.has_knot_vectors:
+            sub_knot_vectors = properties.pop("knot_vectors")
+            if has_interior_knots:
+                from gustaf.spline.base import BSpline, NURBS
+
+                # bezier can't hold knots of other boxes. keep unit domain
+                spline_type = NURBS if is_rational else BSpline
+                properties["knot_vectors"] = [
+                        ((np.asarray(kv) - kv[0]) / (kv[-1] - kv[0])).tolist()
+                        for kv in sub_knot_vectors
+                ]
+        subspline_list.append(spline_type(**properties))
+
+    return subspline_list
+
+
+def split(spline, knots):
+    """Splits spline into a grid of subsplines at given knots. Subsplines are
+    ordered with first parametric dimension fastest.
+
+    Parameters
+    -----------
+    spline: Spline
+    knots: list
+      (para_dim,) list of knots to split at. Empty list to not split
+
+    Returns
+    --------
+    subsplines: list
+    """
+    bounds = _utils.parametric_bounds(spline)
+    intervals = []
+    for i_pd in range(spline.para_dim):
+        splits = np.unique(
+                np.concatenate(([bounds[0, i_pd]], knots[i_pd],
+                                [bounds[1, i_pd]]))
+        )
+        intervals.append(np.vstack((splits[:-1], splits[1:])).T)
+
+    grid = np.meshgrid(
+            *[np.arange(len(i)) for i in intervals], indexing="ij"
+    )
+    ids = np.column_stack([g.ravel(order="F") for g in grid])
+    boxes = np.stack(
+            [intervals[i_pd][ids[:, i_pd]] for i_pd in range(spline.para_dim)],
+            axis=-1,
+    )
 
-    return type(spline)(**spline_info)
+    return subsplines(spline, boxes)
+
+
+class _QueryRecorder:
+    """Wraps a spline and records parametric queries of all evaluations, so
+    that vertices of a discrete extraction can be traced back to their
+    parametric coordinates. Samples are evaluated at raster points.
+    """
+
+    def __init__(self, spl):
+        self._spline = spl
+        self._queries = []
+        self._evaluated = []
+
+    def __getattr__(self, name):
+        return getattr(self._spline, name)
+
+    def evaluate(self, queries):
+        queries = np.asarray(queries, dtype=np.float64)
+        evaluated = np.asarray(self._spline.evaluate(queries))
+        self._queries.append(queries)
+        self._evaluated.append(evaluated)
+
+        return evaluated
+
+    def sample(self, resolutions):
+        return self.evaluate(
+                raster(
+                        _utils.parametric_bounds(self._spline),
+                        to_res_list(resolutions, self._spline.para_dim),
+                ).vertices
+        )
+
+    @property
+    def evaluated(self):
+        """Returns True, if anything was evaluated."""
+        return len(self._queries) != 0
+
+    def vertex_queries(self, vertices):
+        """Returns parametric queries of given vertices, which are all
+        evaluated points or a subset of them, for example after merging.
+        Vertices are matched within tolerance, using `utils.arr.close_rows`.
+
+        Parameters
+        -----------
+        vertices: (n, dim) np.ndarray
+
+        Returns
+        --------
+        queries: (n, para_dim) np.ndarray
+          None, if nothing was evaluated, a vertex was not evaluated or
+          evaluated points of distinct queries were merged into a vertex,
+          for example at degenerate or closed geometry.
+        """
+        if not self.evaluated:
+            return None
+
+        queries = np.vstack(self._queries)
+        evaluated = np.vstack(self._evaluated)
+        vertices = np.asarray(vertices, dtype=settings.FLOAT_DTYPE)
+        if np.array_equal(vertices, evaluated):
+            return queries
+
+        # evaluated points come first, so their ids represent their groups
+        n_evaluated = len(evaluated)
+        _, unique_ids, inverse, _ = utils.arr.close_rows(
+                np.vstack((evaluated, vertices))
+        )
+        evaluated_groups = inverse[:n_evaluated]
+        vertex_groups = inverse[n_evaluated:]
+        ids = unique_ids[vertex_groups]
+        if np.any(ids >= n_evaluated):
+            return None
+
+        used = np.isin(evaluated_groups, vertex_groups)
+        if not np.allclose(
+                queries[used],
+                queries[unique_ids[evaluated_groups[used]]],
+                atol=settings.TOLERANCE,
+        ):
+            return None
+
+        return queries[ids]
+
+
+def _hashable(value):
+    """Converts (nested) arguments into a hashable key.
+
+    Parameters
+    -----------
+    value: object
+
+    Returns
+    --------
+    key: object
+    """
+    if isinstance(value, np.ndarray):
+        return (value.shape, tuple(value.ravel().tolist()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+
+    return value
 
 
 class Extractor:
@@ -515,15 +967,154 @@ class Extractor:
 
     def __init__(self, spl):
         self._spline = spl
+        self._bezier_operators_cache = None
+        self._bezier_patches_cache = None
+        self._discrete_cache = OrderedDict()
+        self._discrete_cache_size = 8
+
+    def _discrete(self, extraction, *args, **kwargs):
+        """Returns a copy of a discrete extraction, which is saved per
+        extraction and arguments. If only control points or weights change,
+        vertices of the saved extraction are updated with a saved basis
+        matrix. Any other change creates it again, as does any change of
+        extractions that merged points of distinct parametric queries. The
+        least recently used extractions are removed first.
+
+        Parameters
+        -----------
+        extraction: callable
+          for example, `faces`
+        *args
+        **kwargs
+          will be passed to extraction
+
+        Returns
+        --------
+        discrete: Vertices or Edges or Faces or Volumes
+        """
+        spl = self._spline
+        key = (extraction.__name__, _hashable(args), _hashable(kwargs))
+
+        saved = self._discrete_cache.get(key, None)
+        if saved is not None and _utils.same_state(saved["structure"], spl):
+            self._discrete_cache.move_to_end(key)
+            if _utils.same_state(saved["state"], spl):
+                return saved["discrete"].copy()
+
+            if saved["control_points"]:
+                saved["discrete"].vertices = spl.control_points
+                saved["state"] = _utils.state(spl)
+                return saved["discrete"].copy()
+
+            if saved["queries"] is not None:
+                if saved["matrix"] is None:
+                    saved["matrix"] = _utils.basis_matrix(
+                            spl, saved["queries"]
+                    )
+                saved["discrete"].vertices = (
+                        _utils.evaluate_with_basis_matrix(
+                                spl, saved["matrix"]
+                        )
+                )
+                saved["state"] = _utils.state(spl)
+                return saved["discrete"].copy()
+
+        structure = ["degrees"]
+        if spl.has_knot_vectors:
+            structure.append("knot_vectors")
+
+        recorder = _QueryRecorder(spl)
+        discrete = extraction(recorder, *args, **kwargs)
+
+        # basis matrices and matching of vertices need scipy. without,
+        # extraction is created again on any change
+        queries = None
+        if _has_scipy and recorder.evaluated:
+            queries = recorder.vertex_queries(discrete.vertices)
+        self._discrete_cache[key] = dict(
+                structure=_utils.state(spl, structure),
+                state=_utils.state(spl),
+                discrete=discrete,
+                control_points=not recorder.evaluated,
+                queries=queries,
+                matrix=None,
+        )
+        while len(self._discrete_cache) > self._discrete_cache_size:
+            self._discrete_cache.popitem(last=False)
+
+        return discrete.copy()
+
+    def _bezier_operators(self):
+        """Returns Bezier extraction operators. Saved until degrees or knot
+        vectors change.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        operators: list
+        unique_knots: list
+        """
+        cache = self._bezier_operators_cache
+        if cache is not None and _utils.same_state(
+                cache["state"], self._spline
+        ):
+            return cache["operators"], cache["unique_knots"]
+
+        properties = ["degrees"]
+        if self._spline.has_knot_vectors:
+            properties.append("knot_vectors")
+        state = _utils.state(self._spline, properties)
+        operators, unique_knots = bezier_extraction_operators(self._spline)
+        self._bezier_operators_cache = dict(
+                state=state,
+                operators=operators,
+                unique_knots=unique_knots,
+        )
+
+        return operators, unique_knots
+
+    def _bezier_patches(self):
+        """Returns stacked control points and weights of Bezier patches.
+        Saved until spline changes. If only control points or weights
+        change, saved extraction operators are reused.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        control_points: (n_patches, n_bezier_control_points, dim) np.ndarray
+        weights: (n_patches, n_bezier_control_points, 1) np.ndarray
+        """
+        cache = self._bezier_patches_cache
+        if cache is not None and _utils.same_state(
+                cache["state"], self._spline
+        ):
+            return cache["control_points"], cache["weights"]
+
+        state = _utils.state(self._spline)
+        operators, _ = self._bezier_operators()
+        control_points, weights = bezier_patches(self._spline, operators)
+        self._bezier_patches_cache = dict(
+                state=state,
+                control_points=control_points,
+                weights=weights,
+        )
+
+        return control_points, weights
 
     def edges(self, *args, **kwargs):
-        return edges(self._spline, *args, **kwargs)
+        return self._discrete(edges, *args, **kwargs)
 
     def faces(self, *args, **kwargs):
-        return faces(self._spline, *args, **kwargs)
+        return self._discrete(faces, *args, **kwargs)
 
     def volumes(self, *args, **kwargs):
-        return volumes(self._spline, *args, **kwargs)
+        return self._discrete(volumes, *args, **kwargs)
 
     def control_points(self):
         return control_points(self._spline)
@@ -538,10 +1129,19 @@ class Extractor:
         return control_volumes(self._spline)
 
     def control_mesh(self):
-        return control_mesh(self._spline)
+        return self._discrete(control_mesh)
+
+    def beziers(self, *args, **kwargs):
+        return beziers(self._spline, *args, **kwargs)
+
+    def bezier_extraction_operators(self):
+        return self._bezier_operators()
+
+    def subsplines(self, *args, **kwargs):
+        return subsplines(self._spline, *args, **kwargs)
 
-    def beziers(self):
-        return beziers(self._spline)
+    def split(self, *args, **kwargs):
+        return split(self._spline, *args, **kwargs)
 
     def spline(self, splittin_plane=None, interval=None):
         """Extract a spline from a spline.
@@ -6,6 +6,9 @@ Freeform Deformation!
 Adaptation of previous implementation in internal python package gustav by
 Jaewook Lee.
 """
+import copy
+import os
+import shutil
 from typing import Any, List, Optional, Union
 import numpy as np
 from gustaf._base import GustafBase
@@ -13,6 +16,109 @@ from gustaf.show import show_vedo
 from gustaf._typing import SPLINE_TYPES, MESH_TYPES
 from gustaf.create.spline import with_bounds
 from gustaf import settings
+from gustaf import utils
+from gustaf.io import mixd
+from gustaf.io.ioutils import check_and_makedirs
+from gustaf.spline import _utils
+
+
+def deform_mixd(
+        spline: SPLINE_TYPES,
+        source: str,
+        target: str,
+        mesh_bounds: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None,
+):
+    """Streaming FFD of a mixd mesh that may not fit into memory. Vertices
+    are memory-mapped from the source mxyz, scaled into the spline's
+    parametric bounds and evaluated in chunks. Deformed vertices are
+    written directly to the target mxyz. Connectivity, boundary and info
+    files are copied as they are. Same scaling as `FFD`: mesh bounds are
+    mapped to parametric bounds.
+
+    Parameters
+    ----------
+    spline: SPLINE_TYPES
+        Deformation function. para_dim and dim should match mesh dim.
+    source: str
+        mixd file name with ".xns" postfix. Dimension is read from its
+        minf, if available. Otherwise, spline.dim is used.
+    target: str
+        mixd file name with ".xns" postfix.
+    mesh_bounds: Optional[np.ndarray]
+        (2, dim) bounds of the source mesh. If None, they are computed with
+        an additional pass over the vertices.
+    chunk_size: Optional[int]
+        Number of vertices to evaluate at once. Defaults to
+        settings.CHUNK_SIZE.
+
+    Returns
+    -------
+    None
+    """
+    if spline.para_dim != spline.dim:
+        raise ValueError(
+                "The parametric and geometric dimensions of the "
+                "spline are not the same."
+        )
+    if chunk_size is None:
+        chunk_size = settings.CHUNK_SIZE
+
+    source_files = mixd.fnames(source)
+    target_files = mixd.fnames(target)
+    if source_files["mxyz"] == target_files["mxyz"]:
+        raise ValueError("source and target should be different files.")
+
+    dim = None
+    if os.path.isfile(source_files["minf"]):
+        dim = mixd.load_dim(source_files["minf"])
+    if dim is None:
+        dim = spline.dim
+    if dim != spline.dim:
+        raise ValueError(
+                f"Mesh dimension ({dim}) and spline dimension ({spline.dim}) "
+                "are not the same."
+        )
+
+    vertices = mixd.load_vertices(source_files["mxyz"], dim)
+    n_vertices = len(vertices)
+
+    if mesh_bounds is None:
+        mesh_bounds = np.empty((2, dim))
+        mesh_bounds[0] = np.inf
+        mesh_bounds[1] = -np.inf
+        for start in range(0, n_vertices, chunk_size):
+            chunk = vertices[start:start + chunk_size]
+            np.minimum(mesh_bounds[0], chunk.min(axis=0), out=mesh_bounds[0])
+            np.maximum(mesh_bounds[1], chunk.max(axis=0), out=mesh_bounds[1])
+    mesh_bounds = np.asarray(mesh_bounds, dtype=settings.FLOAT_DTYPE)
+
+    # mesh bounds -> parametric bounds
+    para_bounds = _utils.parametric_bounds(spline)
+    scale = (para_bounds[1] - para_bounds[0]) / (
+            mesh_bounds[1] - mesh_bounds[0]
+    )
+
+    check_and_makedirs(target_files["mxyz"])
+    deformed = np.memmap(
+            target_files["mxyz"],
+            dtype=">d",
+            mode="w+",
+            shape=(n_vertices, dim),
+    )
+    for start in range(0, n_vertices, chunk_size):
+        chunk = vertices[start:start + chunk_size]
+        deformed[start:start + chunk_size] = spline.evaluate(
+                para_bounds[0] + (chunk - mesh_bounds[0]) * scale
+        )
+    deformed.flush()
+    del deformed
+
+    # connectivity and the rest stays the same
+    for key in ["mien", "mrng", "minf"]:
+        if not os.path.isfile(source_files[key]):
+            continue
+        shutil.copyfile(source_files[key], target_files[key])
 
 
 class FFD(GustafBase):
@@ -20,7 +126,9 @@ class FFD(GustafBase):
     def __init__(
             self,
             mesh: Optional[MESH_TYPES] = None,
-            spline: Optional[SPLINE_TYPES] = None
+            spline: Optional[SPLINE_TYPES] = None,
+            use_basis_matrix: bool = False,
+            compute_jacobians: bool = False,
     ):
         """
         Free-form deformation is a method used to deform an object by a
@@ -47,21 +155,56 @@ class FFD(GustafBase):
         A previously available partial FFD is currently not implemented, and
         is planned to be implemented in a separate class (LocalFFD).
 
+        Additional meshes, for example, a boundary or probe points, can be
+        registered with `add_mesh()`. They share the scaling of the main mesh
+        and all the vertices are deformed together in one evaluation. Use
+        `meshes` to get all of them.
+
+        For repeated deformations with changing control points, set
+        `use_basis_matrix`. Then, basis functions at the mesh vertices are
+        saved as a sparse matrix and each deformation is a sparse
+        matrix-product with the control points. The matrix is recomputed
+        only if degrees, knot vectors or the mesh change.
+
+        With `compute_jacobians`, jacobian determinants of the deformation
+        (with respect to the original mesh coordinates) are computed together
+        with the deformation and saved in each deformed mesh's
+        `vertexdata["jacobian_determinants"]`. Non-positive values indicate
+        inverted regions, see `inverted_vertices()`.
+
         Parameters
         ----------
         mesh: Optional[MESH_TYPES]
             Mesh used in the FFD. Defaults to None.
         spline: Optional[SPLINE_TYPES]
             Spline used in the FFD. Defaults to None.
+        use_basis_matrix: bool
+            Deform with a saved basis matrix. Defaults to False.
+        compute_jacobians: bool
+            Compute jacobian determinants at vertices. Defaults to False.
 
         Class Attributes
         ----------------
         _spline: SPLINE_TYPES
             Internal current spline
         _mesh: MESH_TYPES
-            unscaled base mesh
+            unscaled base mesh. Only copy of the given mesh.
+        _meshes: List[MESH_TYPES]
+            additionally registered meshes
         _q_vertices: np.ndarray (n, dim)
-            Scaled vertices of the base mesh
+            Scaled vertices of the base mesh and registered meshes
+        _vertex_offsets: np.ndarray (n_meshes + 1,)
+            Offsets of each mesh's vertices in _q_vertices
+        _parametric_vertices: np.ndarray (n, dim)
+            _q_vertices mapped into spline's parametric bounds
+        _deformed_vertices: np.ndarray (n, dim)
+            Vertices of the latest deformation
+        _basis_matrix: scipy.sparse.csr_matrix (n, n_control_points)
+            Basis functions at _parametric_vertices. Only if
+            use_basis_matrix.
+        _jacobian_determinants: np.ndarray (n,)
+            Jacobian determinants of the latest deformation. Only if
+            compute_jacobians.
 
         Returns
         -------
@@ -70,8 +213,18 @@ class FFD(GustafBase):
         # Use property definitions to store the values
         self._spline: SPLINE_TYPES = None
         self._mesh: MESH_TYPES = None
-        self._o_mesh: MESH_TYPES = None
+        self._meshes: List[MESH_TYPES] = list()
         self._q_vertices: np.ndarray = None
+        self._vertex_offsets: np.ndarray = None
+        self._parametric_vertices: np.ndarray = None
+        self._parametric_bounds: np.ndarray = None
+        self._deformed_vertices: np.ndarray = None
+        self._use_basis_matrix = use_basis_matrix
+        self._basis_matrix = None
+        self._basis_derivative_matrices = None
+        self._basis_matrix_state = None
+        self._compute_jacobians = compute_jacobians
+        self._jacobian_determinants: np.ndarray = None
 
         if spline is not None:
             self.spline = spline
@@ -82,8 +235,9 @@ class FFD(GustafBase):
 
     @property
     def mesh(self, ) -> MESH_TYPES:
-        """Returns copy of current mesh. Before copying, it applies
-        deformation.
+        """Returns a new deformed mesh. Before creating, it applies
+        deformation. Elements, vertexdata and vis_dict are copied from the
+        original mesh, but its vertices are not.
 
         Returns
         -------
@@ -91,7 +245,8 @@ class FFD(GustafBase):
             Current Mesh with the deformation according to the current spline.
         """
         self._deform()
-        return self._mesh.copy()
+
+        return self._deformed_mesh(0)
 
     @mesh.setter
     def mesh(self, mesh: MESH_TYPES):
@@ -119,15 +274,113 @@ class FFD(GustafBase):
         self._logi("Mesh Info:")
         self._logi("  Vertices: {v}.".format(v=mesh.vertices.shape))
         self._logi("  Bounds: {b}.".format(b=mesh.bounds()))
-        self._o_mesh = mesh.copy()  # we keep original copy for visualization
-        self._mesh = mesh.copy()  # another copy for current status.
+        # only copy. deformed vertices are saved separately
+        self._mesh = mesh.copy()
 
         self._check_dimensions()
 
         self._scale_mesh_vertices()
+        self._reset_vertices()
+
+    @property
+    def meshes(self) -> List[MESH_TYPES]:
+        """Returns new deformed meshes: the main mesh followed by
+        registered meshes. All of them are deformed in one evaluation.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        meshes: List[MESH_TYPES]
+        """
+        self._deform()
+
+        return [
+                self._deformed_mesh(i)
+                for i in range(len(self._vertex_offsets) - 1)
+        ]
+
+    def add_mesh(self, mesh: MESH_TYPES) -> int:
+        """Registers an additional mesh, which will be deformed together with
+        the main mesh. It is scaled with the main mesh's bounds, so it should
+        lie within them.
+
+        Parameters
+        -----------
+        mesh: MESH_TYPES
+
+        Returns
+        --------
+        index: int
+            Index of this mesh in `meshes`.
+        """
+        if self._mesh is None:
+            raise RuntimeError("Please set main mesh before adding meshes.")
+        if mesh.vertices.shape[1] != self._mesh.vertices.shape[1]:
+            raise ValueError(
+                    "Dimension of the mesh does not match the main mesh."
+            )
+
+        self._logd("Registering additional mesh.")
+        self._meshes.append(mesh.copy())
+
+        self._scale_mesh_vertices()
+        self._reset_vertices()
+
+        return len(self._meshes)
+
+    def _reset_vertices(self):
+        """Resets data that depends on _q_vertices. Meant for internal use.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        None
+        """
+        self._parametric_vertices = None
+        self._basis_matrix = None
         if self._spline:
             self._spline._data["gustaf_ffd_computed"] = False
 
+    def _deformed_mesh(self, index):
+        """Creates deformed mesh of given index from the latest deformed
+        vertices. Elements, vertexdata and vis_dict are copied from the
+        original mesh. Meant for internal use.
+
+        Parameters
+        -----------
+        index: int
+            0 is main mesh, others are registered meshes.
+
+        Returns
+        --------
+        deformed: MESH_TYPES
+        """
+        original = self._mesh if index == 0 else self._meshes[index - 1]
+        start, end = self._vertex_offsets[index:index + 2]
+        vertices = self._deformed_vertices[start:end].copy()
+
+        if original.kind == "vertex":
+            deformed = type(original)(vertices=vertices)
+        else:
+            deformed = type(original)(
+                    vertices=vertices,
+                    elements=original.const_elements.copy(),
+            )
+        deformed.vis_dict = copy.deepcopy(original.vis_dict)
+        deformed.vertexdata = copy.deepcopy(original.vertexdata)
+        if self._compute_jacobians:
+            deformed.vertexdata["jacobian_determinants"] = (
+                    self._jacobian_determinants[start:end].copy()
+            )
+
+        return deformed
+
     @property
     def spline(self):
         """Returns a copy of the spline. Please use the setter to explicitly
@@ -157,24 +410,130 @@ class FFD(GustafBase):
         --------
         None
         """
+        # check before anything is changed
+        self._check_dimensions(spline=spline)
+
         self._spline = spline
+        self._basis_matrix = None
+        self._basis_derivative_matrices = None
+        if spline is not None:
+            spline._data["gustaf_ffd_computed"] = False
 
-    def _check_dimensions(self) -> bool:
+    @property
+    def use_basis_matrix(self):
+        """Returns if deformation uses a saved basis matrix.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        use_basis_matrix: bool
+        """
+        return self._use_basis_matrix
+
+    @use_basis_matrix.setter
+    def use_basis_matrix(self, use_basis_matrix):
+        """Sets basis matrix mode. Turning it off frees the saved matrix.
+
+        Parameters
+        -----------
+        use_basis_matrix: bool
+
+        Returns
+        --------
+        None
+        """
+        self._use_basis_matrix = bool(use_basis_matrix)
+        if not self._use_basis_matrix:
+            self._basis_matrix = None
+            self._basis_derivative_matrices = None
+            self._basis_matrix_state = None
+
+    @property
+    def compute_jacobians(self):
+        """Returns if jacobian determinants are computed with deformation.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        compute_jacobians: bool
+        """
+        return self._compute_jacobians
+
+    @compute_jacobians.setter
+    def compute_jacobians(self, compute_jacobians):
+        """Sets jacobian computation. Turning it on triggers a new
+        deformation.
+
+        Parameters
+        -----------
+        compute_jacobians: bool
+
+        Returns
+        --------
+        None
+        """
+        self._compute_jacobians = bool(compute_jacobians)
+        if self._compute_jacobians and self._spline:
+            self._spline._data["gustaf_ffd_computed"] = False
+        if not self._compute_jacobians:
+            self._jacobian_determinants = None
+
+    def inverted_vertices(self, index=0):
+        """Returns ids of vertices where the deformation is inverted or
+        degenerated, i.e., jacobian determinant is not positive. Elements
+        with any of these vertices are folded. Requires compute_jacobians.
+
+        Parameters
+        -----------
+        index: int
+            Default is 0. Index of mesh in `meshes`. 0 is main mesh.
+
+        Returns
+        --------
+        inverted_ids: (n,) np.ndarray
+        """
+        if not self._compute_jacobians:
+            raise RuntimeError(
+                    "Inverted vertices are only available with "
+                    "compute_jacobians=True."
+            )
+        self._deform()
+
+        start, end = self._vertex_offsets[index:index + 2]
+
+        return np.where(self._jacobian_determinants[start:end] <= 0)[0]
+
+    def _check_dimensions(self, spline=None) -> bool:
         """Checks if the dimension of the spline and the mesh match and
 
+        Parameters
+        -----------
+        spline: SPLINE_TYPES
+            (Optional) Spline to check instead of the current one, before
+            it is set.
+
         Returns:
             bool: _description_
         """
+        if spline is None:
+            spline = self._spline
+
         messages = []
         # Checks dimensions and ranges critical for a correct FFD calculation
-        if self._spline and not self._spline.para_dim == self._spline.dim:
+        if spline and not spline.para_dim == spline.dim:
             messages.append(
                     "The parametric and geometric dimensions of the "
                     "spline are not the same."
             )
         if (
-                self._spline and self._mesh
-                and not self._spline.dim == self._mesh.vertices.shape[1]
+                spline and self._mesh
+                and not spline.dim == self._mesh.vertices.shape[1]
         ):
             messages.append(
                     "The geometric dimensions of the spline and the "
@@ -189,10 +548,15 @@ class FFD(GustafBase):
 
     def _scale_mesh_vertices(self):
         """Scales the mesh vertices into the dimension of a hypercube and save
-        them in self._q_vertices."""
+        them in self._q_vertices. Registered meshes are scaled the same way
+        and appended."""
         self._logd("Fitting mesh into spline's parametric space.")
 
-        self._q_vertices = self._mesh.vertices.copy()
+        all_meshes = [self._mesh, *self._meshes]
+        self._q_vertices = np.vstack([m.const_vertices for m in all_meshes])
+        self._vertex_offsets = utils.arr.counts_to_offsets(
+                [len(m.const_vertices) for m in all_meshes]
+        )
 
         original_mesh_bounds = self._mesh.bounds()
 
@@ -229,20 +593,155 @@ class FFD(GustafBase):
         if self._spline._data.get("gustaf_ffd_computed", False):
             return None
 
-        spline = self._spline.copy()
-        if spline.has_knot_vectors:
-            spline.normalize_knot_vectors()
+        self._logd("Applying FFD: Transforming vertices")
 
-        self._check_dimensions()
+        if self._use_basis_matrix:
+            self._deformed_vertices = _utils.evaluate_with_basis_matrix(
+                    self._spline, self._get_basis_matrix()
+            )
 
-        self._logd("Applying FFD: Transforming vertices")
+        else:
+            self._deformed_vertices = self._spline.evaluate(
+                    self._get_parametric_vertices()
+            )
+
+        if self._compute_jacobians:
+            determinants = self._evaluate_jacobian_determinants()
+            self._jacobian_determinants = determinants
 
-        # Here, we take _q_vertices, due to possible scale/offset.
-        self._mesh.vertices = spline.evaluate(self._q_vertices)
         self._logd("FFD successful.")
 
         self._spline._data["gustaf_ffd_computed"] = True
 
+    def _get_parametric_vertices(self):
+        """Returns scaled mesh vertices, mapped into parametric bounds of the
+        spline. This is equivalent to evaluating a spline with normalized
+        knot vectors at _q_vertices, without copying the spline. Recomputes
+        only if parametric bounds changed. Meant for internal use.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        parametric_vertices: (n, dim) np.ndarray
+        """
+        bounds = _utils.parametric_bounds(self._spline)
+        if self._parametric_vertices is not None and np.array_equal(
+                bounds, self._parametric_bounds
+        ):
+            return self._parametric_vertices
+
+        self._parametric_bounds = bounds
+        self._parametric_vertices = (
+                bounds[0] + self._q_vertices * (bounds[1] - bounds[0])
+        )
+
+        return self._parametric_vertices
+
+    def _evaluate_jacobian_determinants(self):
+        """Evaluates jacobian determinants of the deformation with respect to
+        original mesh coordinates. Chain rule includes mesh scaling and
+        mapping into parametric bounds. Meant for internal use.
+
+        With use_basis_matrix, jacobians are products of the saved
+        derivative basis matrices and control points. Otherwise, they need
+        one derivative evaluation per parametric dimension in addition to
+        the deformation, as splines can't evaluate values and first
+        derivatives in one call.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        jacobian_determinants: (n,) np.ndarray
+        """
+        if self._use_basis_matrix:
+            jacobians = _utils.jacobians_with_basis_matrices(
+                    self._spline,
+                    self._get_basis_matrix(),
+                    self._get_basis_derivative_matrices(),
+            )
+
+        else:
+            # one call per parametric dimension. see docstring
+            parametric_vertices = self._get_parametric_vertices()
+            orders = np.eye(self._spline.para_dim, dtype=settings.INT_DTYPE)
+            jacobians = np.stack(
+                    [
+                            self._spline.derivative(parametric_vertices, o)
+                            for o in orders
+                    ],
+                    axis=-1,
+            )
+
+        # mesh -> unit hypercube -> parametric bounds
+        para_bounds = _utils.parametric_bounds(self._spline)
+        scale = np.prod((para_bounds[1] - para_bounds[0]) * self._mesh_scale)
+
+        return np.linalg.det(jacobians) * scale
+
+    def _get_basis_derivative_matrices(self):
+        """Returns first derivative basis matrices of _q_vertices, for each
+        parametric dimension. Recomputed together with basis matrix. Meant for
+        internal use.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        basis_derivative_matrices: list
+        """
+        # validates saved state
+        self._get_basis_matrix()
+        if self._basis_derivative_matrices is not None:
+            return self._basis_derivative_matrices
+
+        self._logd("Computing basis derivative matrices.")
+        orders = np.eye(self._spline.para_dim, dtype=settings.INT_DTYPE)
+        self._basis_derivative_matrices = [
+                _utils.basis_matrix(
+                        self._spline, self._get_parametric_vertices(), o
+                ) for o in orders
+        ]
+
+        return self._basis_derivative_matrices
+
+    def _get_basis_matrix(self):
+        """Returns basis matrix of _q_vertices. Recomputes it if degrees or
+        knot vectors changed since last computation. Meant for internal use.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        basis_matrix: scipy.sparse.csr_matrix
+        """
+        if self._basis_matrix is not None and _utils.same_state(
+                self._basis_matrix_state, self._spline
+        ):
+            return self._basis_matrix
+
+        self._logd("Computing basis matrix.")
+        properties = ["degrees"]
+        if self._spline.has_knot_vectors:
+            properties.append("knot_vectors")
+        self._basis_matrix_state = _utils.state(self._spline, properties)
+        self._basis_derivative_matrices = None
+
+        self._basis_matrix = _utils.basis_matrix(
+                self._spline, self._get_parametric_vertices()
+        )
+
+        return self._basis_matrix
+
     @property
     def control_points(self):
         """Returns current spline's control points. The control points can be
@@ -300,7 +799,7 @@ class FFD(GustafBase):
         --------
         None
         """
-        if "knot_vectors" in self._spline.required_properties:
+        if not self._spline.has_knot_vectors:
             raise NotImplementedError(
                     "Can not perform knot insertion on Bezier spline."
             )
@@ -318,9 +817,9 @@ class FFD(GustafBase):
         --------
         None
         """
-        if "knot_vectors" in self._spline.required_properties:
+        if not self._spline.has_knot_vectors:
             raise NotImplementedError(
-                    "Can not perform knot insertion on Bezier spline."
+                    "Can not perform knot removal on Bezier spline."
             )
         self._spline.remove_knots(
                 parametric_dimension, knots, tolerance=tolerance
@@ -381,7 +880,7 @@ class FFD(GustafBase):
             backend = settings.VISUALIZATION_BACKEND
 
         # prepare originals
-        o_mesh = self._o_mesh.copy()
+        o_mesh = self._mesh.copy()
         # prepare deformed
         d_mesh = self.mesh  # copies
 
@@ -389,10 +888,8 @@ class FFD(GustafBase):
         # let's show faces at most, since volumes can take awhile
         if o_mesh.kind == "volume":
             # only outer faces. overwrite
-            o_mesh = o_mesh.tofaces(unique=False)
-            o_mesh.update_faces(o_mesh.single_faces())
-            d_mesh = d_mesh.tofaces(unique=False)
-            d_mesh.update_faces(d_mesh.single_faces())
+            o_mesh = o_mesh.boundary()
+            d_mesh = d_mesh.boundary()
 
         # update meshes
         things_to_show.update(original_mesh=o_mesh)
@@ -1,7 +1,16 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 
+from gustaf import settings
+from gustaf import utils
 from gustaf._base import GustafBase
+from gustaf.spline import _utils
 from gustaf.spline import base
+from gustaf.spline import composition
+from gustaf.spline import extract
+from gustaf.spline.multipatch import InterfaceNumbering, MultiPatch
 
 
 class Microstructure(GustafBase):
@@ -191,7 +200,19 @@ class Microstructure(GustafBase):
         self._parametrization_function = parametrization_function
         self._sanity_check()
 
-    def create(self, closing_face=None, knot_span_wise=None, **kwargs):
+    def create(
+            self,
+            closing_face=None,
+            knot_span_wise=None,
+            nthreads=None,
+            use_processes=False,
+            batched_composition=True,
+            multipatch=False,
+            cache_tolerance=None,
+            cache_size=1024,
+            store=True,
+            **kwargs
+    ):
         """Create a Microstructure.
 
         Parameters
@@ -201,25 +222,287 @@ class Microstructure(GustafBase):
           Represents coordinate to be a closed surface {"x", "y", "z"}
         knot_span_wise : bool
           Insertion per knotspan vs. total number per paradim
+        nthreads : int
+          Number of workers for composition. Default is settings.NTHREADS.
+          Patches are composed in chunks and the order is preserved.
+        use_processes : bool
+          Default is False. Compose with a process pool instead of a thread
+          pool. Splines are sent to processes as dicts.
+        batched_composition : bool
+          Default is True. Composes all patches with batched composition
+          matrices, if deformation function patches share degrees and tiles
+          are polynomial. Otherwise, patches are composed one by one.
+        multipatch : bool
+          Default is False. Returns a compact MultiPatch instead of a list of
+          splines. Batched composition writes into it directly.
+        cache_tolerance : float
+          Parametrized tiles are reused for parameters that are the same after
+          quantization with this tolerance. Default is settings.TOLERANCE.
+        cache_size : int
+          Default is 1024. Maximum number of cached tiles. 0 turns caching
+          off. Hit rates are available through `tile_cache_info`.
+        store : bool
+          Default is True. Saves the microstructure for `show(use_saved=True)`
+          and returns a copy. If False, nothing is saved and the
+          microstructure is returned without copying.
         **kwargs
           will be passed to `create_tile` function
 
         Returns
         -------
-        Microstructure : list<spline>
+        Microstructure : list<spline> or MultiPatch
           finished microstructure based on object requirements
         """
+        chunks = self.iter_create(
+                closing_face=closing_face,
+                knot_span_wise=knot_span_wise,
+                chunk_size=None,
+                nthreads=nthreads,
+                use_processes=use_processes,
+                batched_composition=batched_composition,
+                multipatch=multipatch,
+                cache_tolerance=cache_tolerance,
+                cache_size=cache_size,
+                **kwargs,
+        )
+        if multipatch:
+            microstructure = MultiPatch.concat(list(chunks))
+        else:
+            microstructure = []
+            for chunk in chunks:
+                microstructure.extend(chunk)
+
+        if not store:
+            return microstructure
+
+        self._microstructure = microstructure
+
+        # return copy of precomputed member
+        return self._microstructure.copy()
 
-        import itertools
+    def iter_create(
+            self,
+            closing_face=None,
+            knot_span_wise=None,
+            chunk_size=None,
+            nthreads=None,
+            use_processes=False,
+            batched_composition=True,
+            multipatch=False,
+            cache_tolerance=None,
+            cache_size=1024,
+            **kwargs
+    ):
+        """Generator that creates the microstructure in chunks of deformation
+        function patches. Tiles are created and composed per chunk, so
+        chunks can be written or discretized before the next one is created.
+        Nothing is saved.
 
+        Parameters
+        ----------
+        closing_face : string
+        knot_span_wise : bool
+        chunk_size : int
+          Number of deformation function patches per chunk. Default is
+          settings.CHUNK_SIZE.
+        nthreads : int
+        use_processes : bool
+        batched_composition : bool
+          Default is True.
+        multipatch : bool
+          Default is False. Yields MultiPatch instead of list of splines.
+        cache_tolerance : float
+        cache_size : int
+        **kwargs
+          will be passed to `create_tile` function
+
+        Yields
+        ------
+        chunk : list<spline> or MultiPatch
+          composed patches of a chunk, in order
+        """
         # Check if all information is gathered
         if not self._sanity_check():
             raise ValueError("Not enough information provided, abort")
 
-        # Set default values
-        if knot_span_wise is None:
-            knot_span_wise = True
+        if chunk_size is None:
+            chunk_size = settings.CHUNK_SIZE
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be positive.")
+
+        closing_face_dim = self._closing_face_dim(closing_face)
+
+        # Bezier Extraction for composition
+        def_fun_patches, unique_knots = self._deformation_function_patches(
+                knot_span_wise
+        )
+        n_patches = len(def_fun_patches)
+
+        tile_cache = TileCache(tolerance=cache_tolerance, max_size=cache_size)
+        self._tile_cache = tile_cache
+
+        # Evaluate tile parameters of all patches at once for parametrized
+        # microstructures
+        is_parametrized = self.parametrization_function is not None
+        if is_parametrized:
+            patch_parameters = self._patch_parameters(unique_knots)
+            element_resolutions = [len(c) - 1 for c in unique_knots]
+            closures = self._closures(
+                    element_resolutions, closing_face, closing_face_dim
+            )
+        else:
+            # Tile can be computed once (prevent to many evaluations)
+            tile = self._microtile.create_tile(**kwargs)
+
+        for start in range(0, n_patches, chunk_size):
+            end = min(start + chunk_size, n_patches)
+            if is_parametrized:
+                tiles = self._chunk_tiles(
+                        patch_parameters[start:end],
+                        closures[start:end],
+                        tile_cache,
+                        **kwargs,
+                )
+            else:
+                tiles = [tile] * (end - start)
+
+            # Start actual composition
+            yield _compose(
+                    def_fun_patches[start:end],
+                    tiles,
+                    nthreads=nthreads,
+                    use_processes=use_processes,
+                    batched=batched_composition,
+                    multipatch=multipatch,
+            )
+
+        self._logd(f"Tile cache: {tile_cache.info()}")
+
+    def discretize(
+            self,
+            resolution,
+            out=None,
+            chunk_size=None,
+            tolerance=None,
+            **kwargs
+    ):
+        """Creates the microstructure chunk by chunk and discretizes it into a
+        single conforming quad or hexa mesh. Shared patch interfaces are
+        numbered over all chunks, so each vertex is evaluated once and no
+        vertex merging is needed. Spline objects of a chunk are dropped
+        before the next chunk is created.
 
+        Parameters
+        ----------
+        resolution : int
+          Number of vertices per parametric dimension of each patch
+        out : str
+          (Optional) ".xns" file name. If given, vertices and elements are
+          streamed into MIXD files and nothing is kept in memory.
+        chunk_size : int
+          Number of deformation function patches per chunk. Default is
+          settings.CHUNK_SIZE.
+        tolerance : float
+          Tolerance to match patch corners. Default is settings.TOLERANCE.
+        **kwargs
+          will be passed to `iter_create`
+
+        Returns
+        -------
+        mesh : Faces or Volumes or dict
+          Mesh, or MIXD file names if out is given
+        """
+        from gustaf.faces import Faces
+        from gustaf.volumes import Volumes
+        from gustaf.io import mixd
+        from gustaf.io.ioutils import check_and_makedirs
+
+        kwargs["multipatch"] = True
+        chunks = self.iter_create(chunk_size=chunk_size, **kwargs)
+
+        numbering = None
+        vertices = []
+        elements = []
+        files = None
+        n_elements = 0
+        try:
+            if out is not None:
+                fnames = mixd.fnames(out)
+                check_and_makedirs(fnames["mxyz"])
+                files = {
+                        key: open(fnames[key], "wb")
+                        for key in ("mxyz", "mien", "mrng")
+                }
+
+            for chunk in chunks:
+                if numbering is None:
+                    numbering = InterfaceNumbering(
+                            resolution, chunk.para_dim, tolerance=tolerance
+                    )
+                    whatami = "quad" if chunk.para_dim == 2 else "hexa"
+                    dim = chunk.dim
+
+                chunk_vertices, chunk_elements = chunk.discretize_chunk(
+                        numbering
+                )
+                n_elements += len(chunk_elements)
+                self._logd(
+                        f"Discretized chunk: {numbering.n_vertices} vertices "
+                        f"and {n_elements} elements so far"
+                )
+
+                if files is None:
+                    vertices.append(chunk_vertices)
+                    elements.append(chunk_elements)
+                    continue
+
+                chunk_vertices.astype(">d").tofile(files["mxyz"])
+                (chunk_elements + 1).astype(">i").tofile(files["mien"])
+                np.full(
+                        len(chunk_elements) * mixd.n_boundary_faces(whatami),
+                        -1,
+                        dtype=">i",
+                ).tofile(files["mrng"])
+        finally:
+            if files is not None:
+                for f in files.values():
+                    f.close()
+
+        if numbering is None:
+            raise ValueError("Microstructure has no patches.")
+
+        if out is not None:
+            mixd.export_info(
+                    fnames["minf"],
+                    whatami,
+                    dim,
+                    n_vertices=numbering.n_vertices,
+                    n_elements=n_elements,
+                    n_element_vertices=numbering.local_elements.shape[1],
+            )
+            return fnames
+
+        mesh_type = Faces if whatami == "quad" else Volumes
+
+        return mesh_type(
+                vertices=np.vstack(vertices),
+                elements=np.vstack(elements),
+        )
+
+    def _closing_face_dim(self, closing_face):
+        """Checks closing face and returns its parametric dimension.
+
+        Parameters
+        ----------
+        closing_face : str
+          None or one of {"x", "y", "z"}
+
+        Returns
+        -------
+        closing_face_dim : int
+          None if not closed
+        """
         # check if user wants closed structure
         closing_face_dim = {"x": 0, "y": 1, "z": 2}.get(closing_face)
         is_closed = closing_face_dim is not None
@@ -231,7 +514,6 @@ class Microstructure(GustafBase):
             )
 
         if is_closed:
-            is_closed = True
             if closing_face_dim >= self._deformation_function.para_dim:
                 raise ValueError(
                         "closing face must be smaller than the deformation "
@@ -243,32 +525,50 @@ class Microstructure(GustafBase):
                         "parametrized microstructures"
                 )
 
-        # Prepare the deformation function
-        # Transform into a non-uniform splinetype and make sure to work on copy
-        if hasattr(self._deformation_function, "bspline"):
-            deformation_function_copy = self._deformation_function.bspline
+        return closing_face_dim
+
+    def _refinement_knots(self, knot_span_wise=None):
+        """Returns knots to insert into the deformation function, such that
+        each knot span holds one tile.
+
+        Parameters
+        ----------
+        knot_span_wise : bool
+          Default is True.
+
+        Returns
+        -------
+        new_knots : list
+          knots per parametric dimension
+        """
+        # Set default values
+        if knot_span_wise is None:
+            knot_span_wise = True
+
+        deformation_function = self._deformation_function
+        if deformation_function.has_knot_vectors:
+            ukvs = deformation_function.unique_knots
         else:
-            deformation_function_copy = self._deformation_function.nurbs
-        # Create Spline that will be used to iterate over parametric space
-        ukvs = deformation_function_copy.unique_knots
+            ukvs = [[0., 1.]] * deformation_function.para_dim
+
+        refinement_knots = [[] for _ in range(deformation_function.para_dim)]
         if knot_span_wise:
-            for i_pd in range(deformation_function_copy.para_dim):
+            for i_pd in range(deformation_function.para_dim):
                 if self.tiling[i_pd] == 1:
                     continue
                 inv_t = 1 / self.tiling[i_pd]
-                new_knots = [
-                        j * inv_t * (ukvs[i_pd][i] - ukvs[i_pd][i - 1])
+                refinement_knots[i_pd] = [
+                        ukvs[i_pd][i - 1]
+                        + j * inv_t * (ukvs[i_pd][i] - ukvs[i_pd][i - 1])
                         for i in range(1, len(ukvs[i_pd]))
                         for j in range(1, self.tiling[i_pd])
                 ]
-                # insert knots in both the deformation function
-                deformation_function_copy.insert_knots(i_pd, new_knots)
         else:
             self._logd(
                     "New knots will be inserted one by one with the objective"
                     " to evenly distribute tiles within the parametric domain"
             )
-            for i_pd in range(deformation_function_copy.para_dim):
+            for i_pd in range(deformation_function.para_dim):
                 n_current_spans = (len(ukvs[i_pd]) - 1)
                 if self.tiling[i_pd] == n_current_spans:
                     continue
@@ -299,101 +599,292 @@ class Microstructure(GustafBase):
                                         nks + 2
                                 )[1:-1]
                         )
-                    deformation_function_copy.insert_knots(i_pd, new_knots)
+                    refinement_knots[i_pd] = new_knots
 
-        # Bezier Extraction for composition
-        def_fun_patches = deformation_function_copy.extract.beziers()
+        return refinement_knots
 
-        # Calculate parametric space representation for parametrized
-        # microstructures
-        is_parametrized = self.parametrization_function is not None
-        if is_parametrized:
-            para_space_dimensions = [[u[0], u[-1]] for u in ukvs]
-            def_fun_para_space = base.Bezier(
-                    degrees=[1] * deformation_function_copy.para_dim,
-                    control_points=np.array(
-                            list(
-                                    itertools.product(
-                                            *para_space_dimensions[::-1]
-                                    )
-                            )
-                    )[:, ::-1]
-            ).bspline
-            for i_pd in range(deformation_function_copy.para_dim):
-                if self.tiling[i_pd] != 1:
-                    def_fun_para_space.insert_knots(
-                            i_pd,
-                            deformation_function_copy.unique_knots[i_pd][1:-1]
-                    )
-            def_fun_para_space = def_fun_para_space.extract.beziers()
+    def _deformation_function_patches(self, knot_span_wise=None):
+        """Returns Bezier patches of the deformation function, with knots
+        inserted such that each knot span holds one tile. Extraction
+        operators are saved until degrees, knot vectors, tiling or
+        knot_span_wise change, so that creating the microstructure again
+        after changing control points is only a matrix product.
 
-        # Determine element resolution
-        element_resolutions = [
-                len(c) - 1 for c in deformation_function_copy.unique_knots
-        ]
+        Parameters
+        ----------
+        knot_span_wise : bool
+          Default is True.
 
-        # Start actual composition
-        self._microstructure = []
-        if is_parametrized:
-            for i, (def_fun, def_fun_para) in enumerate(
-                    zip(def_fun_patches, def_fun_para_space)
+        Returns
+        -------
+        def_fun_patches : list<Bezier or RationalBezier>
+        unique_knots : list
+          unique knots of refined deformation function
+        """
+        deformation_function = self._deformation_function
+        properties = ["degrees"]
+        if deformation_function.has_knot_vectors:
+            properties.append("knot_vectors")
+        key = (tuple(self.tiling), knot_span_wise)
+
+        cache = getattr(self, "_bezier_operators_cache", None)
+        if (cache is None or cache["key"] != key or not _utils.same_state(
+                cache["state"], deformation_function
+        )):
+            state = _utils.state(deformation_function, properties)
+            operators, unique_knots = extract.bezier_extraction_operators(
+                    deformation_function,
+                    knots=self._refinement_knots(knot_span_wise),
+            )
+            cache = dict(
+                    key=key,
+                    state=state,
+                    operators=operators,
+                    unique_knots=unique_knots,
+            )
+            self._bezier_operators_cache = cache
+        else:
+            self._logd("reusing saved bezier extraction operators")
+
+        control_points, weights = extract.bezier_patches(
+                deformation_function, cache["operators"]
+        )
+        degrees = np.asarray(deformation_function.degrees)
+        if weights is None:
+            def_fun_patches = [
+                    base.Bezier(degrees=degrees, control_points=cps)
+                    for cps in control_points
+            ]
+        else:
+            def_fun_patches = [
+                    base.RationalBezier(
+                            degrees=degrees,
+                            control_points=cps,
+                            weights=w,
+                    ) for cps, w in zip(control_points, weights)
+            ]
+
+        return def_fun_patches, cache["unique_knots"]
+
+    def _closures(self, element_resolutions, closing_face, closing_face_dim):
+        """Returns closure of each patch.
+
+        Parameters
+        ----------
+        element_resolutions : list<int>
+          Number of patches per parametric dimension
+        closing_face : str
+        closing_face_dim : int
+
+        Returns
+        -------
+        closures : list<str>
+          None for center tiles
+        """
+        n_patches = int(np.prod(element_resolutions))
+        closures = [None] * n_patches
+        if closing_face_dim is None:
+            return closures
+
+        for i in range(n_patches):
+            # check index
+            index = i
+            for ipd in range(closing_face_dim):
+                index -= index % element_resolutions[ipd]
+                index /= element_resolutions[ipd]
+            index = index % element_resolutions[closing_face_dim]
+            if index == 0:
+                # Closure at minimum id
+                closures[i] = closing_face + "_min"
+            elif (index + 1) == element_resolutions[closing_face_dim]:
+                # Closure at maximum id
+                closures[i] = closing_face + "_max"
+
+        return closures
+
+    def _chunk_tiles(self, patch_parameters, closures, tile_cache, **kwargs):
+        """Returns tiles of patches. Cached tiles are reused and missing tiles
+        are created at once per closure.
+
+        Parameters
+        ----------
+        patch_parameters : list<tuple(np.ndarray)>
+        closures : list<str>
+        tile_cache : TileCache
+        **kwargs
+          will be passed to tile creation
+
+        Returns
+        -------
+        tiles : list<list<spline>>
+        """
+        tiles = [None] * len(patch_parameters)
+        # Group patches of (nearly) identical parameters, so that each key
+        # is looked up once per chunk: {key: (parameters, closure, patch_ids)}
+        unique = dict()
+        for i, (tile_parameters, closure) in enumerate(
+                zip(patch_parameters, closures)
+        ):
+            key = tile_cache.key(tile_parameters, closure)
+            unique.setdefault(key, (tile_parameters, closure, []))[2].append(i)
+
+        # Tiles to be created: {closure: {key: (parameters, patch_ids)}}
+        missing = dict()
+        for key, (tile_parameters, closure, patch_ids) in unique.items():
+            tile = tile_cache.get(key)
+            if tile is not None:
+                for patch_id in patch_ids:
+                    tiles[patch_id] = tile
+                continue
+
+            missing.setdefault(closure, dict())[key] = (
+                    tile_parameters, patch_ids
+            )
+
+        # Create missing tiles at once
+        n_created = 0
+        for closure, closure_missing in missing.items():
+            new_tiles = self._create_tiles(
+                    [m[0] for m in closure_missing.values()],
+                    closure=closure,
+                    **kwargs,
+            )
+            for (key, (_, patch_ids)), tile in zip(
+                    closure_missing.items(), new_tiles
             ):
-                # Evaluate tile parameters
-                positions = def_fun_para.evaluate(
-                        self._microtile.evaluation_points
+                tile_cache.put(key, tile)
+                for patch_id in patch_ids:
+                    tiles[patch_id] = tile
+            n_created += len(new_tiles)
+
+        self._logd(f"Created {n_created} tiles for {len(tiles)} patches.")
+
+        return tiles
+
+    def _create_tiles(self, parameters, closure=None, **kwargs):
+        """Creates tiles of given parameters. Uses batched `create_tiles` of
+        the microtile, if available.
+
+        Parameters
+        ----------
+        parameters : list<tuple(np.ndarray)>
+          Tile parameters of each tile
+        closure : str
+          If not None, closing tiles are created
+        **kwargs
+          will be passed to tile creation
+
+        Returns
+        -------
+        tiles : list<list<spline>>
+        """
+        if not hasattr(self._microtile, "create_tiles"):
+            if closure is None:
+                return [
+                        self._microtile.create_tile(parameters=p, **kwargs)
+                        for p in parameters
+                ]
+            return [
+                    self._microtile.closing_tile(
+                            parameters=p, closure=closure, **kwargs
+                    ) for p in parameters
+            ]
+
+        parameters_array = np.stack(
+                [
+                        np.asarray(p, dtype=np.float64).reshape(len(p), -1)
+                        for p in parameters
+                ]
+        )
+        degrees, control_points = self._microtile.create_tiles(
+                parameters_array, closure=closure, **kwargs
+        )
+
+        return [
+                [
+                        base.Bezier(degrees=d, control_points=cps[i])
+                        for d, cps in zip(degrees, control_points)
+                ] for i in range(len(parameters))
+        ]
+
+    def _patch_parameters(self, unique_knots):
+        """Evaluates parametrization function at evaluation points of all
+        patches with a single call. Each patch is a knot span, so its
+        evaluation points are an affine map of the microtile's evaluation
+        points. Patches are ordered like bezier extraction, first parametric
+        dimension fastest.
+
+        Parameters
+        ----------
+        unique_knots : list<np.ndarray>
+          Unique knots of the refined deformation function
+
+        Returns
+        -------
+        patch_parameters : list<tuple(np.ndarray)>
+          Tile parameters of each patch
+        """
+        evaluation_points = np.asarray(self._microtile.evaluation_points)
+        n_points = len(evaluation_points)
+
+        # Lower corners and widths of knot spans, first dimension fastest
+        lowers = np.meshgrid(
+                *[np.asarray(u)[:-1] for u in unique_knots], indexing="ij"
+        )
+        widths = np.meshgrid(
+                *[np.diff(u) for u in unique_knots], indexing="ij"
+        )
+        lowers = np.column_stack([lo.ravel(order="F") for lo in lowers])
+        widths = np.column_stack([w.ravel(order="F") for w in widths])
+        n_patches = len(lowers)
+
+        positions = (
+                lowers[:, np.newaxis, :]
+                + evaluation_points[np.newaxis] * widths[:, np.newaxis, :]
+        ).reshape(-1, evaluation_points.shape[1])
+        self._logd(
+                f"Evaluating parametrization function at {len(positions)} "
+                f"points of {n_patches} patches"
+        )
+        parameters = self._parametrization_function(positions)
+
+        for p in parameters:
+            if len(p) != len(positions):
+                raise ValueError(
+                        "Parametrization function must return values for "
+                        "each evaluation point."
                 )
-                tile_parameters = self._parametrization_function(positions)
-
-                # Check if center or closing tile
-                if is_closed:
-                    # check index
-                    index = i
-                    for ipd in range(closing_face_dim):
-                        index -= index % element_resolutions[ipd]
-                        index /= element_resolutions[ipd]
-                    index = index % element_resolutions[closing_face_dim]
-                    if index == 0:
-                        # Closure at minimum id
-                        tile = self._microtile.closing_tile(
-                                parameters=tile_parameters,
-                                closure=closing_face + "_min",
-                                **kwargs
-                        )
-                    elif (index + 1) == element_resolutions[closing_face_dim]:
-                        # Closure at minimum id
-                        tile = self._microtile.closing_tile(
-                                parameters=tile_parameters,
-                                closure=closing_face + "_max",
-                                **kwargs
-                        )
-                    else:
-                        tile = self._microtile.create_tile(
-                                parameters=tile_parameters, **kwargs
-                        )
-                else:
-                    tile = self._microtile.create_tile(
-                            parameters=tile_parameters, **kwargs
-                    )
 
-                # Perform composition
-                for tile_patch in tile:
-                    self._microstructure.append(def_fun.compose(tile_patch))
-        # Not parametrized
-        else:
-            # Tile can be computed once (prevent to many evaluations)
-            tile = self._microtile.create_tile(**kwargs)
-            for def_fun in def_fun_patches:
-                for t in tile:
-                    self._microstructure.append(def_fun.compose(t))
+        return [
+                tuple(p[i * n_points:(i + 1) * n_points] for p in parameters)
+                for i in range(n_patches)
+        ]
 
-        # return copy of precomputed member
-        return self._microstructure.copy()
+    @property
+    def tile_cache_info(self):
+        """Tile cache statistics of the latest `create()` call.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        info : dict
+          hits, misses, hit_rate and size. None if nothing was created.
+        """
+        if hasattr(self, "_tile_cache"):
+            return self._tile_cache.info()
+        else:
+            return None
 
     def show(self, use_saved=False, return_gustaf=False, **kwargs):
 
         if use_saved:
             if hasattr(self, "_microstructure"):
                 microstructure = self._microstructure
+                if isinstance(microstructure, MultiPatch):
+                    microstructure = microstructure.patches
             else:
                 raise ValueError("No previous microstructure saved")
         else:
@@ -513,6 +1004,388 @@ class Microstructure(GustafBase):
         return _UserTile(microtile)
 
 
+class TileCache:
+    """LRU cache of tiles, keyed on quantized tile parameters.
+
+    Parameters
+    ----------
+    tolerance : float
+      Default is settings.TOLERANCE. Parameters are rounded to multiples of
+      it. 0 uses exact values. Exact values are also used, if parameters are
+      too large to be quantized with 64 bit integers.
+    max_size : int
+      Default is 1024. 0 turns caching off.
+    """
+
+    def __init__(self, tolerance=None, max_size=1024):
+        if tolerance is None:
+            tolerance = settings.TOLERANCE
+        if tolerance < 0:
+            raise ValueError("Tolerance can't be negative.")
+
+        self._tolerance = tolerance
+        self._max_size = int(max_size)
+        self._tiles = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, parameters, closure=None):
+        """Returns hashable key of tile parameters.
+
+        Parameters
+        ----------
+        parameters : tuple(np.ndarray)
+        closure : str
+
+        Returns
+        -------
+        key : tuple
+        """
+        if parameters is None:
+            return (closure, None)
+
+        values = np.concatenate([np.ravel(p) for p in parameters]).astype(
+                np.float64
+        )
+        if self._tolerance > 0:
+            scaled = np.round(values / self._tolerance)
+            # quantize only if it fits into int64, else use exact values
+            if np.all(np.abs(scaled) < 2.**62):
+                values = scaled.astype(np.int64)
+
+        return (closure, values.dtype.str, values.shape, values.tobytes())
+
+    def get(self, key):
+        """Returns cached tile or None. Counts hits and misses.
+
+        Parameters
+        ----------
+        key : tuple
+
+        Returns
+        -------
+        tile : list<spline>
+        """
+        tile = self._tiles.get(key, None)
+        if tile is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._tiles.move_to_end(key)
+
+        return tile
+
+    def put(self, key, tile):
+        """Adds tile and drops the least recently used one, if full.
+
+        Parameters
+        ----------
+        key : tuple
+        tile : list<spline>
+
+        Returns
+        -------
+        None
+        """
+        if self._max_size <= 0:
+            return None
+
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        if len(self._tiles) > self._max_size:
+            self._tiles.popitem(last=False)
+
+    def info(self):
+        """Returns cache statistics.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        info : dict
+          hits, misses, hit_rate and size.
+        """
+        n_queries = self._hits + self._misses
+
+        return dict(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=self._hits / n_queries if n_queries > 0 else 0.,
+                size=len(self._tiles),
+        )
+
+
+def _compose_chunk(def_fun_patches, tiles):
+    """Composes each deformation function patch with all patches of its
+    tile. Internal use only.
+
+    Parameters
+    ----------
+    def_fun_patches : list<spline>
+    tiles : list<list<spline>>
+
+    Returns
+    -------
+    composed : list<spline>
+    """
+    composed = []
+    for def_fun, tile in zip(def_fun_patches, tiles):
+        for tile_patch in tile:
+            composed.append(def_fun.compose(tile_patch))
+
+    return composed
+
+
+def _compose_chunk_dicts(def_fun_dicts, tile_dicts):
+    """Same as `_compose_chunk`, but with splines as (type name, dict) pairs,
+    so that it can run in another process. Internal use only.
+
+    Parameters
+    ----------
+    def_fun_dicts : list<tuple>
+    tile_dicts : list<list<tuple>>
+
+    Returns
+    -------
+    composed_dicts : list<tuple>
+    """
+    def_fun_patches = [_from_dict(d) for d in def_fun_dicts]
+    tiles = [[_from_dict(d) for d in tile] for tile in tile_dicts]
+
+    return [_to_dict(c) for c in _compose_chunk(def_fun_patches, tiles)]
+
+
+def _to_dict(spline):
+    """Returns picklable (type name, dict) pair of a spline."""
+    return type(spline).__name__, spline.todict()
+
+
+def _from_dict(type_and_dict):
+    """Creates gustaf spline from (type name, dict) pair."""
+    type_name, spline_dict = type_and_dict
+    return getattr(base, type_name)(**spline_dict)
+
+
+def _compose_batched(def_fun_patches, tiles, multipatch=False):
+    """Composes deformation function patches with their tiles using batched
+    composition matrices. Tile patches of same degrees are grouped and
+    shared tile patches are composed with the same matrix. Returns None,
+    if deformation function patches differ in type or degrees, or if any
+    tile patch is rational. Internal use only.
+
+    Parameters
+    ----------
+    def_fun_patches : list<spline>
+    tiles : list<list<spline>>
+    multipatch : bool
+      Default is False. Returns MultiPatch.
+
+    Returns
+    -------
+    composed : list<spline> or MultiPatch
+    """
+    first = def_fun_patches[0]
+    outer_degrees = np.asarray(first.degrees)
+    if any(
+            type(d) is not type(first)
+            or not np.array_equal(d.degrees, outer_degrees)
+            for d in def_fun_patches
+    ):
+        return None
+
+    if any(_utils.is_rational(t) for tile in tiles for t in tile):
+        return None
+
+    outer_rational = _utils.is_rational(first)
+    outer_control_points = np.stack(
+            [d.control_points for d in def_fun_patches]
+    )
+    outer_weights = None
+    if outer_rational:
+        outer_weights = np.stack([d.weights for d in def_fun_patches])
+
+    # group (patch, tile patch) pairs by tile patch degrees
+    offsets = utils.arr.counts_to_offsets([len(tile) for tile in tiles])
+    groups = dict()
+    for i, tile in enumerate(tiles):
+        for j, tile_patch in enumerate(tile):
+            groups.setdefault(tuple(tile_patch.degrees), []).append(
+                    (i, offsets[i] + j, tile_patch)
+            )
+
+    composed = [None] * offsets[-1]
+    results = []
+    for inner_degrees, group in groups.items():
+        patch_ids = np.array([g[0] for g in group])
+
+        # shared tile patches are composed with the same matrix
+        unique_ids = dict()
+        unique_patches = []
+        inner_ids = []
+        for _, _, tile_patch in group:
+            if id(tile_patch) not in unique_ids:
+                unique_ids[id(tile_patch)] = len(unique_patches)
+                unique_patches.append(tile_patch)
+            inner_ids.append(unique_ids[id(tile_patch)])
+        inner_control_points = np.stack(
+                [t.control_points for t in unique_patches]
+        )
+
+        degrees, control_points, weights = composition.compose(
+                outer_degrees,
+                outer_control_points[patch_ids],
+                inner_degrees,
+                inner_control_points,
+                outer_weights=None
+                if outer_weights is None else outer_weights[patch_ids],
+                inner_ids=inner_ids,
+        )
+        positions = np.array([g[1] for g in group])
+        if multipatch:
+            results.append((positions, degrees, control_points, weights))
+            continue
+
+        for k, position in enumerate(positions):
+            if outer_rational:
+                composed[position] = base.RationalBezier(
+                        degrees=degrees,
+                        control_points=control_points[k],
+                        weights=weights[k],
+                )
+            else:
+                composed[position] = base.Bezier(
+                        degrees=degrees,
+                        control_points=control_points[k],
+                )
+
+    if not multipatch:
+        return composed
+
+    # write groups into contiguous arrays
+    all_degrees = np.empty(
+            (offsets[-1], len(results[0][1])), dtype=settings.INT_DTYPE
+    )
+    for positions, degrees, _, _ in results:
+        all_degrees[positions] = degrees
+    cp_offsets = utils.arr.counts_to_offsets(np.prod(all_degrees + 1, axis=1))
+    all_control_points = np.empty(
+            (cp_offsets[-1], outer_control_points.shape[2]),
+            dtype=settings.FLOAT_DTYPE,
+    )
+    all_weights = np.empty((cp_offsets[-1], 1)) if outer_rational else None
+    for positions, _, control_points, weights in results:
+        cp_ids = cp_offsets[positions][:, np.newaxis] + np.arange(
+                control_points.shape[1]
+        )
+        all_control_points[cp_ids] = control_points
+        if outer_rational:
+            all_weights[cp_ids] = weights
+
+    return MultiPatch(
+            degrees=all_degrees,
+            control_points=all_control_points,
+            weights=all_weights,
+            offsets=cp_offsets,
+    )
+
+
+def _compose(
+        def_fun_patches,
+        tiles,
+        nthreads=None,
+        use_processes=False,
+        batched=True,
+        multipatch=False,
+):
+    """Composes deformation function patches with their tiles. Patch ranges
+    are composed in parallel chunks and output order is preserved: all
+    patches of the first tile, then the second one, and so on. Internal use
+    only.
+
+    Parameters
+    ----------
+    def_fun_patches : list<spline>
+    tiles : list<list<spline>>
+      one tile per deformation function patch
+    nthreads : int
+      Default is settings.NTHREADS.
+    use_processes : bool
+      Default is False.
+    batched : bool
+      Default is True. Try batched composition first.
+    multipatch : bool
+      Default is False. Returns MultiPatch.
+
+    Returns
+    -------
+    composed : list<spline> or MultiPatch
+    """
+    if batched and len(def_fun_patches) != 0:
+        composed = _compose_batched(
+                def_fun_patches, tiles, multipatch=multipatch
+        )
+        if composed is not None:
+            return composed
+
+    if multipatch:
+        return MultiPatch(
+                splines=_compose(
+                        def_fun_patches,
+                        tiles,
+                        nthreads=nthreads,
+                        use_processes=use_processes,
+                        batched=False,
+                )
+        )
+
+    if nthreads is None:
+        nthreads = settings.NTHREADS
+
+    n_patches = len(def_fun_patches)
+    if nthreads <= 1 or n_patches <= 1:
+        return _compose_chunk(def_fun_patches, tiles)
+
+    # a few chunks per worker for load balancing
+    chunk_size = max(n_patches // (nthreads * 4), 1)
+    ranges = [
+            (i, min(i + chunk_size, n_patches))
+            for i in range(0, n_patches, chunk_size)
+    ]
+
+    if use_processes:
+        executor_type = ProcessPoolExecutor
+        worker = _compose_chunk_dicts
+        def_fun_patches = [_to_dict(d) for d in def_fun_patches]
+        # same tile objects are converted only once
+        converted = dict()
+        tile_dicts = []
+        for tile in tiles:
+            if id(tile) not in converted:
+                converted[id(tile)] = [_to_dict(t) for t in tile]
+            tile_dicts.append(converted[id(tile)])
+        tiles = tile_dicts
+    else:
+        executor_type = ThreadPoolExecutor
+        worker = _compose_chunk
+
+    with executor_type(max_workers=nthreads) as executor:
+        futures = [
+                executor.submit(worker, def_fun_patches[b:e], tiles[b:e])
+                for b, e in ranges
+        ]
+        composed = []
+        for f in futures:
+            composed.extend(f.result())
+
+    if use_processes:
+        composed = [_from_dict(c) for c in composed]
+
+    return composed
+
+
 class _UserTile():
 
     def __init__(self, microtile):
@@ -3,18 +3,22 @@
 Interface for tools and generators creating simple microstructures.
 """
 
-from gustaf.spline.microstructure.tiles import crosstile3d, \
+from gustaf.spline.microstructure.tiles import tilebase, crosstile3d, \
     inversecrosstile3d, crosstile2d
 
+from gustaf.spline.microstructure.tiles.tilebase import TileBase
+
 from gustaf.spline.microstructure.tiles.crosstile3d import CrossTile3D
 from gustaf.spline.microstructure.tiles.crosstile2d import CrossTile2D
 from gustaf.spline.microstructure.tiles.inversecrosstile3d \
     import InverseCrossTile3D
 
 __all__ = [
+        "tilebase",
         "crosstile3d",
         "crosstile2d",
         "inversecrosstile3d",
+        "TileBase",
         "CrossTile3D",
         "CrossTile2D",
         "InverseCrossTile3D",
@@ -1,9 +1,10 @@
 import numpy as np
 
 from gustaf.spline import base
+from gustaf.spline.microstructure.tiles.tilebase import TileBase
 
 
-class CrossTile2D(base.GustafBase):
+class CrossTile2D(TileBase):
 
     def __init__(self):
         """Simple crosstile with linear-quadratic branches and a trilinear
@@ -53,6 +54,24 @@ class CrossTile2D(base.GustafBase):
         """
         return self._dim
 
+    def _parameter_bounds(self, closure=None, center_expansion=1., **kwargs):
+        """Returns open interval of valid branch radii.
+
+        Parameters
+        ----------
+        closure : str
+        center_expansion : float
+
+        Returns
+        -------
+        bounds : tuple
+          (lower, upper)
+        """
+        if closure is not None:
+            return 0., .5
+
+        return 0., min(.5, (.5 / center_expansion))
+
     def closing_tile(
             self,
             parameters=None,
@@ -1,9 +1,10 @@
 import numpy as np
 
 from gustaf.spline import base
+from gustaf.spline.microstructure.tiles.tilebase import TileBase
 
 
-class InverseCrossTile3D(base.GustafBase):
+class InverseCrossTile3D(TileBase):
     """Class that provides necessary functions to create inverse microtile,
     that can be used to describe the domain within a microstructure."""
 
@@ -57,6 +58,62 @@ class InverseCrossTile3D(base.GustafBase):
         """
         return self._dim
 
+    def _parameter_bounds(
+            self,
+            closure=None,
+            seperator_distance=None,
+            center_expansion=1.,
+            **kwargs
+    ):
+        """Returns open interval of valid branch radii.
+
+        Parameters
+        ----------
+        closure : str
+        seperator_distance : float
+        center_expansion : float
+
+        Returns
+        -------
+        bounds : tuple
+          (lower, upper)
+        """
+        if closure is not None:
+            return 0., .5
+
+        max_radius = min(.5, (.5 / center_expansion))
+        if seperator_distance is not None:
+            max_radius = min(max_radius, seperator_distance)
+
+        return 0., max_radius
+
+    def _affine_regions(
+            self, parameters_array, closure=None, center_expansion=1., **kwargs
+    ):
+        """Branches are clipped by the center radius, so control points are
+        affine within regions of equal clipping.
+
+        Parameters
+        ----------
+        parameters_array : np.ndarray
+          (n_tiles, 1, 6)
+        closure : str
+        center_expansion : float
+
+        Returns
+        -------
+        region_ids : (n_tiles,) np.ndarray
+        """
+        if closure is not None:
+            return np.zeros(len(parameters_array), dtype=np.int64)
+
+        radii = parameters_array[:, 0]
+        center_r = radii.mean(axis=1, keepdims=True) * center_expansion
+
+        return np.packbits(
+                radii < center_r, axis=1, bitorder="little"
+        )[:, 0].astype(np.int64)
+
     def closing_tile(
             self,
             parameters=None,
@@ -0,0 +1,256 @@
+"""gustaf/spline/microstructure/tiles/tilebase.py.
+
+Base class of microtiles with batched tile creation.
+"""
+
+import numpy as np
+
+from gustaf import settings, utils
+from gustaf.spline import base
+
+
+class TileBase(base.GustafBase):
+    """Base class of microtiles. Derived classes provide `create_tile`,
+    `evaluation_points` and `parameter_space_dimension` and may provide
+    `closing_tile` and `_parameter_bounds`.
+
+    Control points of the tiles are affine in the tile parameters within
+    regions given by `_affine_regions`. This is used by `create_tiles()` to
+    create a whole field of tiles from a few tiles per region.
+    """
+
+    def _parameter_bounds(self, closure=None, **kwargs):
+        """Returns open interval of valid tile parameters.
+
+        Parameters
+        ----------
+        closure : str
+        **kwargs
+          Same as in create_tile or closing_tile
+
+        Returns
+        -------
+        bounds : tuple
+          (lower, upper)
+        """
+        return 0., .5
+
+    def _tile(self, parameters, closure=None, **kwargs):
+        """Creates a single tile or closing tile.
+
+        Parameters
+        ----------
+        parameters : tuple(np.ndarray)
+        closure : str
+        **kwargs
+
+        Returns
+        -------
+        microtile_list : list(splines)
+        """
+        if closure is None:
+            return self.create_tile(parameters=parameters, **kwargs)
+        else:
+            return self.closing_tile(
+                    parameters=parameters, closure=closure, **kwargs
+            )
+
+    def _affine_regions(self, parameters_array, closure=None, **kwargs):
+        """Returns ids of regions of the parameter space, where control points
+        are affine in the tile parameters. By default, there's one region.
+
+        Parameters
+        ----------
+        parameters_array : np.ndarray
+          (n_tiles, parameter_space_dimension, n_evaluation_points)
+        closure : str
+        **kwargs
+
+        Returns
+        -------
+        region_ids : (n_tiles,) np.ndarray
+        """
+        return np.zeros(len(parameters_array), dtype=np.int64)
+
+    def _control_points(self, parameters, closure=None, **kwargs):
+        """Creates a tile and returns its stacked control points.
+
+        Parameters
+        ----------
+        parameters : np.ndarray
+          (parameter_space_dimension, n_evaluation_points)
+        closure : str
+        **kwargs
+
+        Returns
+        -------
+        splines : list(splines)
+        control_points : (n, dim) np.ndarray
+        """
+        splines = self._tile(tuple(parameters), closure=closure, **kwargs)
+
+        return splines, np.vstack([s.control_points for s in splines])
+
+    def _affine_control_points(self, samples, closure=None, **kwargs):
+        """Creates control points of tiles whose control points are affine in
+        the tile parameters. Tiles are only created for affinely independent
+        samples, all others are interpolated from them. Since only given
+        samples are used, no tile is created outside of their region. The
+        interpolation is verified with another sample on every call.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+          (n, parameter_space_dimension, n_evaluation_points) parameters of
+          the same region
+        closure : str
+        **kwargs
+
+        Returns
+        -------
+        control_points : (n, n_control_points, dim) np.ndarray or None
+          None, if tiles are not affine in their parameters or have rational
+          patches.
+        """
+        lower, upper = self._parameter_bounds(closure=closure, **kwargs)
+        tolerance = settings.TOLERANCE * (upper - lower)
+        differences = (samples - samples[0]).reshape(len(samples), -1)
+
+        # greedy selection of affinely independent samples
+        selected = [0]
+        basis = np.empty((0, differences.shape[1]), dtype=np.float64)
+        residuals = differences.copy()
+        while len(basis) < differences.shape[1]:
+            distances = np.linalg.norm(residuals, axis=1)
+            furthest = int(np.argmax(distances))
+            if distances[furthest] <= tolerance:
+                break
+            selected.append(furthest)
+            direction = residuals[furthest] / distances[furthest]
+            basis = np.vstack((basis, direction))
+            residuals -= np.outer(residuals @ direction, direction)
+
+        self._logd(
+                f"creating {len(selected)} tiles to interpolate "
+                f"{len(samples)} tiles"
+        )
+        splines, reference_cps = self._control_points(
+                samples[0], closure=closure, **kwargs
+        )
+        if any("weights" in s.required_properties for s in splines):
+            return None
+
+        supports = [reference_cps]
+        for i in selected[1:]:
+            supports.append(
+                    self._control_points(samples[i], closure=closure,
+                                         **kwargs)[1]
+            )
+            if supports[-1].shape != reference_cps.shape:
+                return None
+        if len(supports) == 1:
+            return np.repeat(reference_cps[np.newaxis], len(samples), axis=0)
+        supports = np.stack(supports[1:]) - reference_cps
+
+        # affine coordinates of all samples w.r.t. the selected samples
+        coordinates = np.linalg.lstsq(
+                differences[selected[1:]].T, differences.T, rcond=None
+        )[0].T
+        control_points = reference_cps + np.tensordot(
+                coordinates, supports, axes=1
+        )
+
+        # verify with the sample furthest from the selected ones
+        coordinates[selected] = 0.
+        check = int(np.argmax(np.abs(coordinates).sum(axis=1)))
+        if check in selected:
+            return control_points
+
+        check_cps = self._control_points(
+                samples[check], closure=closure, **kwargs
+        )[1]
+        if check_cps.shape != reference_cps.shape or not np.allclose(
+                check_cps, control_points[check]
+        ):
+            self._logd("tile is not affine in its parameters")
+            return None
+
+        return control_points
+
+    def create_tiles(self, parameters_array, closure=None, **kwargs):
+        """Creates control points of many tiles at once. Patches of all tiles
+        share degrees, so control points are stacked per patch.
+
+        Parameters
+        ----------
+        parameters_array : np.ndarray
+          (n_tiles, parameter_space_dimension, n_evaluation_points)
+        closure : str
+          If not None, closing tiles are created
+        **kwargs
+          will be passed to `create_tile` or `closing_tile`
+
+        Returns
+        -------
+        degrees : list<np.ndarray>
+          degrees of each patch
+        control_points : list<np.ndarray>
+          (n_tiles, n_control_points, dim) for each patch
+        """
+        parameters_array = np.asarray(parameters_array, dtype=np.float64)
+        n_tiles = len(parameters_array)
+        parameters_array = parameters_array.reshape(
+                n_tiles,
+                self.parameter_space_dimension,
+                len(self.evaluation_points),
+        )
+
+        # range checks for all tiles at once
+        lower, upper = self._parameter_bounds(closure=closure, **kwargs)
+        invalid = np.where(
+                ~((parameters_array > lower) & (parameters_array < upper)
+                  ).reshape(n_tiles, -1).all(axis=1)
+        )[0]
+        if len(invalid) != 0:
+            raise ValueError(
+                    f"Parameters must be in ({lower},{upper}). Invalid tiles: "
+                    f"{invalid.tolist()}"
+            )
+
+        # structure of tiles
+        splines = self._tile(
+                tuple(parameters_array[0]), closure=closure, **kwargs
+        )
+        degrees = [np.asarray(s.degrees) for s in splines]
+        offsets = utils.arr.counts_to_offsets(
+                [len(s.control_points) for s in splines]
+        )
+        stacked = np.empty(
+                (n_tiles, offsets[-1], splines[0].control_points.shape[1]),
+                dtype=np.float64,
+        )
+
+        regions = self._affine_regions(
+                parameters_array, closure=closure, **kwargs
+        )
+        for region in np.unique(regions):
+            tile_ids = np.where(regions == region)[0]
+            control_points = self._affine_control_points(
+                    parameters_array[tile_ids], closure=closure, **kwargs
+            )
+            if control_points is None:
+                # create one by one
+                for i in tile_ids:
+                    stacked[i] = self._control_points(
+                            parameters_array[i], closure=closure, **kwargs
+                    )[1]
+                continue
+
+            stacked[tile_ids] = control_points
+
+        control_points = [
+                stacked[:, offsets[i]:offsets[i + 1]]
+                for i in range(len(degrees))
+        ]
+
+        return degrees, control_points
@@ -0,0 +1,834 @@
+"""gustaf/spline/multipatch.py.
+
+Compact container of many Bezier patches. Patches are stored as contiguous
+arrays with offsets and are only created as spline objects on request.
+"""
+
+import numpy as np
+
+from gustaf import settings
+from gustaf import utils
+from gustaf._base import GustafBase
+from gustaf.spline import base
+from gustaf.spline import composition
+
+
+class MultiPatch(GustafBase):
+
+    __slots__ = (
+            "_degrees",
+            "_control_points",
+            "_weights",
+            "_offsets",
+            "_patches",
+    )
+
+    def __init__(
+            self,
+            splines=None,
+            degrees=None,
+            control_points=None,
+            weights=None,
+            offsets=None,
+    ):
+        """Compact multi-patch spline. Either splines or arrays can be given.
+        Polynomial patches of a rational MultiPatch have unit weights.
+
+        Parameters
+        -----------
+        splines: list
+          Bezier and RationalBezier patches of same para_dim and dim
+        degrees: (n, para_dim) array-like
+        control_points: (m, dim) array-like
+          control points of all patches, stacked
+        weights: (m, 1) array-like
+          (Optional) weights of all patches, stacked
+        offsets: (n + 1,) array-like
+          (Optional) start of each patch in control_points. Default is
+          computed from degrees.
+
+        Returns
+        --------
+        None
+        """
+        self._patches = dict()
+
+        if splines is not None:
+            if len(splines) == 0:
+                raise ValueError("At least one spline is required.")
+
+            degrees = [s.degrees for s in splines]
+            control_points = np.vstack([s.control_points for s in splines])
+            if any("weights" in s.required_properties for s in splines):
+                weights = np.vstack(
+                        [
+                                s.weights if "weights" in s.required_properties
+                                else np.ones((len(s.control_points), 1))
+                                for s in splines
+                        ]
+                )
+
+        if degrees is None or control_points is None:
+            raise ValueError("Either splines or degrees and control_points.")
+
+        self._degrees = np.asarray(degrees, dtype=settings.INT_DTYPE)
+        if self._degrees.ndim != 2:
+            raise ValueError("Degrees should be (n, para_dim).")
+
+        if offsets is None:
+            offsets = utils.arr.counts_to_offsets(
+                    np.prod(self._degrees + 1, axis=1)
+            )
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+
+        self._control_points = utils.arr.make_c_contiguous(
+                control_points, settings.FLOAT_DTYPE
+        )
+        if len(self._control_points) != self._offsets[-1]:
+            raise ValueError(
+                    "Number of control points does not match degrees."
+            )
+
+        self._weights = None
+        if weights is not None:
+            self._weights = utils.arr.make_c_contiguous(
+                    weights, settings.FLOAT_DTYPE
+            ).reshape(-1, 1)
+            if len(self._weights) != len(self._control_points):
+                raise ValueError("Number of weights does not match.")
+
+    @classmethod
+    def from_stacked(cls, degrees, control_points, weights=None):
+        """Creates MultiPatch from patches of same degrees, as returned by
+        `composition.compose()`.
+
+        Parameters
+        -----------
+        degrees: (para_dim,) array-like
+        control_points: (n, n_cps, dim) np.ndarray
+        weights: (n, n_cps, 1) np.ndarray
+          (Optional)
+
+        Returns
+        --------
+        multipatch: MultiPatch
+        """
+        n_patches, n_cps, dim = np.shape(control_points)
+
+        return cls(
+                degrees=np.tile(degrees, (n_patches, 1)),
+                control_points=np.reshape(control_points, (-1, dim)),
+                weights=None if weights is None else np.reshape(
+                        weights, (-1, 1)
+                ),
+                offsets=np.arange(n_patches + 1) * n_cps,
+        )
+
+    @classmethod
+    def concat(cls, multipatches):
+        """Concatenates MultiPatches in given order. Either all or none of
+        them should be rational.
+
+        Parameters
+        -----------
+        multipatches: list
+          MultiPatch objects
+
+        Returns
+        --------
+        multipatch: MultiPatch
+        """
+        if len(multipatches) == 0:
+            raise ValueError("At least one MultiPatch is required.")
+
+        rational = [m.weights is not None for m in multipatches]
+        if any(rational) and not all(rational):
+            raise ValueError("Can't concat rational and polynomial patches.")
+
+        cp_offsets = utils.arr.counts_to_offsets(
+                [m.offsets[-1] for m in multipatches]
+        )
+        offsets = np.hstack(
+                [
+                        m.offsets[:-1] + o
+                        for m, o in zip(multipatches, cp_offsets[:-1])
+                ] + [cp_offsets[-1:]]
+        )
+
+        return cls(
+                degrees=np.vstack([m.degrees for m in multipatches]),
+                control_points=np.vstack(
+                        [m.control_points for m in multipatches]
+                ),
+                weights=np.vstack([m.weights for m in multipatches])
+                if all(rational) else None,
+                offsets=offsets,
+        )
+
+    def __len__(self):
+        """Returns number of patches."""
+        return len(self._degrees)
+
+    def __getitem__(self, index):
+        """Returns patch of given index."""
+        return self.patch(index)
+
+    def __iter__(self):
+        """Iterates over patches, that are created on the fly."""
+        for i in range(len(self)):
+            yield self.patch(i)
+
+    @property
+    def para_dim(self):
+        """Returns parametric dimension.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        para_dim: int
+        """
+        return self._degrees.shape[1]
+
+    @property
+    def dim(self):
+        """Returns physical dimension.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        dim: int
+        """
+        return self._control_points.shape[1]
+
+    @property
+    def degrees(self):
+        """Returns degrees of all patches.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        degrees: (n, para_dim) np.ndarray
+        """
+        return self._degrees
+
+    @property
+    def control_points(self):
+        """Returns stacked control points of all patches.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        control_points: (m, dim) np.ndarray
+        """
+        return self._control_points
+
+    @property
+    def weights(self):
+        """Returns stacked weights of all patches.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        weights: (m, 1) np.ndarray
+          None if polynomial
+        """
+        return self._weights
+
+    @property
+    def offsets(self):
+        """Returns start of each patch in control_points.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        offsets: (n + 1,) np.ndarray
+        """
+        return self._offsets
+
+    @property
+    def patches(self):
+        """Returns all patches as splines.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        patches: list
+        """
+        return list(self)
+
+    def patch_control_points(self, index):
+        """Returns control points of a patch. This is a view.
+
+        Parameters
+        -----------
+        index: int
+
+        Returns
+        --------
+        control_points: (n, dim) np.ndarray
+        """
+        return self._control_points[
+                self._offsets[index]:self._offsets[index + 1]]
+
+    def patch(self, index):
+        """Returns patch as Bezier or RationalBezier. Patch is created once and
+        saved. Created patch has copies of control points.
+
+        Parameters
+        -----------
+        index: int
+
+        Returns
+        --------
+        patch: Bezier or RationalBezier
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Patch index out of range: {index}")
+
+        patch = self._patches.get(index, None)
+        if patch is not None:
+            return patch
+
+        range_ = slice(self._offsets[index], self._offsets[index + 1])
+        if self._weights is None:
+            patch = base.Bezier(
+                    degrees=self._degrees[index],
+                    control_points=self._control_points[range_].copy(),
+            )
+        else:
+            patch = base.RationalBezier(
+                    degrees=self._degrees[index],
+                    control_points=self._control_points[range_].copy(),
+                    weights=self._weights[range_].copy(),
+            )
+        self._patches[index] = patch
+
+        return patch
+
+    def _degree_groups(self, patch_ids):
+        """Groups patches of same degrees.
+
+        Parameters
+        -----------
+        patch_ids: (n,) np.ndarray
+
+        Returns
+        --------
+        groups: list
+          (degrees, positions in patch_ids)
+        """
+        unique_degrees, inverse = np.unique(
+                self._degrees[patch_ids], axis=0, return_inverse=True
+        )
+        inverse = inverse.ravel()
+
+        return [
+                (degrees, np.where(inverse == i)[0])
+                for i, degrees in enumerate(unique_degrees)
+        ]
+
+    def evaluate(self, queries, patch_ids=None):
+        """Evaluates patches at the same parametric queries. Patches of same
+        degrees are evaluated with one basis evaluation and one tensor
+        contraction.
+
+        Parameters
+        -----------
+        queries: (n, para_dim) array-like
+        patch_ids: (m,) array-like
+          (Optional) Default is all patches.
+
+        Returns
+        --------
+        results: (m, n, dim) np.ndarray
+        """
+        queries = np.asarray(queries, dtype=settings.FLOAT_DTYPE)
+        if queries.ndim != 2 or queries.shape[1] != self.para_dim:
+            raise ValueError(f"Queries should be (n, {self.para_dim}).")
+
+        if patch_ids is None:
+            patch_ids = np.arange(len(self))
+        patch_ids = np.asarray(patch_ids, dtype=np.int64)
+
+        results = np.empty(
+                (len(patch_ids), len(queries), self.dim),
+                dtype=settings.FLOAT_DTYPE,
+        )
+        for degrees, positions in self._degree_groups(patch_ids):
+            basis = composition.bernstein_basis(degrees, queries)
+            n_cps = basis.shape[1]
+            cp_ids = self._offsets[patch_ids[positions]][:, np.newaxis] \
+                + np.arange(n_cps)
+
+            if self._weights is None:
+                results[positions] = np.einsum(
+                        "qc,pcd->pqd", basis, self._control_points[cp_ids]
+                )
+                continue
+
+            # rational: (p, q, c) weighted basis
+            weights = self._weights[cp_ids, 0]
+            weighted = basis[np.newaxis] * weights[:, np.newaxis, :]
+            results[positions] = np.einsum(
+                    "pqc,pcd->pqd", weighted, self._control_points[cp_ids]
+            ) / weighted.sum(axis=2, keepdims=True)
+
+        return results
+
+    def _evaluate_pairwise(self, patch_ids, queries):
+        """Evaluates each patch at its own query.
+
+        Parameters
+        -----------
+        patch_ids: (n,) np.ndarray
+        queries: (n, para_dim) np.ndarray
+
+        Returns
+        --------
+        results: (n, dim) np.ndarray
+        """
+        results = np.empty(
+                (len(patch_ids), self.dim), dtype=settings.FLOAT_DTYPE
+        )
+        for degrees, positions in self._degree_groups(patch_ids):
+            basis = composition.bernstein_basis(degrees, queries[positions])
+            cp_ids = self._offsets[patch_ids[positions]][:, np.newaxis] \
+                + np.arange(basis.shape[1])
+
+            if self._weights is not None:
+                basis = basis * self._weights[cp_ids, 0]
+                basis /= basis.sum(axis=1, keepdims=True)
+
+            results[positions] = np.einsum(
+                    "nc,ncd->nd", basis, self._control_points[cp_ids]
+            )
+
+        return results
+
+    def _corner_points(self):
+        """Returns corner control points of all patches.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        corner_points: (n, 2 ** para_dim, dim) np.ndarray
+          first parametric dimension fastest
+        """
+        para_dim = self.para_dim
+        bits = (np.arange(2**para_dim)[:, np.newaxis]
+                >> np.arange(para_dim)) & 1
+
+        # strides of control point grids, first dimension fastest
+        n_cps = self._degrees + 1
+        strides = np.cumprod(
+                np.hstack(
+                        (np.ones((len(self), 1), dtype=n_cps.dtype),
+                         n_cps[:, :-1])
+                ),
+                axis=1,
+        )
+        corner_cps = self._offsets[:-1, np.newaxis] + (
+                bits[np.newaxis] * (self._degrees * strides)[:, np.newaxis]
+        ).sum(axis=2)
+
+        return self._control_points[corner_cps]
+
+    def discretize(self, resolution, tolerance=None):
+        """Discretizes all patches into a single conforming quad or hexa mesh.
+        Shared corners, edges and faces of patches are found topologically
+        from corner control points, numbered once and sampled only once.
+        Patches are assumed to match at interfaces that share corners.
+
+        Parameters
+        -----------
+        resolution: int
+          number of vertices per parametric dimension of each patch
+        tolerance: float
+          (Optional) Tolerance to match corner control points. Default is
+          settings.TOLERANCE.
+
+        Returns
+        --------
+        mesh: Faces or Volumes
+        """
+        from gustaf.faces import Faces
+        from gustaf.volumes import Volumes
+
+        numbering = InterfaceNumbering(
+                resolution, self.para_dim, tolerance=tolerance
+        )
+        vertices, elements = self.discretize_chunk(numbering)
+
+        mesh_type = Faces if self.para_dim == 2 else Volumes
+
+        return mesh_type(vertices=vertices, elements=elements)
+
+    def discretize_chunk(self, numbering):
+        """Discretizes patches with a numbering that may already contain
+        vertices of previous chunks. Only vertices that are new to the
+        numbering are evaluated and returned.
+
+        Parameters
+        -----------
+        numbering: InterfaceNumbering
+
+        Returns
+        --------
+        vertices: (m, dim) np.ndarray
+          new vertices, ordered by their ids
+        elements: (k, 4) or (k, 8) np.ndarray
+          quads or hexas, referring to ids of numbering
+        """
+        if self.para_dim != numbering.para_dim:
+            raise ValueError("Numbering has different para_dim.")
+
+        n_before = numbering.n_vertices
+        global_ids = numbering.number(self._corner_points())
+
+        # evaluate each new vertex once, at the first patch that has it
+        self._logd("evaluating vertices")
+        n_local = global_ids.shape[1]
+        flat = global_ids.ravel()
+        is_new = flat >= n_before
+        # new ids are contiguous, so unique ids are in vertex order
+        _, first_ids = np.unique(flat[is_new], return_index=True)
+        first_ids = np.where(is_new)[0][first_ids]
+
+        vertices = self._evaluate_pairwise(
+                first_ids // n_local,
+                numbering.queries[first_ids % n_local],
+        )
+        elements = global_ids[:, numbering.local_elements].reshape(
+                -1, numbering.local_elements.shape[1]
+        )
+
+        return vertices, elements
+
+    def sample(self, resolutions):
+        """Evaluates all patches at raster points of the unit parametric
+        domain.
+
+        Parameters
+        -----------
+        resolutions: int or (para_dim,) array-like
+
+        Returns
+        --------
+        results: (n * prod(resolutions), dim) np.ndarray
+          points of each patch are contiguous
+        """
+        from gustaf.create.vertices import raster
+        from gustaf.spline._utils import to_res_list
+
+        queries = raster(
+                [[0.] * self.para_dim, [1.] * self.para_dim],
+                to_res_list(resolutions, self.para_dim),
+        ).vertices
+
+        return self.evaluate(queries).reshape(-1, self.dim)
+
+    def copy(self):
+        """Returns a deepcopy. Saved patches are not copied.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        copy: MultiPatch
+        """
+        weights = self._weights
+        if weights is not None:
+            weights = weights.copy()
+
+        return type(self)(
+                degrees=self._degrees.copy(),
+                control_points=self._control_points.copy(),
+                weights=weights,
+                offsets=self._offsets.copy(),
+        )
+
+
+class InterfaceNumbering(GustafBase):
+
+    __slots__ = (
+            "_resolution",
+            "_para_dim",
+            "_tolerance",
+            "_corners",
+            "_corner_ids",
+            "_edges",
+            "_faces",
+            "_n_vertices",
+            "_queries",
+            "_local_elements",
+    )
+
+    def __init__(self, resolution, para_dim, tolerance=None):
+        """Vertex numbering of structured patch discretizations, that is kept
+        over several chunks of patches. Corners are identified by their
+        position, merged within tolerance. Edges and faces are identified by
+        their corner ids. Interior vertices of edges and faces are ordered
+        by corner ids, so that all patches sharing them agree.
+
+        Parameters
+        -----------
+        resolution: int
+          number of vertices per parametric dimension of each patch
+        para_dim: int
+          2 or 3
+        tolerance: float
+          (Optional) Default is settings.TOLERANCE.
+
+        Returns
+        --------
+        None
+        """
+        from gustaf.create.vertices import raster
+
+        if para_dim not in (2, 3):
+            raise ValueError("Only para_dim 2 and 3 are supported.")
+        resolution = int(resolution)
+        if resolution < 2:
+            raise ValueError("Resolution should be at least 2.")
+        if tolerance is None:
+            tolerance = settings.TOLERANCE
+
+        self._resolution = resolution
+        self._para_dim = para_dim
+        self._tolerance = tolerance
+        self._corners = None
+        self._corner_ids = np.empty(0, dtype=np.int64)
+        self._edges = dict()
+        self._faces = dict()
+        self._n_vertices = 0
+
+        self._queries = raster(
+                [[0.] * para_dim, [1.] * para_dim],
+                [resolution] * para_dim,
+        ).vertices
+        if para_dim == 2:
+            self._local_elements = utils.connec.make_quad_faces(
+                    [resolution] * 2
+            )
+        else:
+            self._local_elements = utils.connec.make_hexa_volumes(
+                    [resolution] * 3
+            )
+
+    @property
+    def para_dim(self):
+        """Returns parametric dimension."""
+        return self._para_dim
+
+    @property
+    def n_vertices(self):
+        """Returns number of numbered vertices."""
+        return self._n_vertices
+
+    @property
+    def queries(self):
+        """Returns parametric coordinates of local vertices of a patch."""
+        return self._queries
+
+    @property
+    def local_elements(self):
+        """Returns elements of a patch, referring to local vertices."""
+        return self._local_elements
+
+    def _ids(self, table, keys, block_size):
+        """Returns first vertex id of each key. Unknown keys get a new block
+        of vertex ids.
+
+        Parameters
+        -----------
+        table: dict
+        keys: (n, m) np.ndarray
+          int
+        block_size: int
+
+        Returns
+        --------
+        ids: (n,) np.ndarray
+        """
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        unique_ids = np.empty(len(unique_keys), dtype=np.int64)
+        for i, key in enumerate(unique_keys):
+            key = key.tobytes()
+            vertex_id = table.get(key, None)
+            if vertex_id is None:
+                vertex_id = self._n_vertices
+                table[key] = vertex_id
+                self._n_vertices += block_size
+            unique_ids[i] = vertex_id
+
+        return unique_ids[inverse.ravel()]
+
+    def _number_corners(self, points):
+        """Returns vertex ids of corner points. Points are merged within
+        tolerance, among themselves and with corners of previous chunks.
+        Unknown corners get new vertex ids.
+
+        Parameters
+        -----------
+        points: (n, dim) np.ndarray
+
+        Returns
+        --------
+        ids: (n,) np.ndarray
+        """
+        from scipy.spatial import cKDTree as KDTree
+
+        unique_points, _, inverse, _ = utils.arr.close_rows(
+                points, tolerance=self._tolerance
+        )
+        unique_ids = np.full(len(unique_points), -1, dtype=np.int64)
+
+        # look up corners of previous chunks
+        if self._corners is not None:
+            distances, known = KDTree(self._corners).query(
+                    unique_points, distance_upper_bound=self._tolerance
+            )
+            found = np.isfinite(distances)
+            unique_ids[found] = self._corner_ids[known[found]]
+
+        new = unique_ids < 0
+        n_new = int(new.sum())
+        unique_ids[new] = self._n_vertices + np.arange(n_new)
+        self._n_vertices += n_new
+
+        if self._corners is None:
+            self._corners = unique_points[new]
+        else:
+            self._corners = np.vstack((self._corners, unique_points[new]))
+        self._corner_ids = np.concatenate(
+                (self._corner_ids, unique_ids[new])
+        )
+
+        return unique_ids[inverse]
+
+    def number(self, corner_points):
+        """Returns vertex ids of all local vertices of patches.
+
+        Parameters
+        -----------
+        corner_points: (n, 2 ** para_dim, dim) np.ndarray
+          first parametric dimension fastest
+
+        Returns
+        --------
+        global_ids: (n, resolution ** para_dim) np.ndarray
+        """
+        para_dim = self._para_dim
+        r = self._resolution
+        n_patches = len(corner_points)
+        n_inner = r - 2
+        strides = r**np.arange(para_dim)
+        global_ids = np.empty((n_patches, r**para_dim), dtype=np.int64)
+
+        # corners
+        corner_ids = self._number_corners(
+                corner_points.reshape(-1, corner_points.shape[2])
+        ).reshape(n_patches, -1)
+        bits = (np.arange(2**para_dim)[:, np.newaxis]
+                >> np.arange(para_dim)) & 1
+        global_ids[:, (bits * (r - 1) * strides).sum(axis=1)] = corner_ids
+        if n_inner == 0:
+            return global_ids
+
+        # edges, oriented from smaller to larger corner id
+        t = np.arange(n_inner)
+        for d in range(para_dim):
+            for k in range(2**para_dim):
+                if (k >> d) & 1:
+                    continue
+                start = corner_ids[:, k]
+                end = corner_ids[:, k | (1 << d)]
+                edge_ids = self._ids(
+                        self._edges,
+                        np.sort((start, end), axis=0).T,
+                        n_inner,
+                )
+                local = (bits[k] * (r - 1) * strides).sum() \
+                    + (t + 1) * strides[d]
+                global_ids[:, local] = edge_ids[:, np.newaxis] + np.where(
+                        (start > end)[:, np.newaxis], n_inner - 1 - t, t
+                )
+
+        # faces of volumetric patches, oriented by their corner ids
+        if para_dim == 3:
+            i, j = [
+                    ij.ravel() for ij in np.meshgrid(t, t, indexing="ij")
+            ]
+            rows = np.arange(n_patches)
+            for d in range(3):
+                a_axis, b_axis = [ax for ax in range(3) if ax != d]
+                for side in range(2):
+                    k00 = side << d
+                    ids = corner_ids[:, [
+                            k00,
+                            k00 | (1 << a_axis),
+                            k00 | (1 << b_axis),
+                            k00 | (1 << a_axis) | (1 << b_axis),
+                    ]]
+                    face_ids = self._ids(
+                            self._faces, np.sort(ids, axis=1), n_inner**2
+                    )
+
+                    # origin at smallest corner id, first axis towards
+                    # smaller neighbor
+                    origin = np.argmin(ids, axis=1)
+                    a_first = ids[rows, origin ^ 1] < ids[rows, origin ^ 2]
+                    a_index = np.where(
+                            (origin & 1)[:, np.newaxis], n_inner - 1 - i, i
+                    )
+                    b_index = np.where(
+                            (origin >> 1)[:, np.newaxis], n_inner - 1 - j, j
+                    )
+                    first = np.where(a_first[:, np.newaxis], a_index, b_index)
+                    second = np.where(
+                            a_first[:, np.newaxis], b_index, a_index
+                    )
+
+                    local = side * (r - 1) * strides[d] \
+                        + (i + 1) * strides[a_axis] \
+                        + (j + 1) * strides[b_axis]
+                    global_ids[:, local] = face_ids[:, np.newaxis] + first \
+                        + n_inner * second
+
+        # patch interiors
+        local = np.arange(r**para_dim).reshape((r, ) * para_dim, order="F")[
+                (slice(1, -1), ) * para_dim].ravel()
+        global_ids[:, local] = self._n_vertices + np.arange(
+                n_patches * len(local)
+        ).reshape(n_patches, -1)
+        self._n_vertices += n_patches * len(local)
+
+        return global_ids
@@ -3,35 +3,44 @@
 Closest what?
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from gustaf import settings
+from gustaf.create.vertices import raster
+from gustaf.utils import arr
+from gustaf.spline import _utils
+
 
 def closest_control_points(
         spline,
         query_points,
+        k=1,
         return_distances=False,
 ):
-    """Returns indices of closest control points.
+    """Returns indices of closest control points. KD-tree of control points
+    is saved in `spline.proximity` until control points change.
 
     Parameters
     -----------
     spline: BSpline or NURBS
     query_points: (n, spline.dim) np.ndarray
       float
+    k: int
+      Default is 1. Number of closest control points per query.
     return_distances: bool
 
-    tolerance: float
-      Default is settings.Tolerance. Only relevant iff nearest_only==False
-
     Returns
     --------
-    indices: (n,) np.ndarray
-    distances: (n, spline.dim) np.ndarray
+    indices: (n,) or (n, k) np.ndarray
+      (n, k) iff k > 1. Sorted by distance.
+    distances: (n,) or (n, k) np.ndarray
       iff return_distances==True
     """
-    from scipy.spatial import cKDTree as KDTree
-
-    kdt = KDTree(spline.control_points)
+    kdt = spline.proximity._control_point_tree()
 
-    dist, ids = kdt.query(query_points)
+    dist, ids = kdt.query(query_points, k=k)
 
     if return_distances:
         return ids, dist
@@ -40,12 +49,308 @@ def closest_control_points(
         return ids
 
 
+def control_points_within(
+        spline,
+        query_points,
+        radius,
+        return_distances=False,
+):
+    """Returns indices of control points within the radius of each query.
+    Uses the same saved KD-tree as `closest_control_points`.
+
+    Parameters
+    -----------
+    spline: BSpline or NURBS
+    query_points: (n, spline.dim) np.ndarray
+      float
+    radius: float
+    return_distances: bool
+
+    Returns
+    --------
+    offsets: (n + 1,) np.ndarray
+    indices: (m,) np.ndarray
+      Indices of i-th query are `indices[offsets[i]:offsets[i + 1]]`, sorted.
+    distances: (m,) np.ndarray
+      iff return_distances==True
+    """
+    query_points = np.asarray(query_points, dtype=settings.FLOAT_DTYPE)
+    kdt = spline.proximity._control_point_tree()
+
+    neighbors = kdt.query_ball_point(
+            query_points, r=radius, return_sorted=True
+    )
+    counts = np.array([len(n) for n in neighbors], dtype=np.int64)
+    offsets = arr.counts_to_offsets(counts)
+    ids = np.zeros(offsets[-1], dtype=np.int64)
+    if offsets[-1] > 0:
+        ids = np.concatenate(neighbors).astype(np.int64)
+
+    if not return_distances:
+        return offsets, ids
+
+    query_ids = np.repeat(np.arange(len(query_points)), counts)
+    distances = np.linalg.norm(
+            kdt.data[ids] - query_points[query_ids],
+            axis=1,
+    )
+
+    return offsets, ids, distances
+
+
+def _initial_guess_resolutions(spline, max_samples=None):
+    """Default resolutions of parametric sample grid for initial guesses. A
+    few samples per degree and per knot span, uniformly reduced if the grid
+    would have more than max_samples samples.
+
+    Parameters
+    -----------
+    spline: Spline
+    max_samples: int
+      (Optional) Default is settings.CHUNK_SIZE.
+
+    Returns
+    --------
+    resolutions: list
+    """
+    if max_samples is None:
+        max_samples = settings.CHUNK_SIZE
+
+    degrees = np.asarray(spline.degrees)
+    if spline.has_knot_vectors:
+        n_spans = [max(len(uk) - 1, 1) for uk in spline.unique_knots]
+    else:
+        n_spans = [1] * spline.para_dim
+
+    resolutions = [int(2 * (d + 1) * n + 1) for d, n in zip(degrees, n_spans)]
+    n_samples = np.prod(resolutions, dtype=np.float64)
+    if n_samples <= max_samples:
+        return resolutions
+
+    factor = (max_samples / n_samples)**(1 / len(resolutions))
+
+    return [max(int(r * factor), 2) for r in resolutions]
+
+
+def _newton(
+        spline,
+        query_points,
+        guesses,
+        bounds,
+        max_iterations,
+        tolerance,
+):
+    """Vectorized Newton iterations for point inversion, which fall back to
+    Gauss-Newton where the hessian of squared distance is not positive
+    definite. Only active (not yet converged) points are updated. Parameters
+    on bounds are fixed if the gradient points outwards, steps are clamped
+    into parametric bounds and halved if distance increases.
+
+    Parameters
+    -----------
+    spline: Spline
+    query_points: (n, dim) np.ndarray
+    guesses: (n, para_dim) np.ndarray
+    bounds: (2, para_dim) np.ndarray
+    max_iterations: int
+    tolerance: float
+
+    Returns
+    --------
+    parametric_coordinates: (n, para_dim) np.ndarray
+    physical_points: (n, dim) np.ndarray
+    """
+    para_dim = spline.para_dim
+    orders = np.eye(para_dim, dtype=settings.INT_DTYPE)
+    upper_ids = np.triu_indices(para_dim)
+
+    params = guesses.copy()
+    physical = spline.evaluate(params)
+    residuals = physical - query_points
+    distances = np.linalg.norm(residuals, axis=1)
+
+    active = np.arange(len(params))
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+
+        a_params = params[active]
+        a_residuals = residuals[active]
+        # (n_active, dim, para_dim)
+        jacs = np.stack(
+                [spline.derivative(a_params, o) for o in orders], axis=-1
+        )
+        gradients = np.einsum("ndp,nd->np", jacs, a_residuals)
+
+        # gauss-newton part and second order part of hessian
+        gn_hessians = np.einsum("ndp,ndq->npq", jacs, jacs)
+        hessians = gn_hessians.copy()
+        for i, j in zip(*upper_ids):
+            second = np.einsum(
+                    "nd,nd->n",
+                    spline.derivative(a_params, orders[i] + orders[j]),
+                    a_residuals,
+            )
+            hessians[:, i, j] += second
+            if i != j:
+                hessians[:, j, i] += second
+
+        # fix parameters at bounds that would move outwards
+        fixed = np.logical_or(
+                np.logical_and(a_params <= bounds[0], gradients > 0),
+                np.logical_and(a_params >= bounds[1], gradients < 0),
+        )
+        gradients[fixed] = 0.
+        free = ~fixed
+        fixed_n, fixed_p = np.nonzero(fixed)
+        for h in (hessians, gn_hessians):
+            h *= free[:, :, None]
+            h *= free[:, None, :]
+            h[fixed_n, fixed_p, fixed_p] = 1.
+
+        # newton, where hessian is positive definite. Else, gauss-newton
+        not_convex = np.linalg.eigvalsh(hessians)[:, 0] <= 0
+        hessians[not_convex] = gn_hessians[not_convex]
+
+        # pinv gives minimum norm step for degenerated cases
+        steps = -np.einsum(
+                "npq,nq->np", np.linalg.pinv(hessians), gradients
+        )
+
+        # backtracking: halve steps that don't reduce distance
+        candidate_ids = np.arange(len(active))
+        improved = np.zeros(len(active), dtype=bool)
+        for _ in range(4):
+            candidates = np.clip(
+                    a_params[candidate_ids] + steps[candidate_ids],
+                    bounds[0],
+                    bounds[1],
+            )
+            c_physical = spline.evaluate(candidates)
+            c_residuals = c_physical - query_points[active[candidate_ids]]
+            c_distances = np.linalg.norm(c_residuals, axis=1)
+
+            better = c_distances <= distances[active[candidate_ids]]
+            accepted = candidate_ids[better]
+            global_ids = active[accepted]
+            params[global_ids] = candidates[better]
+            physical[global_ids] = c_physical[better]
+            residuals[global_ids] = c_residuals[better]
+            distances[global_ids] = c_distances[better]
+            improved[accepted] = True
+
+            candidate_ids = candidate_ids[~better]
+            if len(candidate_ids) == 0:
+                break
+            steps[candidate_ids] *= .5
+
+        # converged if step is small, gradient vanishes, or stuck
+        step_sizes = np.linalg.norm(params[active] - a_params, axis=1)
+        converged = np.logical_or(
+                step_sizes < tolerance,
+                np.linalg.norm(gradients, axis=1) < tolerance,
+        )
+        converged |= ~improved
+        active = active[~converged]
+
+    return params, physical
+
+
 def closest_parametric_coordinate(
         spline,
         query_points,
+        initial_guess_resolutions=None,
+        max_iterations=20,
+        tolerance=None,
+        nthreads=None,
+        return_physical_points=False,
+        return_distances=False,
 ):
-    """Finds closest points using."""
-    pass
+    """Finds parametric coordinates of the closest points on the spline
+    (point inversion). Initial guesses are the closest points of a
+    parametric sample grid, found with a KD-tree that is saved in
+    `spline.proximity` until spline changes. Then, vectorized Newton
+    iterations with parametric bound clamping refine them. Queries are
+    processed in chunks of settings.CHUNK_SIZE, using a thread pool.
+
+    Parameters
+    -----------
+    spline: Spline
+    query_points: (n, spline.dim) array-like
+    initial_guess_resolutions: int or list
+      (Optional) Resolutions of the sample grid. Default is a few samples
+      per degree and knot span.
+    max_iterations: int
+      Default is 20.
+    tolerance: float
+      (Optional) Default is settings.TOLERANCE. Convergence criteria for
+      parametric steps and gradients.
+    nthreads: int
+      (Optional) Default is settings.NTHREADS.
+    return_physical_points: bool
+    return_distances: bool
+
+    Returns
+    --------
+    parametric_coordinates: (n, spline.para_dim) np.ndarray
+    physical_points: (n, spline.dim) np.ndarray
+      iff return_physical_points==True
+    distances: (n,) np.ndarray
+      iff return_distances==True
+    """
+    query_points = np.asarray(query_points, dtype=settings.FLOAT_DTYPE)
+    if query_points.ndim != 2 or query_points.shape[1] != spline.dim:
+        raise ValueError(
+                "query_points should be (n, spline.dim) array. "
+                f"Got {query_points.shape}."
+        )
+    if tolerance is None:
+        tolerance = settings.TOLERANCE
+    if nthreads is None:
+        nthreads = settings.NTHREADS
+
+    # initial guesses
+    tree, samples = spline.proximity._sample_tree(initial_guess_resolutions)
+    bounds = _utils.parametric_bounds(spline)
+
+    def invert(chunk):
+        _, ids = tree.query(chunk)
+        return _newton(
+                spline,
+                chunk,
+                samples[ids],
+                bounds,
+                max_iterations,
+                tolerance,
+        )
+
+    chunks = [
+            query_points[i:i + settings.CHUNK_SIZE]
+            for i in range(0, len(query_points), settings.CHUNK_SIZE)
+    ]
+    if nthreads > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            results = list(executor.map(invert, chunks))
+    else:
+        results = [invert(c) for c in chunks]
+
+    if len(results) == 0:
+        params = np.empty((0, spline.para_dim))
+        physical = np.empty((0, spline.dim))
+    else:
+        params = np.vstack([r[0] for r in results])
+        physical = np.vstack([r[1] for r in results])
+
+    returns = [params]
+    if return_physical_points:
+        returns.append(physical)
+    if return_distances:
+        returns.append(np.linalg.norm(physical - query_points, axis=1))
+
+    if len(returns) == 1:
+        return params
+
+    return tuple(returns)
 
 
 class Proximity:
@@ -56,10 +361,92 @@ class Proximity:
     ---------
     >>> myspline = <your-spline>
     >>> closest_cp_ids = myspline.proximity.closest_control_points(queries)
+    >>> params, distances = \\
+    ...     myspline.proximity.closest_parametric_coordinate(
+    ...         queries,
+    ...         return_distances=True,
+    ...     )
     """
 
     def __init__(self, spl):
         self.spline = spl
+        self._control_point_tree_cache = None
+        self._sample_tree_cache = None
+
+    def _control_point_tree(self):
+        """Returns KD-tree of control points. Saved until control points
+        change.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        tree: scipy.spatial.cKDTree
+        """
+        from scipy.spatial import cKDTree as KDTree
+
+        cache = self._control_point_tree_cache
+        if cache is not None and _utils.same_state(
+                cache["state"], self.spline
+        ):
+            return cache["tree"]
+
+        state = _utils.state(self.spline, ["control_points"])
+        tree = KDTree(self.spline.control_points, copy_data=True)
+        self._control_point_tree_cache = dict(state=state, tree=tree)
+
+        return tree
+
+    def _sample_tree(self, resolutions=None):
+        """Returns KD-tree of physical sample points and corresponding
+        parametric sample points, for initial guesses of point inversion.
+        Saved until spline or resolutions change.
+
+        Parameters
+        -----------
+        resolutions: int or list
+          (Optional) Default is a few samples per degree and knot span.
+
+        Returns
+        --------
+        tree: scipy.spatial.cKDTree
+        parametric_samples: (n, para_dim) np.ndarray
+        """
+        from scipy.spatial import cKDTree as KDTree
+
+        spl = self.spline
+        if resolutions is None:
+            resolutions = _initial_guess_resolutions(spl)
+        resolutions = _utils.to_res_list(resolutions, spl.para_dim)
+
+        cache = self._sample_tree_cache
+        if (
+                cache is not None and cache["resolutions"] == resolutions
+                and _utils.same_state(cache["state"], spl)
+        ):
+            return cache["tree"], cache["parametric_samples"]
+
+        parametric_samples = np.asarray(
+                raster(_utils.parametric_bounds(spl), resolutions).vertices
+        )
+        tree = KDTree(spl.evaluate(parametric_samples))
+
+        self._sample_tree_cache = dict(
+                resolutions=resolutions,
+                state=_utils.state(spl),
+                tree=tree,
+                parametric_samples=parametric_samples,
+        )
+
+        return tree, parametric_samples
 
     def closest_control_points(self, *args, **kwargs):
         return closest_control_points(self.spline, *args, **kwargs)
+
+    def control_points_within(self, *args, **kwargs):
+        return control_points_within(self.spline, *args, **kwargs)
+
+    def closest_parametric_coordinate(self, *args, **kwargs):
+        return closest_parametric_coordinate(self.spline, *args, **kwargs)
@@ -1,5 +1,6 @@
 from gustaf.utils import arr
 from gustaf.utils import connec
+from gustaf.utils import geometry
 from gustaf.utils import log
 from gustaf.utils import tictoc
 
@@ -10,6 +11,7 @@ __all__ = [
         "arr",
         "connec",
         "connectivity",
+        "geometry",
         "log",
         "tictoc",
 ]
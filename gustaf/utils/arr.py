@@ -209,6 +209,49 @@ def bounds_mean(arr):
     return np.mean(bounds(arr), axis=0)
 
 
+def concat_ranges(starts, counts):
+    """Concatenates `np.arange(start, start + count)` of each given pair
+    without looping. Useful for gathering entries of CSR-like structures.
+
+    Parameters
+    -----------
+    starts: (n,) array-like
+    counts: (n,) array-like
+
+    Returns
+    --------
+    ids: (sum(counts),) np.ndarray
+    range_ids: (sum(counts),) np.ndarray
+      Index of the range that each id belongs to.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+
+    range_ids = np.repeat(np.arange(len(counts)), counts)
+    range_offsets = np.cumsum(counts) - counts
+    ids = np.arange(range_ids.size, dtype=np.int64)
+    ids += (starts - range_offsets)[range_ids]
+
+    return ids, range_ids
+
+
+def counts_to_offsets(counts):
+    """Returns CSR offsets, based on counts of each entry.
+
+    Parameters
+    -----------
+    counts: (n,) array-like
+
+    Returns
+    --------
+    offsets: (n + 1,) np.ndarray
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return offsets
+
+
 def select_with_ranges(arr, ranges):
     """Select array with ranges of each column. Always parsed as:
 
@@ -236,20 +279,92 @@ def select_with_ranges(arr, ranges):
             else:
                 masks.append(np.logical_or(lower, upper))
 
-    if len(masks) > 1:
-        mask = np.zeros(arr.shape[0], dtype=bool)
-        for i, m in enumerate(masks):
-            if i == 0:
-                mask = np.logical_or(mask, m)
-            else:
-                mask = np.logical_and(mask, m)
-
-    else:
-        mask = masks[0]
+    mask = masks[0]
+    for m in masks[1:]:
+        mask &= m
 
     return np.arange(arr.shape[0])[mask]
 
 
+def select_with_batched_ranges(arr, batched_ranges, argsorted=None):
+    """Batched version of `select_with_ranges`. Each ranges is parsed the
+    same way. Instead of scanning the whole array per ranges, array is sorted
+    once per column and the column with the fewest candidates is searched
+    with `np.searchsorted`. Only those candidates are checked against all the
+    ranges.
+
+    Parameters
+    -----------
+    arr: (n, d) array-like
+    batched_ranges: (m, d, 2) array-like
+      Takes None for each range.
+    argsorted: (d, n) np.ndarray
+      (Optional) argsort of each column. Pass this to reuse it.
+
+    Returns
+    --------
+    offsets: (m + 1,) np.ndarray
+    ids: (k,) np.ndarray
+      ids of i-th ranges are `ids[offsets[i]:offsets[i + 1]]`.
+    """
+    arr = np.asarray(arr)
+    n_rows, dim = arr.shape
+
+    if argsorted is None:
+        argsorted = np.argsort(arr, axis=0, kind="stable").T
+
+    # None -> unbounded
+    lower = np.full((len(batched_ranges), dim), -np.inf)
+    upper = np.full((len(batched_ranges), dim), np.inf)
+    for i, ranges in enumerate(batched_ranges):
+        for j, r in enumerate(ranges):
+            if r is None:
+                continue
+            lower[i, j], upper[i, j] = r
+    inverted = upper <= lower
+
+    # candidate range in sorted order of each column
+    starts = np.empty(lower.shape, dtype=np.int64)
+    ends = np.empty(lower.shape, dtype=np.int64)
+    for j in range(dim):
+        sorted_column = arr[argsorted[j], j]
+        starts[:, j] = np.searchsorted(sorted_column, lower[:, j], "right")
+        ends[:, j] = np.searchsorted(sorted_column, upper[:, j], "left")
+
+    counts = np.maximum(ends - starts, 0)
+    # inverted range selects outside, which isn't a contiguous range
+    counts[inverted] = n_rows
+    starts[inverted] = 0
+
+    best = np.argmin(counts, axis=1)
+    rows = np.arange(len(best))
+    positions, range_ids = concat_ranges(
+            starts[rows, best], counts[rows, best]
+    )
+    ids = argsorted[best[range_ids], positions]
+
+    # check candidates against all the ranges, dropping misses as we go
+    for j in range(dim):
+        column = arr[ids, j]
+        mask = column > lower[range_ids, j]
+        upper_j = column < upper[range_ids, j]
+        if inverted[:, j].any():
+            inverted_j = inverted[range_ids, j]
+            mask = np.where(inverted_j, mask | upper_j, mask & upper_j)
+        else:
+            mask &= upper_j
+
+        ids = ids[mask]
+        range_ids = range_ids[mask]
+
+    order = np.lexsort((ids, range_ids))
+
+    return (
+            counts_to_offsets(np.bincount(range_ids, minlength=len(best))),
+            ids[order],
+    )
+
+
 def rotation_matrix(rotation, degree=True):
     """Compute rotation matrix. Works for both 2D and 3D point sets. In 2D, it
     can rotate along the (virtual) z-axis. In 3D, it can rotate along [x, y,
@@ -200,6 +200,49 @@ def faces_to_edges(faces):
     return edges
 
 
+def single_subelements(elements, to_subelements):
+    """Finds sub-elements that appear only once, for example, boundary faces
+    of volumes or outlines of faces. Sub-elements are sorted and counted
+    without keeping them around. Only single sub-elements are then computed
+    again in their original orientation.
+
+    Parameters
+    -----------
+    elements: (n, m) np.ndarray
+    to_subelements: callable
+      For example, `faces_to_edges` or `volumes_to_faces`.
+      Sub-elements are expected to be ordered element-wise.
+
+    Returns
+    --------
+    single_subelements: (k, l) np.ndarray
+    single_ids: (k,) np.ndarray
+      Ids of single sub-elements, as if all sub-elements were computed.
+    """
+    subelements = to_subelements(elements)
+    if len(elements) == 0:
+        return subelements, np.empty(0, dtype=np.int64)
+
+    n_sub_per_element = len(subelements) // len(elements)
+
+    # sort inplace - orientation is recovered later
+    subelements.sort(axis=1)
+    unique_info = sorted_unique(subelements, sorted_=True)
+    del subelements
+
+    single_ids = np.sort(unique_info.ids[unique_info.counts == 1])
+
+    # compute oriented sub-elements of boundary elements only
+    element_ids = single_ids // n_sub_per_element
+    local_ids = single_ids % n_sub_per_element
+    oriented = to_subelements(elements[element_ids])
+    oriented = oriented[
+            np.arange(len(single_ids)) * n_sub_per_element + local_ids
+    ]
+
+    return oriented, single_ids
+
+
 def range_to_edges(range_, closed=False):
     """Given range, for example (a, b), returns an edge sequence that
     sequentially connects indices. If int is given as range, it is considered
@@ -273,7 +316,7 @@ def make_quad_faces(resolutions):
     faces: (n, 4) np.ndarray
     """
     nnpd = np.asarray(resolutions)  # number of nodes per dimension
-    total_nodes = np.product(nnpd)
+    total_nodes = np.prod(nnpd)
     total_faces = (nnpd[0] - 1) * (nnpd[1] - 1)
     node_indices = np.arange(total_nodes).reshape(nnpd[1], nnpd[0])
     faces = np.ones((total_faces, 4)) * -1
@@ -314,8 +357,8 @@ def make_hexa_volumes(resolutions):
     elements: (n, 8) np.ndarray
     """
     nnpd = np.asarray(resolutions)  # number of nodes per dimension
-    total_nodes = np.product(nnpd)
-    total_volumes = np.product(nnpd - 1)
+    total_nodes = np.prod(nnpd)
+    total_volumes = np.prod(nnpd - 1)
     node_indices = np.arange(total_nodes, dtype=np.int32).reshape(nnpd[::-1])
     volumes = np.ones((total_volumes, 8), dtype=np.int32) * int(-1)
 
@@ -0,0 +1,393 @@
+"""gustaf/gustaf/utils/geometry.py.
+
+Geometric measures of elements. All the functions work on element-wise
+vertex arrays, for example, `vertices[elements]`, so that they can be
+computed in chunks.
+"""
+
+import numpy as np
+
+from gustaf import settings
+from gustaf import helpers
+
+# corners in reference element. Same ordering as
+# `utils.connec.make_quad_faces` and `utils.connec.make_hexa_volumes`
+REFERENCE_CORNERS = dict(
+        tri=np.array([[0., 0.], [1., 0.], [0., 1.]]),
+        quad=np.array([[0., 0.], [1., 0.], [1., 1.], [0., 1.]]),
+        tet=np.array(
+                [[0., 0., 0.], [1., 0., 0.], [0., 1., 0.], [0., 0., 1.]]
+        ),
+        hexa=np.array(
+                [
+                        [0., 0., 0.],
+                        [1., 0., 0.],
+                        [1., 1., 0.],
+                        [0., 1., 0.],
+                        [0., 0., 1.],
+                        [1., 0., 1.],
+                        [1., 1., 1.],
+                        [0., 1., 1.],
+                ]
+        ),
+)
+
+# neighbors of each corner, ordered as local axes, right-handed.
+CORNER_NEIGHBORS = dict(
+        tri=np.array([[1, 2], [2, 0], [0, 1]]),
+        quad=np.array([[1, 3], [2, 0], [3, 1], [0, 2]]),
+        tet=np.array([[1, 2, 3], [2, 0, 3], [0, 1, 3], [1, 0, 2]]),
+        hexa=np.array(
+                [
+                        [1, 3, 4],
+                        [2, 0, 5],
+                        [3, 1, 6],
+                        [0, 2, 7],
+                        [7, 5, 0],
+                        [4, 6, 1],
+                        [5, 7, 2],
+                        [6, 4, 3],
+                ]
+        ),
+)
+
+ELEMENT_EDGES = dict(
+        tri=np.array([[0, 1], [1, 2], [2, 0]]),
+        quad=np.array([[0, 1], [1, 2], [2, 3], [3, 0]]),
+        tet=np.array([[0, 1], [1, 2], [2, 0], [0, 3], [1, 3], [2, 3]]),
+        hexa=np.array(
+                [
+                        [0, 1],
+                        [1, 2],
+                        [2, 3],
+                        [3, 0],
+                        [4, 5],
+                        [5, 6],
+                        [6, 7],
+                        [7, 4],
+                        [0, 4],
+                        [1, 5],
+                        [2, 6],
+                        [3, 7],
+                ]
+        ),
+)
+
+# ideal angle in degrees for equiangle skewness
+IDEAL_ANGLES = dict(tri=60., quad=90., tet=60., hexa=90.)
+
+
+def _check_whatami(whatami):
+    """Raises ValueError if given element type isn't supported.
+
+    Parameters
+    -----------
+    whatami: str
+
+    Returns
+    --------
+    None
+    """
+    if whatami not in REFERENCE_CORNERS:
+        raise ValueError(
+                f"`{whatami}` is not supported. "
+                f"Supported are: {list(REFERENCE_CORNERS.keys())}."
+        )
+
+
+def _gauss_points(para_dim):
+    """Returns 2-point Gauss quadrature in [0, 1]^para_dim. Exact for bilinear
+    and trilinear jacobian determinants.
+
+    Parameters
+    -----------
+    para_dim: int
+
+    Returns
+    --------
+    points: (2**para_dim, para_dim) np.ndarray
+    weights: (2**para_dim,) np.ndarray
+    """
+    gp = .5 + np.array([-.5, .5]) / np.sqrt(3)
+    points = np.stack(
+            np.meshgrid(*[gp] * para_dim, indexing="ij"), axis=-1
+    ).reshape(-1, para_dim)
+    weights = np.full(len(points), .5**para_dim)
+
+    return points, weights
+
+
+def _multilinear_derivatives(whatami, points):
+    """Returns derivatives of bilinear (quad) or trilinear (hexa) shape
+    functions at given reference points.
+
+    Parameters
+    -----------
+    whatami: str
+      quad or hexa
+    points: (m, para_dim) np.ndarray
+
+    Returns
+    --------
+    derivatives: (m, n_nodes, para_dim) np.ndarray
+    """
+    corners = REFERENCE_CORNERS[whatami]
+    # 1D factors: xi if corner is at 1, else (1 - xi)
+    factors = np.where(
+            corners[None] == 1., points[:, None], 1. - points[:, None]
+    )
+    signs = 2. * corners - 1.
+
+    para_dim = corners.shape[1]
+    derivatives = np.empty(factors.shape)
+    for j in range(para_dim):
+        others = np.delete(factors, j, axis=2)
+        derivatives[:, :, j] = signs[None, :, j] * others.prod(axis=2)
+
+    return derivatives
+
+
+def jacobians(element_vertices, whatami, points):
+    """Returns jacobians of quad or hexa elements at given reference points.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, d) np.ndarray
+    whatami: str
+      quad or hexa
+    points: (m, para_dim) np.ndarray
+
+    Returns
+    --------
+    jacobians: (n, m, d, para_dim) np.ndarray
+    """
+    derivatives = _multilinear_derivatives(whatami, points)
+    return np.einsum("ead,mak->emdk", element_vertices, derivatives)
+
+
+def _signed_determinants(jacs, normals=None):
+    """Determinants of (n, ..., d, para_dim) jacobians. For surfaces in 3D,
+    area scales are signed with respect to the given normals.
+
+    Parameters
+    -----------
+    jacs: (n, ..., d, para_dim) np.ndarray
+    normals: (n, d) np.ndarray
+      Only relevant for para_dim=2 and d=3.
+
+    Returns
+    --------
+    determinants: (n, ...) np.ndarray
+    """
+    if jacs.shape[-1] == jacs.shape[-2]:
+        return np.linalg.det(jacs)
+
+    # surface in 3D
+    cross = np.cross(jacs[..., 0], jacs[..., 1])
+    normals = normals.reshape(
+            normals.shape[:1] + (1, ) * (cross.ndim - 2) + normals.shape[1:]
+    )
+    return (cross * normals).sum(axis=-1)
+
+
+def normals(element_vertices, whatami):
+    """Unit normals of surface elements in 3D. Quads use cross product of
+    their diagonals. Degenerated elements have zero normals.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, 3) np.ndarray
+    whatami: str
+      tri or quad
+
+    Returns
+    --------
+    normals: (n, 3) np.ndarray
+    """
+    ev = element_vertices
+    if whatami == "tri":
+        crosses = np.cross(ev[:, 1] - ev[:, 0], ev[:, 2] - ev[:, 0])
+    else:
+        crosses = np.cross(ev[:, 2] - ev[:, 0], ev[:, 3] - ev[:, 1])
+
+    norms = np.linalg.norm(crosses, axis=1, keepdims=True)
+    norms[norms == 0.] = 1.
+
+    return crosses / norms
+
+
+def corner_jacobian_determinants(element_vertices, whatami):
+    """Returns jacobian determinants at each corner of elements, using edges
+    to neighboring corners. For quads and hexas this is the same as
+    evaluating the jacobian of bi/trilinear map at corners. Non-positive
+    values indicate inverted or degenerated elements. For surfaces in 3D,
+    values are signed with respect to the element normal.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, d) np.ndarray
+    whatami: str
+      tri, quad, tet or hexa
+
+    Returns
+    --------
+    determinants: (n, n_nodes) np.ndarray
+    """
+    _check_whatami(whatami)
+    neighbors = CORNER_NEIGHBORS[whatami]
+
+    # (n, n_nodes, para_dim, d) -> swap to columns
+    edges = element_vertices[:, neighbors] - element_vertices[:, :, None]
+    jacs = np.swapaxes(edges, -1, -2)
+
+    unit_normals = None
+    if jacs.shape[-1] != jacs.shape[-2]:
+        unit_normals = normals(element_vertices, whatami)
+
+    return _signed_determinants(jacs, unit_normals)
+
+
+def measures(element_vertices, whatami):
+    """Returns signed length/area/volume of elements. For quads and hexas,
+    2-point Gauss quadrature of jacobian determinants is used, which is exact
+    for planar quads and trilinear hexas. For surfaces in 3D, areas are
+    signed with respect to the element normal.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, d) np.ndarray
+    whatami: str
+      tri, quad, tet or hexa
+
+    Returns
+    --------
+    measures: (n,) np.ndarray
+    """
+    _check_whatami(whatami)
+
+    if whatami in ("tri", "tet"):
+        # constant jacobian - first corner is enough
+        first = corner_jacobian_determinants(element_vertices, whatami)[:, 0]
+        return first / (2. if whatami == "tri" else 6.)
+
+    para_dim = REFERENCE_CORNERS[whatami].shape[1]
+    points, weights = _gauss_points(para_dim)
+    jacs = jacobians(element_vertices, whatami, points)
+
+    unit_normals = None
+    if jacs.shape[-1] != jacs.shape[-2]:
+        unit_normals = normals(element_vertices, whatami)
+
+    return _signed_determinants(jacs, unit_normals) @ weights
+
+
+def aspect_ratios(element_vertices, whatami):
+    """Returns ratio of the longest to the shortest edge of each element.
+    Degenerated edges result in `inf`.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, d) np.ndarray
+    whatami: str
+
+    Returns
+    --------
+    aspect_ratios: (n,) np.ndarray
+    """
+    _check_whatami(whatami)
+    e = ELEMENT_EDGES[whatami]
+    lengths = np.linalg.norm(
+            element_vertices[:, e[:, 1]] - element_vertices[:, e[:, 0]],
+            axis=2,
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return lengths.max(axis=1) / lengths.min(axis=1)
+
+
+def skewness(element_vertices, whatami):
+    """Returns equiangle skewness of each element, based on the angles
+    between edges at each corner. 0 is ideal and 1 is degenerated. For
+    volumes, angles between each pair of edges at a corner are the face
+    angles.
+
+    Parameters
+    -----------
+    element_vertices: (n, n_nodes, d) np.ndarray
+    whatami: str
+
+    Returns
+    --------
+    skewness: (n,) np.ndarray
+    """
+    _check_whatami(whatami)
+    neighbors = CORNER_NEIGHBORS[whatami]
+
+    edges = element_vertices[:, neighbors] - element_vertices[:, :, None]
+    norms = np.linalg.norm(edges, axis=-1)
+    norms[norms == 0.] = 1.
+    edges /= norms[..., None]
+
+    # pairs of edges at each corner
+    n_edges = edges.shape[2]
+    pairs = [(i, j) for i in range(n_edges) for j in range(i + 1, n_edges)]
+    cosines = np.stack(
+            [(edges[:, :, i] * edges[:, :, j]).sum(axis=-1) for i, j in pairs],
+            axis=-1,
+    )
+    angles = np.degrees(np.arccos(np.clip(cosines, -1., 1.)))
+    angles = angles.reshape(len(angles), -1)
+
+    ideal = IDEAL_ANGLES[whatami]
+    return np.maximum(
+            (angles.max(axis=1) - ideal) / (180. - ideal),
+            (ideal - angles.min(axis=1)) / ideal,
+    )
+
+
+def element_quality(vertices, elements, whatami, chunk_size=None):
+    """Computes quality measures of elements in chunks. Each chunk gathers
+    `vertices[elements]` once and computes all the measures with it.
+
+    Parameters
+    -----------
+    vertices: (n, d) np.ndarray
+    elements: (m, n_nodes) np.ndarray
+    whatami: str
+      tri, quad, tet or hexa
+    chunk_size: int
+      (Optional) Default is settings.CHUNK_SIZE. Number of elements to
+      process at once.
+
+    Returns
+    --------
+    quality: ElementQuality
+      namedtuple with `measures`, `jacobians`, `aspect_ratios`, `skewness`.
+    """
+    _check_whatami(whatami)
+    if chunk_size is None:
+        chunk_size = settings.CHUNK_SIZE
+    chunk_size = max(int(chunk_size), 1)
+
+    n_elements, n_nodes = elements.shape
+    quality = helpers.data.ElementQuality(
+            np.empty(n_elements, dtype=settings.FLOAT_DTYPE),
+            np.empty((n_elements, n_nodes), dtype=settings.FLOAT_DTYPE),
+            np.empty(n_elements, dtype=settings.FLOAT_DTYPE),
+            np.empty(n_elements, dtype=settings.FLOAT_DTYPE),
+    )
+
+    for start in range(0, n_elements, chunk_size):
+        end = min(start + chunk_size, n_elements)
+        element_vertices = vertices[elements[start:end]]
+
+        quality.measures[start:end] = measures(element_vertices, whatami)
+        quality.jacobians[start:end] = corner_jacobian_determinants(
+                element_vertices, whatami
+        )
+        quality.aspect_ratios[start:end] = aspect_ratios(
+                element_vertices, whatami
+        )
+        quality.skewness[start:end] = skewness(element_vertices, whatami)
+
+    return quality
@@ -201,6 +201,46 @@ class Vertices(GustafBase):
         self._logd("computing bounds_diagonal_norm")
         return float(sum(self.bounds_diagonal()**2)**.5)
 
+    @helpers.data.ComputedMeshData.depends_on(["vertices"])
+    def kdtree(self):
+        """Returns KDTree of the vertices. Currently uses
+        `scipy.spatial.cKDTree`.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        kdtree: scipy.spatial.cKDTree
+        """
+        from scipy.spatial import cKDTree as KDTree
+
+        self._logd("building kdtree")
+        return KDTree(self.const_vertices)
+
+    def closest_vertices(self, queries, return_distances=False):
+        """Returns ids of closest vertices. Reuses saved kdtree.
+
+        Parameters
+        -----------
+        queries: (n, d) array-like
+        return_distances: bool
+
+        Returns
+        --------
+        ids: (n,) np.ndarray
+        distances: (n,) np.ndarray
+          iff return_distances==True
+        """
+        distances, ids = self.kdtree().query(queries)
+
+        if return_distances:
+            return ids, distances
+
+        else:
+            return ids
+
     def update_vertices(self, mask, inverse=None):
         """Update vertices with a mask. In other words, keeps only masked
         vertices. Adapted from `github.com/mikedh/trimesh`. Updates
@@ -287,6 +327,42 @@ class Vertices(GustafBase):
         """
         return utils.arr.select_with_ranges(self.vertices, ranges)
 
+    @helpers.data.ComputedMeshData.depends_on(["vertices"])
+    def argsorted_vertices(self):
+        """Returns argsort of each column of vertices.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        argsorted_vertices: (d, n) np.ndarray
+        """
+        self._logd("computing argsorted_vertices")
+        return np.argsort(self.const_vertices, axis=0, kind="stable").T
+
+    def select_vertices_batched(self, batched_ranges):
+        """Returns vertices inside each of the given ranges. Reuses saved
+        argsorted_vertices. See `utils.arr.select_with_batched_ranges`.
+
+        Parameters
+        -----------
+        batched_ranges: (m, d, 2) array-like
+          Takes None for each range.
+
+        Returns
+        --------
+        offsets: (m + 1,) np.ndarray
+        ids: (k,) np.ndarray
+          ids of i-th ranges are `ids[offsets[i]:offsets[i + 1]]`.
+        """
+        return utils.arr.select_with_batched_ranges(
+                self.const_vertices,
+                batched_ranges,
+                argsorted=self.argsorted_vertices(),
+        )
+
     def remove_vertices(self, ids):
         """Removes vertices with given vertex ids.
 
@@ -22,6 +22,21 @@ class Volumes(Faces):
             __qualname__,
             property_=False,
     )
+    normals = helpers.raise_if.invalid_inherited_attr(
+            Faces.normals,
+            __qualname__,
+            property_=False,
+    )
+    areas = helpers.raise_if.invalid_inherited_attr(
+            Faces.areas,
+            __qualname__,
+            property_=False,
+    )
+    vertex_normals = helpers.raise_if.invalid_inherited_attr(
+            Faces.vertex_normals,
+            __qualname__,
+            property_=False,
+    )
 
     __slots__ = (
             "_volumes",
@@ -193,6 +208,25 @@ class Volumes(Faces):
 
         return unique_info
 
+    @helpers.data.ComputedMeshData.depends_on(["vertices", "elements"])
+    def volumes_measure(self):
+        """Returns signed volumes of elements. Inverted elements have
+        negative volumes. Hexas are integrated as trilinear elements.
+
+        Parameters
+        -----------
+        None
+
+        Returns
+        --------
+        volumes_measure: (n,) np.ndarray
+        """
+        self._logd("computing volumes measure")
+
+        return utils.geometry.measures(
+                self.const_vertices[self.const_elements], self.whatami
+        )
+
     def update_volumes(self, *args, **kwargs):
         """Alias to update_elements."""
         self.update_elements(*args, **kwargs)
@@ -66,6 +66,7 @@ class BasicCallsTest(c.unittest.TestCase):
             fs.sorted_faces()
             fs.unique_faces()
             fs.single_faces()
+            fs.boundary()
 
             fs.sorted_edges()
             fs.unique_edges()
@@ -101,6 +102,7 @@ class BasicCallsTest(c.unittest.TestCase):
             vs.sorted_faces()
             vs.unique_faces()
             vs.single_faces()
+            vs.boundary()
             # gus.Faces.whatareyou()
 
 
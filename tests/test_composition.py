@@ -0,0 +1,79 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class CompositionTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_compose(self):
+        """
+        Composed patches should match evaluation of outer patches at inner
+        patches.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline import composition
+
+        outer_degrees = [2, 3]
+        inner_degrees = [1, 2]
+        outer_cps = np.random.rand(4, 12, 3)
+        outer_weights = np.random.rand(4, 12) + .5
+        inner_cps = np.random.rand(2, 6, 2)
+        inner_ids = [0, 1, 1, 0]
+        queries = np.random.rand(20, 2)
+
+        for weights in (None, outer_weights):
+            degrees, cps, composed_weights = composition.compose(
+                    outer_degrees,
+                    outer_cps,
+                    inner_degrees,
+                    inner_cps,
+                    outer_weights=weights,
+                    inner_ids=inner_ids,
+            )
+            self.assertEqual(weights is None, composed_weights is None)
+
+            for i, inner_id in enumerate(inner_ids):
+                inner = gus.Bezier(
+                        degrees=inner_degrees,
+                        control_points=inner_cps[inner_id],
+                )
+                if weights is None:
+                    outer = gus.Bezier(
+                            degrees=outer_degrees,
+                            control_points=outer_cps[i],
+                    )
+                    composed = gus.Bezier(
+                            degrees=degrees,
+                            control_points=cps[i],
+                    )
+                else:
+                    outer = gus.RationalBezier(
+                            degrees=outer_degrees,
+                            control_points=outer_cps[i],
+                            weights=weights[i],
+                    )
+                    composed = gus.RationalBezier(
+                            degrees=degrees,
+                            control_points=cps[i],
+                            weights=composed_weights[i],
+                    )
+
+                self.assertTrue(
+                        np.allclose(
+                                composed.evaluate(queries),
+                                outer.evaluate(inner.evaluate(queries)),
+                        )
+                )
+
+
+if __name__ == "__main__":
+    c.unittest.main()
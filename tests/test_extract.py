@@ -0,0 +1,201 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class ExtractTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def _splines(self):
+        """
+        BSpline and NURBS of common test data.
+        """
+        bspline = gus.BSpline(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+        )
+        nurbs = gus.NURBS(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+                weights=c.WEIGHTS_2D,
+        )
+
+        return bspline, nurbs
+
+    def test_bezier_extraction_operators(self):
+        """
+        Extracted Bezier patches should match the spline on their knot
+        spans, also with additionally inserted knots.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline import extract
+
+        queries = np.random.rand(10, 2)
+        for spline in self._splines():
+            for knots in (None, [[.5], [.4, .6]]):
+                operators, unique_knots = extract.bezier_extraction_operators(
+                        spline, knots=knots
+                )
+                control_points, weights = extract.bezier_patches(
+                        spline, operators
+                )
+                self.assertEqual(
+                        weights is None,
+                        "weights" not in spline.required_properties,
+                )
+
+                # patches are ordered with first parametric dimension fastest
+                spans = np.meshgrid(
+                        *[np.arange(len(u) - 1) for u in unique_knots],
+                        indexing="ij",
+                )
+                spans = np.column_stack([s.ravel(order="F") for s in spans])
+                self.assertEqual(len(spans), len(control_points))
+                for i, span in enumerate(spans):
+                    lower = np.array(
+                            [u[s] for u, s in zip(unique_knots, span)]
+                    )
+                    upper = np.array(
+                            [u[s + 1] for u, s in zip(unique_knots, span)]
+                    )
+                    if weights is None:
+                        bezier = gus.Bezier(
+                                degrees=spline.degrees,
+                                control_points=control_points[i],
+                        )
+                    else:
+                        bezier = gus.RationalBezier(
+                                degrees=spline.degrees,
+                                control_points=control_points[i],
+                                weights=weights[i],
+                        )
+                    self.assertTrue(
+                            np.allclose(
+                                    bezier.evaluate(queries),
+                                    spline.evaluate(
+                                            lower + queries * (upper - lower)
+                                    ),
+                            )
+                    )
+
+    def test_subsplines(self):
+        """
+        Subsplines should match the spline on their boxes. Boxes may overlap
+        and may have equal lower and upper bounds.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        boxes = np.array(
+                [
+                        [[0., 0.], [.5, 1.]],
+                        [[.2, .3], [1., .8]],
+                        [[.4, 0.], [.4, 1.]],
+                ]
+        )
+        queries = np.random.rand(10, 2)
+        for spline in self._splines():
+            subsplines = spline.extract.subsplines(boxes)
+            self.assertEqual(len(subsplines), len(boxes))
+            for (lower, upper), subspline in zip(boxes, subsplines):
+                self.assertEqual(type(subspline), type(spline))
+                keep = lower != upper
+                self.assertEqual(subspline.para_dim, keep.sum())
+
+                points = lower + queries * (upper - lower)
+                self.assertTrue(
+                        np.allclose(
+                                subspline.evaluate(points[:, keep]),
+                                spline.evaluate(points),
+                        )
+                )
+
+    def test_subsplines_bezier(self):
+        """
+        Subsplines of Beziers are on the unit parametric domain. If they hold
+        knots of overlapping boxes, they should be BSplines or NURBS.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        bezier = gus.Bezier(
+                degrees=[2, 3],
+                control_points=np.random.rand(12, 2),
+        )
+        rational_bezier = gus.RationalBezier(
+                degrees=[2, 3],
+                control_points=np.random.rand(12, 2),
+                weights=np.random.rand(12, 1) + .5,
+        )
+        overlapping = np.array([[[0., 0.], [.6, 1.]], [[.4, .2], [1., .7]]])
+        separate = np.array([[[0., 0.], [.4, 1.]], [[.4, 0.], [1., 1.]]])
+        queries = np.random.rand(10, 2)
+        for spline, refined_type in (
+                (bezier, gus.BSpline),
+                (rational_bezier, gus.NURBS),
+        ):
+            for boxes, expected_type in (
+                    (overlapping, refined_type),
+                    (separate, type(spline)),
+            ):
+                subsplines = spline.extract.subsplines(boxes)
+                for (lower, upper), subspline in zip(boxes, subsplines):
+                    self.assertEqual(type(subspline), expected_type)
+                    self.assertTrue(np.all(subspline.degrees == [2, 3]))
+                    self.assertTrue(
+                            np.allclose(
+                                    subspline.evaluate(queries),
+                                    spline.evaluate(
+                                            lower + queries * (upper - lower)
+                                    ),
+                            )
+                    )
+
+    def test_discrete_cache(self):
+        """
+        Saved discrete extractions should follow control point changes. If
+        the extraction merged vertices of distinct parametric queries, it
+        should be created again.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline import extract
+
+        # second one has a top face collapsed into an apex
+        control_points = gus.create.vertices.raster(
+                [[0, 0, 0], [1, 1, 1]], [2, 2, 2]
+        ).vertices
+        collapsed = control_points.copy()
+        collapsed[collapsed[:, 2] == 1] = [.5, .5, 1.]
+        for cps in (control_points, collapsed):
+            spline = gus.BSpline(
+                    degrees=[1, 1, 1],
+                    knot_vectors=[[0, 0, 1, 1]] * 3,
+                    control_points=cps,
+            )
+            spline.extract.faces([3, 3, 3])
+            spline.control_points = cps + np.random.rand(8, 3) * .1
+
+            faces = spline.extract.faces([3, 3, 3])
+            expected = extract.faces(spline, [3, 3, 3])
+            self.assertEqual(len(faces.vertices), len(expected.vertices))
+            self.assertTrue(np.allclose(faces.vertices, expected.vertices))
+            self.assertTrue(np.array_equal(faces.faces, expected.faces))
+
+
+if __name__ == "__main__":
+    c.unittest.main()
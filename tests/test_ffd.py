@@ -0,0 +1,167 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class FFDTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_spline_setter(self):
+        """
+        Invalid splines should be rejected before they are set and None
+        should be accepted.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        bspline_2d = gus.BSpline(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+        )
+        ffd = gus.FFD(mesh=gus.Volumes(c.V, c.HV))
+        spline = ffd.spline
+
+        with self.assertRaises(RuntimeError):
+            ffd.spline = bspline_2d
+        self.assertTrue(ffd.spline is spline)
+
+        ffd.spline = None
+        self.assertTrue(ffd.spline is None)
+
+    def test_knot_insertion(self):
+        """
+        Knots can be inserted into BSplines, but not into Beziers.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        mesh = gus.Volumes(c.V, c.HV)
+        ffd = gus.FFD(mesh=mesh)
+        n_knots = len(ffd.spline.knot_vectors[0])
+        ffd.insert_knots(0, [.3])
+        self.assertEqual(len(ffd.spline.knot_vectors[0]), n_knots + 1)
+        self.assertTrue(np.allclose(ffd.mesh.vertices, c.V))
+
+        ffd = gus.FFD(
+                mesh=mesh,
+                spline=gus.Bezier(degrees=[1, 1, 1], control_points=c.V),
+        )
+        with self.assertRaises(NotImplementedError):
+            ffd.insert_knots(0, [.3])
+        with self.assertRaises(NotImplementedError):
+            ffd.remove_knots(0, [.3])
+
+    def test_add_mesh(self):
+        """
+        Registered meshes should be deformed together with the main mesh,
+        keep their elements and be returned in order of registration.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        faces = gus.Faces(np.random.rand(8, 3), c.TF)
+        edges = gus.Edges(c.V.copy(), c.E)
+        for use_basis_matrix in (False, True):
+            ffd = gus.FFD(
+                    mesh=gus.Volumes(c.V, c.HV),
+                    use_basis_matrix=use_basis_matrix,
+            )
+            # added before and after a deformation
+            self.assertEqual(ffd.add_mesh(faces), 1)
+            self.assertTrue(
+                    np.allclose(ffd.meshes[1].vertices, faces.vertices)
+            )
+            self.assertEqual(ffd.add_mesh(edges), 2)
+
+            ffd.control_points = ffd.control_points * [2., 1., 1.]
+            meshes = ffd.meshes
+            self.assertEqual(len(meshes), 3)
+            for deformed, original in zip(
+                    meshes, (gus.Volumes(c.V, c.HV), faces, edges)
+            ):
+                self.assertEqual(type(deformed), type(original))
+                self.assertTrue(
+                        np.array_equal(deformed.elements, original.elements)
+                )
+                self.assertTrue(
+                        np.allclose(
+                                deformed.vertices,
+                                original.vertices * [2., 1., 1.],
+                        )
+                )
+            self.assertTrue(
+                    np.allclose(ffd.mesh.vertices, meshes[0].vertices)
+            )
+
+            with self.assertRaises(ValueError):
+                ffd.add_mesh(gus.Faces(c.V[:, :2], c.TF))
+
+    def test_basis_matrix_mode(self):
+        """
+        Deformation with a saved basis matrix should match direct
+        evaluation, also after control points change.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        vertices = gus.Vertices(np.vstack((c.V, np.random.rand(50, 3))))
+        ffds = [
+                gus.FFD(mesh=vertices),
+                gus.FFD(mesh=vertices, use_basis_matrix=True),
+        ]
+        for ffd in ffds:
+            ffd.insert_knots(0, [.3])
+            ffd.elevate_degree(1)
+
+        for _ in range(2):
+            control_points = ffds[0].control_points + np.random.rand(
+                    *ffds[0].control_points.shape
+            ) * .1
+            for ffd in ffds:
+                ffd.control_points = control_points
+            self.assertTrue(
+                    np.allclose(
+                            ffds[0].mesh.vertices,
+                            ffds[1].mesh.vertices,
+                    )
+            )
+
+    def test_jacobian_determinants(self):
+        """
+        Jacobian determinants of affine deformations are constant and
+        mirrored deformations are inverted, in both evaluation modes.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        vertices = gus.Vertices(np.vstack((c.V, np.random.rand(50, 3))))
+        for use_basis_matrix in (False, True):
+            ffd = gus.FFD(
+                    mesh=vertices,
+                    use_basis_matrix=use_basis_matrix,
+                    compute_jacobians=True,
+            )
+            initial = ffd.control_points.copy()
+
+            ffd.control_points = initial * [2., 1., 1.]
+            determinants = ffd.mesh.vertexdata["jacobian_determinants"]
+            self.assertTrue(np.allclose(determinants, 2.))
+            self.assertEqual(len(ffd.inverted_vertices()), 0)
+
+            ffd.control_points = initial * [-1., 1., 1.]
+            self.assertEqual(len(ffd.inverted_vertices()), len(c.V) + 50)
+
+
+if __name__ == "__main__":
+    c.unittest.main()
@@ -0,0 +1,291 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class MicrostructureTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def _microstructure(self, parametrized=False):
+        """
+        Cross tile microstructure on the 2D BSpline of common test data.
+        """
+        microstructure = gus.spline.microstructure.Microstructure(
+                deformation_function=gus.BSpline(
+                        control_points=c.CPS_2D,
+                        degrees=c.DEGREES_2D_NU,
+                        knot_vectors=c.KVS_2D,
+                ),
+                tiling=[2, 3],
+                microtile=gus.spline.microstructure.tiles.CrossTile2D(),
+        )
+        if parametrized:
+            microstructure.parametrization_function = lambda x: (
+                    .1 + .1 * x[:, 0] + .05 * x[:, 1],
+            )
+
+        return microstructure
+
+    def _assert_same_splines(self, splines, expected):
+        """
+        Same types, degrees and control points in the same order.
+        """
+        self.assertEqual(len(splines), len(expected))
+        for spline, expected_spline in zip(splines, expected):
+            self.assertEqual(type(spline), type(expected_spline))
+            self.assertTrue(
+                    np.array_equal(spline.degrees, expected_spline.degrees)
+            )
+            self.assertTrue(
+                    np.allclose(
+                            spline.control_points,
+                            expected_spline.control_points,
+                    )
+            )
+
+    def test_tile_cache(self):
+        """
+        Keys should match within tolerance and never collide for large
+        parameters. Least recently used tiles should be dropped first.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline.microstructure.microstructure import TileCache
+
+        cache = TileCache(tolerance=1e-3, max_size=2)
+        key = cache.key((np.array([.2, .3]), ))
+        self.assertEqual(key, cache.key((np.array([.2000001, .3]), )))
+        self.assertNotEqual(key, cache.key((np.array([.2, .3]), ), "x_min"))
+        self.assertNotEqual(key, cache.key((np.array([.21, .3]), )))
+
+        # too large to quantize. exact values are used
+        large = TileCache()
+        self.assertNotEqual(
+                large.key((np.array([1e10, 1.]), )),
+                large.key((np.array([2e10, 1.]), )),
+        )
+
+        self.assertTrue(cache.get(key) is None)
+        cache.put(key, [1])
+        cache.put(cache.key(None), [2])
+        self.assertEqual(cache.get(key), [1])
+        cache.put(cache.key((np.ones(2), )), [3])
+        self.assertTrue(cache.get(cache.key(None)) is None)
+        self.assertEqual(cache.get(key), [1])
+
+        info = cache.info()
+        self.assertEqual(info["hits"], 2)
+        self.assertEqual(info["misses"], 2)
+        self.assertEqual(info["size"], 2)
+
+    def test_chunk_tiles(self):
+        """
+        Repeated parameters within a chunk should be looked up and created
+        once. Next chunk should reuse them from the cache.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline.microstructure.microstructure import TileCache
+
+        microstructure = gus.spline.microstructure.Microstructure(
+                microtile=gus.spline.microstructure.tiles.CrossTile2D()
+        )
+        parameters = [
+                (np.full((1, 4), .2), ),
+                (np.full((1, 4), .3), ),
+                (np.full((1, 4), .2), ),
+                (np.full((1, 4), .2), ),
+        ]
+        cache = TileCache()
+        for hits, misses in ((0, 2), (2, 2)):
+            tiles = microstructure._chunk_tiles(
+                    parameters, [None] * len(parameters), cache
+            )
+            self.assertTrue(tiles[0] is tiles[2] and tiles[0] is tiles[3])
+            self.assertFalse(tiles[0] is tiles[1])
+
+            info = cache.info()
+            self.assertEqual(info["hits"], hits)
+            self.assertEqual(info["misses"], misses)
+            self.assertEqual(info["size"], 2)
+
+    def test_create_parallel(self):
+        """
+        Patches composed in parallel should come in the same order as
+        patches composed one by one: all patches of a tile per deformation
+        function patch.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        microstructure = self._microstructure()
+        def_fun_patches, _ = microstructure._deformation_function_patches()
+        tile = microstructure.microtile.create_tile()
+        expected = [
+                def_fun.compose(tile_patch) for def_fun in def_fun_patches
+                for tile_patch in tile
+        ]
+
+        for nthreads, use_processes, batched in (
+                (1, False, False),
+                (3, False, False),
+                (3, True, False),
+                (3, False, True),
+        ):
+            self._assert_same_splines(
+                    microstructure.create(
+                            nthreads=nthreads,
+                            use_processes=use_processes,
+                            batched_composition=batched,
+                    ),
+                    expected,
+            )
+
+    def test_patch_parameters(self):
+        """
+        Parametrization function should be called once. Evaluation points of
+        each patch should be in the knot span of the matching Bezier patch.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        microstructure = self._microstructure()
+        positions = []
+
+        def parametrization_function(x):
+            positions.append(x)
+            return (x[:, 0] + 2. * x[:, 1], )
+
+        microstructure.parametrization_function = parametrization_function
+        # setter calls it once for its checks
+        positions.clear()
+        def_fun_patches, unique_knots = (
+                microstructure._deformation_function_patches()
+        )
+        patch_parameters = microstructure._patch_parameters(unique_knots)
+        self.assertEqual(len(positions), 1)
+        self.assertEqual(len(patch_parameters), len(def_fun_patches))
+
+        evaluation_points = microstructure.microtile.evaluation_points
+        n_points = len(evaluation_points)
+        deformation_function = microstructure.deformation_function
+        for i, (def_fun, parameters) in enumerate(
+                zip(def_fun_patches, patch_parameters)
+        ):
+            patch_positions = positions[0][i * n_points:(i + 1) * n_points]
+            self.assertTrue(
+                    np.allclose(
+                            def_fun.evaluate(evaluation_points),
+                            deformation_function.evaluate(patch_positions),
+                    )
+            )
+            self.assertTrue(
+                    np.allclose(
+                            parameters[0],
+                            patch_positions[:, 0] + 2. * patch_positions[:, 1],
+                    )
+            )
+
+    def test_iter_create(self):
+        """
+        Chunks should add up to the microstructure of `create()`, also with
+        closing tiles and as MultiPatch.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        microstructure = self._microstructure(parametrized=True)
+        n_patches = len(microstructure._deformation_function_patches()[0])
+        chunk_size = 4
+        for multipatch in (False, True):
+            expected = microstructure.create(
+                    closing_face="x", multipatch=multipatch, store=False
+            )
+            chunks = list(
+                    microstructure.iter_create(
+                            closing_face="x",
+                            chunk_size=chunk_size,
+                            multipatch=multipatch,
+                    )
+            )
+            self.assertEqual(len(chunks), -(-n_patches // chunk_size))
+
+            if multipatch:
+                self.assertTrue(
+                        all(
+                                isinstance(chunk, gus.spline.MultiPatch)
+                                for chunk in chunks
+                        )
+                )
+                created = list(gus.spline.MultiPatch.concat(chunks))
+                expected = list(expected)
+            else:
+                created = [s for chunk in chunks for s in chunk]
+            self._assert_same_splines(created, expected)
+
+    def test_create_tiles(self):
+        """
+        Batched tiles should match single tiles, also close to the clipping
+        of the branches by the center.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        tiles = gus.spline.microstructure.tiles
+        for tile, kwargs, closures in (
+                (tiles.CrossTile2D(), {
+                        "center_expansion": 1.3
+                }, (None, "x_min", "x_max")),
+                (tiles.CrossTile3D(), {
+                        "center_expansion": 1.
+                }, (None, "z_min", "z_max")),
+                (
+                        tiles.InverseCrossTile3D(), {
+                                "seperator_distance": .4,
+                                "center_expansion": 1.3
+                        }, (None, "z_min", "z_max")
+                ),
+        ):
+            n_parameters = len(tile.evaluation_points)
+            for closure in closures:
+                lower, upper = tile._parameter_bounds(
+                        closure=closure, **kwargs
+                )
+                parameters = np.random.uniform(
+                        lower + .01, upper - .01, (20, 1, n_parameters)
+                )
+                if closure is None:
+                    # first radius around the mean of the others, where
+                    # branches are clipped by the center
+                    parameters[:10, 0, 0] = parameters[:10, 0, 1:].mean(
+                            axis=1
+                    ) + np.linspace(-1e-9, 1e-9, 10)
+                degrees, control_points = tile.create_tiles(
+                        parameters, closure=closure, **kwargs
+                )
+                for i, p in enumerate(parameters):
+                    splines = tile._tile(tuple(p), closure=closure, **kwargs)
+                    self.assertEqual(len(splines), len(degrees))
+                    for j, s in enumerate(splines):
+                        self.assertTrue(np.all(degrees[j] == s.degrees))
+                        self.assertTrue(
+                                np.allclose(control_points[j][i],
+                                            s.control_points)
+                        )
+
+
+if __name__ == "__main__":
+    c.unittest.main()
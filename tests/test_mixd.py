@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class MixdTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_fnames(self):
+        """
+        "_.xns" should refer to files without base name.
+        """
+        files = gus.io.mixd.fnames(os.path.join("a", "mesh.xns"))
+        self.assertTrue(files["mxyz"].endswith(os.path.join("a", "mesh.mxyz")))
+
+        files = gus.io.mixd.fnames(os.path.join("a", "_.xns"))
+        self.assertTrue(files["minf"].endswith(os.path.join("a", "minf")))
+
+        with self.assertRaises(NotImplementedError):
+            gus.io.mixd.fnames("mesh.vtk")
+
+    def test_load_vertices(self):
+        """
+        Memory-mapped vertices should match exported vertices.
+        """
+        for vertices, elements in (
+                (np.random.rand(8, 3), c.HV),
+                (np.random.rand(8, 3), c.TV),
+        ):
+            mesh = gus.Volumes(vertices, elements)
+            with tempfile.TemporaryDirectory() as tmp:
+                fname = os.path.join(tmp, "mesh.xns")
+                gus.io.mixd.export(mesh, fname)
+                files = gus.io.mixd.fnames(fname)
+
+                dim = gus.io.mixd.load_dim(files["minf"])
+                self.assertEqual(dim, 3)
+
+                loaded = gus.io.mixd.load_vertices(files["mxyz"], dim)
+                self.assertTrue(np.array_equal(loaded, mesh.vertices))
+                del loaded
+
+    def test_export_info(self):
+        """
+        minf should hold sizes, doubled vertices for space-time and boundary
+        names.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            minf = os.path.join(tmp, "minf")
+            for space_time in (False, True):
+                gus.io.mixd.export_info(
+                        minf,
+                        "hexa",
+                        3,
+                        n_vertices=27,
+                        n_elements=8,
+                        n_element_vertices=8,
+                        bc_names=["inlet", "outlet"],
+                        space_time=space_time,
+                )
+                with open(minf) as f:
+                    lines = f.read().splitlines()
+
+                factor = 2 if space_time else 1
+                self.assertIn(f"nn {27 * factor}", lines)
+                self.assertIn("ne 8", lines)
+                self.assertIn(f"nen {8 * factor}", lines)
+                self.assertIn("# outlet : 2", lines)
+                self.assertEqual(gus.io.mixd.load_dim(minf), 3)
+
+    def test_n_boundary_faces(self):
+        """
+        Number of mrng entries per element.
+        """
+        for whatami, n in (("tri", 3), ("quad", 4), ("tet", 4), ("hexa", 6)):
+            self.assertEqual(gus.io.mixd.n_boundary_faces(whatami), n)
+
+
+if __name__ == "__main__":
+    c.unittest.main()
@@ -0,0 +1,148 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class MultiPatchTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def _patches(self):
+        """
+        2 x 2 quadratic patches of a curved square. Second patch has flipped
+        parametrization and its shared corners are perturbed around a
+        multiple of the tolerance.
+        """
+        local = np.stack(
+                np.meshgrid(np.linspace(0, .5, 3), np.linspace(0, .5, 3)),
+                axis=-1,
+        ).reshape(-1, 2)
+        control_points = []
+        for shift in ([0, 0], [.5, 0], [0, .5], [.5, .5]):
+            cps = local + shift
+            control_points.append(cps + .1 * np.sin(3 * cps[:, ::-1]))
+
+        # flip first parametric dimension
+        control_points[1] = control_points[1].reshape(3, 3, 2)[:, ::-1]
+        control_points[1] = control_points[1].reshape(-1, 2)
+        control_points[0][[2, 5, 8], 0] += .5e-10 - 1e-13
+        control_points[1][[2, 5, 8], 0] += .5e-10 + 1e-13
+
+        return gus.spline.MultiPatch(
+                degrees=[[2, 2]] * 4,
+                control_points=np.vstack(control_points),
+        )
+
+    def test_evaluate(self):
+        """
+        Batched evaluation of patches of mixed degrees should match
+        evaluation of each patch, also for rational and selected patches.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        all_degrees = [[2, 1], [1, 3], [2, 1], [3, 3]]
+        beziers = [
+                gus.Bezier(
+                        degrees=degrees,
+                        control_points=np.random.rand(
+                                np.prod(np.add(degrees, 1)), 3
+                        ),
+                ) for degrees in all_degrees
+        ]
+        # mixed with a polynomial patch
+        rational_beziers = [
+                gus.RationalBezier(
+                        degrees=b.degrees,
+                        control_points=b.control_points,
+                        weights=np.random.rand(len(b.control_points), 1) + .5,
+                ) for b in beziers[:-1]
+        ] + beziers[-1:]
+        queries = np.random.rand(15, 2)
+
+        for splines in (beziers, rational_beziers):
+            multipatch = gus.spline.MultiPatch(splines=splines)
+            results = multipatch.evaluate(queries)
+            self.assertEqual(results.shape, (len(splines), len(queries), 3))
+            for result, spline in zip(results, splines):
+                self.assertTrue(np.allclose(result, spline.evaluate(queries)))
+
+            patch_ids = [3, 0, 2]
+            results = multipatch.evaluate(queries, patch_ids=patch_ids)
+            for result, patch_id in zip(results, patch_ids):
+                self.assertTrue(
+                        np.allclose(
+                                result,
+                                multipatch.patch(patch_id).evaluate(queries),
+                        )
+                )
+
+    def test_discretize(self):
+        """
+        Shared vertices of patches should be created once and all vertices
+        should lie on the patches.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        multipatch = self._patches()
+        for resolution in (2, 3, 5):
+            mesh = multipatch.discretize(resolution)
+            self.assertEqual(
+                    len(mesh.vertices), (2 * (resolution - 1) + 1)**2
+            )
+            self.assertEqual(
+                    len(mesh.unique_vertices(tolerance=1e-8).ids),
+                    len(mesh.vertices),
+            )
+
+            queries = gus.create.vertices.raster(
+                    [[0, 0], [1, 1]], [resolution] * 2
+            ).vertices
+            points = multipatch.evaluate(queries).reshape(-1, 2)
+            distances = np.linalg.norm(
+                    points[:, np.newaxis] - mesh.vertices[np.newaxis], axis=2
+            ).min(axis=1)
+            self.assertTrue(np.allclose(distances, 0.))
+
+    def test_discretize_chunks(self):
+        """
+        Chunks numbered with one InterfaceNumbering should give the same
+        mesh as the whole multipatch.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        multipatch = self._patches()
+        numbering = gus.spline.InterfaceNumbering(4, 2)
+        vertices = []
+        elements = []
+        for i in range(len(multipatch)):
+            chunk = gus.spline.MultiPatch(
+                    degrees=multipatch.degrees[i:i + 1],
+                    control_points=multipatch.patch_control_points(i),
+            )
+            v, e = chunk.discretize_chunk(numbering)
+            vertices.append(v)
+            elements.append(e)
+
+        vertices = np.vstack(vertices)
+        elements = np.vstack(elements)
+
+        # numbering order differs, but elements should be the same
+        mesh = multipatch.discretize(4)
+        self.assertEqual(len(vertices), len(mesh.vertices))
+        self.assertTrue(
+                np.allclose(vertices[elements], mesh.vertices[mesh.elements])
+        )
+
+
+if __name__ == "__main__":
+    c.unittest.main()
@@ -0,0 +1,162 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class ProximityTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_closest_parametric_coordinate(self):
+        """
+        Points on the spline should be inverted to themselves.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        nurbs = gus.NURBS(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+                weights=c.WEIGHTS_2D,
+        )
+        queries = nurbs.evaluate(np.random.rand(30, 2))
+        params, distances = nurbs.proximity.closest_parametric_coordinate(
+                queries, return_distances=True
+        )
+
+        self.assertTrue(np.allclose(nurbs.evaluate(params), queries))
+        self.assertTrue(np.allclose(distances, 0.))
+
+    def test_closest_control_points(self):
+        """
+        Closest control points and control points within a radius should
+        match brute force search.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        bspline = gus.BSpline(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+        )
+        queries = np.random.rand(20, 2) * bspline.control_points.max(axis=0)
+        all_distances = np.linalg.norm(
+                queries[:, np.newaxis] - bspline.control_points[np.newaxis],
+                axis=2,
+        )
+
+        ids, distances = bspline.proximity.closest_control_points(
+                queries, return_distances=True
+        )
+        self.assertEqual(ids.shape, (len(queries), ))
+        self.assertTrue(np.allclose(distances, all_distances.min(axis=1)))
+
+        ids, distances = bspline.proximity.closest_control_points(
+                queries, k=3, return_distances=True
+        )
+        self.assertEqual(ids.shape, (len(queries), 3))
+        self.assertTrue(
+                np.allclose(
+                        distances,
+                        np.sort(all_distances, axis=1)[:, :3],
+                )
+        )
+        self.assertTrue(
+                np.allclose(
+                        np.take_along_axis(all_distances, ids, axis=1),
+                        distances,
+                )
+        )
+
+        radius = 1.5
+        offsets, ids, distances = bspline.proximity.control_points_within(
+                queries, radius, return_distances=True
+        )
+        self.assertEqual(len(offsets), len(queries) + 1)
+        for i, query_distances in enumerate(all_distances):
+            query_ids = ids[offsets[i]:offsets[i + 1]]
+            self.assertTrue(
+                    np.array_equal(
+                            query_ids,
+                            np.where(query_distances <= radius)[0],
+                    )
+            )
+            self.assertTrue(
+                    np.allclose(
+                            distances[offsets[i]:offsets[i + 1]],
+                            query_distances[query_ids],
+                    )
+            )
+
+        # nothing within radius
+        offsets, ids = bspline.proximity.control_points_within(
+                queries + 100., radius
+        )
+        self.assertTrue(np.all(offsets == 0))
+        self.assertEqual(len(ids), 0)
+
+    def test_initial_guess_resolutions(self):
+        """
+        Default sample grid should be capped.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline.proximity import _initial_guess_resolutions
+
+        kv = [0] * 4 + np.linspace(0, 1, 11)[1:-1].tolist() + [1] * 4
+        n_cps = len(kv) - 4
+        bspline = gus.BSpline(
+                degrees=[3, 3, 3],
+                knot_vectors=[kv, kv, kv],
+                control_points=np.random.rand(n_cps**3, 3),
+        )
+        resolutions = _initial_guess_resolutions(bspline, max_samples=1000)
+        self.assertLessEqual(np.prod(resolutions), 1000)
+        self.assertTrue(all(r >= 2 for r in resolutions))
+
+    def test_state(self):
+        """
+        Snapshots should detect changes without copying control points.
+        Snapshots of degrees and knot vectors should survive control point
+        changes. Saved control point tree should follow changes.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline import _utils
+
+        bspline = gus.BSpline(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+        )
+        tree = bspline.proximity._control_point_tree()
+        full = _utils.state(bspline)
+        structure = _utils.state(bspline, ["degrees", "knot_vectors"])
+        self.assertTrue("control_points" not in full)
+        self.assertTrue(_utils.same_state(full, bspline))
+        self.assertTrue(bspline.proximity._control_point_tree() is tree)
+
+        bspline.control_points = bspline.control_points + 1.
+        self.assertFalse(_utils.same_state(full, bspline))
+        self.assertTrue(_utils.same_state(structure, bspline))
+        tree = bspline.proximity._control_point_tree()
+        self.assertTrue(np.allclose(tree.data, bspline.control_points))
+
+        bspline.insert_knots(0, [.5])
+        self.assertFalse(_utils.same_state(structure, bspline))
+
+
+if __name__ == "__main__":
+    c.unittest.main()
@@ -0,0 +1,75 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class ElementQualityTest(c.unittest.TestCase):
+
+    def test_unit_cube(self):
+        """
+        Elements of unit cube should add up to volume 1 and none of them
+        should be inverted.
+        """
+        for vs in (gus.Volumes(c.V, c.TV), gus.Volumes(c.V, c.HV)):
+            quality = vs.quality(chunk_size=2)
+            self.assertTrue(np.isclose(quality.measures.sum(), 1.))
+            self.assertTrue((quality.jacobians > 0).all())
+            self.assertEqual(len(vs.inverted_elements()), 0)
+
+        hexa = gus.Volumes(c.V, c.HV).quality()
+        self.assertTrue(np.allclose(hexa.aspect_ratios, 1.))
+        self.assertTrue(np.allclose(hexa.skewness, 0.))
+
+    def test_measures_and_normals(self):
+        """
+        Unit cube boundary should have unit areas, outward normals and
+        vertex normals pointing away from the center.
+        """
+        vs = gus.Volumes(c.V, c.TV)
+        self.assertTrue(np.isclose(vs.volumes_measure().sum(), 1.))
+
+        boundary = vs.boundary()
+        self.assertTrue(np.isclose(boundary.areas().sum(), 6.))
+
+        outward = boundary.centers() - .5
+        self.assertTrue(
+                ((boundary.normals() * outward).sum(axis=1) > 0).all()
+        )
+        vertex_outward = boundary.vertices - .5
+        self.assertTrue(
+                (
+                        (boundary.vertex_normals() * vertex_outward
+                         ).sum(axis=1) > 0
+                ).all()
+        )
+
+    def test_empty_boundary(self):
+        """
+        Boundaries of meshes without elements should be empty.
+        """
+        for mesh in (
+                gus.Faces(c.V[:, :2], np.empty((0, 3), dtype="int32")),
+                gus.Volumes(c.V, np.empty((0, 8), dtype="int32")),
+        ):
+            boundary = mesh.boundary()
+            self.assertEqual(len(boundary.vertices), 0)
+            self.assertEqual(len(boundary.elements), 0)
+
+    def test_inverted_elements(self):
+        """
+        Flipped elements should have negative measures and be detected.
+        """
+        tv = c.TV.copy()
+        tv[::2, [1, 2]] = tv[::2, [2, 1]]
+        vs = gus.Volumes(c.V, tv)
+
+        flipped = np.arange(0, len(tv), 2)
+        self.assertTrue(np.array_equal(vs.inverted_elements(), flipped))
+        self.assertTrue((vs.quality().measures[flipped] < 0).all())
+
+
+if __name__ == "__main__":
+    c.unittest.main()
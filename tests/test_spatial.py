@@ -0,0 +1,110 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class SpatialQueryTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_closest_vertices(self):
+        """
+        Closest vertices should match brute force search.
+        """
+        v = gus.Vertices(c.V)
+        queries = np.random.rand(20, 3)
+        ids, distances = v.closest_vertices(queries, return_distances=True)
+
+        brute = np.linalg.norm(
+                queries[:, None] - c.V[None], axis=2
+        ).min(axis=1)
+        self.assertTrue(np.allclose(distances, brute))
+        self.assertTrue(
+                np.allclose(
+                        np.linalg.norm(c.V[ids] - queries, axis=1),
+                        brute,
+                )
+        )
+
+    def test_select_vertices_batched(self):
+        """
+        Batched selection should match one by one selection, including
+        `None` and inverted ranges.
+        """
+        v = gus.Vertices(np.random.rand(100, 3))
+        batched_ranges = [
+                [[.1, .6], [.2, .9], [0., .5]],
+                [None, [.3, .4], None],
+                [[.7, .2], [.1, .8], None],
+                [[2., 3.], None, None],
+        ]
+        offsets, ids = v.select_vertices_batched(batched_ranges)
+        for i, ranges in enumerate(batched_ranges):
+            self.assertTrue(
+                    np.array_equal(
+                            ids[offsets[i]:offsets[i + 1]],
+                            v.select_vertices(ranges),
+                    )
+            )
+
+    def test_locate_points(self):
+        """
+        Unit cube is filled by elements, so every point inside should be
+        located and every point outside should not.
+        """
+        inside = np.random.rand(50, 3) * .98 + .01
+        outside = inside + 2.
+        for vs in (gus.Volumes(c.V, c.TV), gus.Volumes(c.V, c.HV)):
+            self.assertTrue((vs.locate_points(inside) >= 0).all())
+            self.assertTrue((vs.locate_points(outside) == -1).all())
+
+    def test_locate_points_small_scale(self):
+        """
+        Degeneracy check is relative to the element size, so tiny elements
+        still contain points.
+        """
+        scale = 1e-4
+        inside = (np.random.rand(50, 3) * .98 + .01) * scale
+        vs = gus.Volumes(c.V * scale, c.TV)
+        self.assertTrue((vs.locate_points(inside) >= 0).all())
+        self.assertTrue((vs.locate_points(inside + 2. * scale) == -1).all())
+
+    def test_locate_points_faces(self):
+        """
+        Quads in 2D should be located. Faces in 3D are not supported and
+        should raise instead of being mistaken for tets.
+        """
+        inside = np.random.rand(20, 2) * .98 + .01
+        fs = gus.Faces(c.V[:4, :2], np.array([[0, 1, 3, 2]]))
+        self.assertTrue((fs.locate_points(inside) == 0).all())
+        self.assertTrue((fs.locate_points(inside + 2.) == -1).all())
+
+        with self.assertRaises(ValueError):
+            gus.Faces(c.V, c.QF).locate_points(np.random.rand(5, 3))
+
+    def test_intersecting_elements(self):
+        """
+        Box queries should match brute force AABB intersection.
+        """
+        vs = gus.Volumes(c.V, c.TV)
+        boxes = np.sort(np.random.rand(10, 3, 2), axis=2)
+        offsets, ids = vs.intersecting_elements(boxes)
+
+        e_bounds = vs.element_bounds()
+        for i, b in enumerate(boxes):
+            ref = np.where(
+                    np.logical_and(
+                            (e_bounds[:, 0] <= b[:, 1]).all(axis=1),
+                            (e_bounds[:, 1] >= b[:, 0]).all(axis=1),
+                    )
+            )[0]
+            found = np.sort(ids[offsets[i]:offsets[i + 1]])
+            self.assertTrue(np.array_equal(found, ref))
+
+
+if __name__ == "__main__":
+    c.unittest.main()
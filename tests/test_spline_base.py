@@ -0,0 +1,99 @@
+import gustaf as gus
+import numpy as np
+try:
+    from . import common as c
+except BaseException:
+    import common as c
+
+
+class SplineBaseTest(c.unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def _splines(self):
+        """
+        One spline of each type.
+        """
+        bezier = gus.Bezier(
+                degrees=[2, 1],
+                control_points=np.random.rand(6, 2),
+        )
+        rational_bezier = gus.RationalBezier(
+                degrees=[2, 1],
+                control_points=np.random.rand(6, 2),
+                weights=np.random.rand(6, 1) + .5,
+        )
+        bspline = gus.BSpline(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+        )
+        nurbs = gus.NURBS(
+                control_points=c.CPS_2D,
+                degrees=c.DEGREES_2D_NU,
+                knot_vectors=c.KVS_2D,
+                weights=c.WEIGHTS_2D,
+        )
+
+        return bezier, rational_bezier, bspline, nurbs
+
+    def test_helpers(self):
+        """
+        Helpers should be created on first access and reused afterwards.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        from gustaf.spline.create import Creator
+        from gustaf.spline.extract import Extractor
+        from gustaf.spline.proximity import Proximity
+
+        for spline in self._splines():
+            for name, attribute, helper_type in (
+                    ("extract", "_extractor", Extractor),
+                    ("proximity", "_proximity", Proximity),
+                    ("create", "_creator", Creator),
+            ):
+                self.assertFalse(hasattr(spline, attribute))
+                helper = getattr(spline, name)
+                self.assertTrue(isinstance(helper, helper_type))
+                self.assertTrue(getattr(spline, name) is helper)
+
+    def test_copy(self):
+        """
+        Copies should have the same properties, but own arrays and helpers.
+        """
+        if not gus.has_spline:
+            print("gustaf cannot load spline ext. skipping test.")
+            return None
+
+        queries = np.random.rand(10, 2)
+        for spline in self._splines():
+            extractor = spline.extract
+            copied = spline.copy()
+            self.assertEqual(type(copied), type(spline))
+            self.assertEqual(
+                    copied.required_properties, spline.required_properties
+            )
+            self.assertTrue(
+                    np.allclose(copied.evaluate(queries),
+                                spline.evaluate(queries))
+            )
+            if spline.has_knot_vectors:
+                for copied_kv, kv in zip(
+                        copied.knot_vectors, spline.knot_vectors
+                ):
+                    self.assertTrue(np.allclose(copied_kv, kv))
+
+            self.assertTrue(copied.extract is not extractor)
+            self.assertTrue(copied.proximity.spline is copied)
+
+            original = spline.control_points.copy()
+            copied.control_points = copied.control_points + 1.
+            self.assertTrue(np.allclose(spline.control_points, original))
+
+
+if __name__ == "__main__":
+    c.unittest.main()